@@ -0,0 +1,87 @@
+"""add id allocator table and align id sequences
+
+Revision ID: 202610180001
+Revises: 202602240002
+Create Date: 2026-10-18 09:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202610180001"
+down_revision = "202602240002"
+branch_labels = None
+depends_on = None
+
+ALLOCATED_TABLES = (
+    "announcement",
+    "application",
+    "application_asset",
+    "application_item",
+    "approval_history",
+    "asset",
+    "audit_log",
+    "category",
+    "department",
+    "hero_banner",
+    "logistics",
+    "notification_outbox",
+    "ocr_inbound_job",
+    "rbac_permission",
+    "rbac_role",
+    "rbac_role_permission",
+    "rbac_ui_guard",
+    "rbac_user_role",
+    "sku",
+    "sku_stock_flow",
+    "stock_flow",
+    "sys_user",
+    "user_address",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "id_allocator",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        # Ids used to be assigned as max(id) + 1, so the BIGSERIAL sequences
+        # were never advanced. Move each one past the existing rows.
+        for table_name in ALLOCATED_TABLES:
+            op.execute(
+                sa.text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"COALESCE(MAX(id), 0) + 1, false) FROM {table_name}"
+                )
+            )
+        return
+
+    allocator_table = sa.table(
+        "id_allocator",
+        sa.column("name", sa.String(length=64)),
+        sa.column("next_value", sa.BigInteger()),
+    )
+    for table_name in ALLOCATED_TABLES:
+        max_id = connection.scalar(sa.text(f"SELECT MAX(id) FROM {table_name}"))
+        op.execute(
+            allocator_table.insert().values(
+                name=table_name, next_value=int(max_id or 0) + 1
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("id_allocator")
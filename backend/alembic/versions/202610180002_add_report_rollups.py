@@ -0,0 +1,95 @@
+"""add daily report rollup tables
+
+Revision ID: 202610180002
+Revises: 202610180001
+Create Date: 2026-10-18 12:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202610180002"
+down_revision = "202610180001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_application_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("department_id", sa.BigInteger(), nullable=False),
+        sa.Column("application_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "day", "department_id", name="pk_report_application_daily"
+        ),
+    )
+    op.create_table(
+        "report_application_item_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("department_id", sa.BigInteger(), nullable=False),
+        sa.Column("category_id", sa.BigInteger(), nullable=False),
+        sa.Column("sku_id", sa.BigInteger(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("total_cost", sa.Numeric(14, 2), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "day",
+            "department_id",
+            "category_id",
+            "sku_id",
+            name="pk_report_application_item_daily",
+        ),
+    )
+    op.create_index(
+        "idx_report_application_item_daily_sku",
+        "report_application_item_daily",
+        ["sku_id", "day"],
+    )
+    op.create_index(
+        "idx_report_application_item_daily_category",
+        "report_application_item_daily",
+        ["category_id", "day"],
+    )
+
+    # Backfill from existing applications; later changes are applied by the
+    # write paths, and app.scripts.rebuild_report_rollups repairs any drift.
+    op.execute(
+        sa.text(
+            "INSERT INTO report_application_daily "
+            "(day, department_id, application_count) "
+            "SELECT DATE(a.created_at), u.department_id, COUNT(a.id) "
+            "FROM application a JOIN sys_user u ON u.id = a.applicant_user_id "
+            "GROUP BY DATE(a.created_at), u.department_id"
+        )
+    )
+    op.execute(
+        sa.text(
+            "INSERT INTO report_application_item_daily "
+            "(day, department_id, category_id, sku_id, item_count, quantity, total_cost) "
+            "SELECT DATE(a.created_at), u.department_id, s.category_id, s.id, "
+            "COUNT(i.id), COALESCE(SUM(i.quantity), 0), "
+            "COALESCE(SUM(i.quantity * s.reference_price), 0) "
+            "FROM application a "
+            "JOIN sys_user u ON u.id = a.applicant_user_id "
+            "JOIN application_item i ON i.application_id = a.id "
+            "JOIN sku s ON s.id = i.sku_id "
+            "GROUP BY DATE(a.created_at), u.department_id, s.category_id, s.id"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_report_application_item_daily_category",
+        table_name="report_application_item_daily",
+    )
+    op.drop_index(
+        "idx_report_application_item_daily_sku",
+        table_name="report_application_item_daily",
+    )
+    op.drop_table("report_application_item_daily")
+    op.drop_table("report_application_daily")
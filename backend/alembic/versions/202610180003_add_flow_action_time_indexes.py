@@ -0,0 +1,36 @@
+"""add action/time indexes for outbound record paging
+
+Revision ID: 202610180003
+Revises: 202610180002
+Create Date: 2026-10-18 15:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "202610180003"
+down_revision = "202610180002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_stock_flow_action_time",
+        "stock_flow",
+        ["action", "occurred_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_sku_stock_flow_action_time",
+        "sku_stock_flow",
+        ["action", "occurred_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_sku_stock_flow_action_time", table_name="sku_stock_flow")
+    op.drop_index("idx_stock_flow_action_time", table_name="stock_flow")
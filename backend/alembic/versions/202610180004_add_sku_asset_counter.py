@@ -0,0 +1,61 @@
+"""add per-sku serialized asset counters
+
+Revision ID: 202610180004
+Revises: 202610180003
+Create Date: 2026-10-18 16:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202610180004"
+down_revision = "202610180003"
+branch_labels = None
+depends_on = None
+
+_STATUS_COLUMNS = (
+    ("IN_STOCK", "in_stock_count"),
+    ("LOCKED", "locked_count"),
+    ("IN_USE", "in_use_count"),
+    ("PENDING_INSPECTION", "pending_inspection_count"),
+    ("BORROWED", "borrowed_count"),
+    ("REPAIRING", "repairing_count"),
+    ("SCRAPPED", "scrapped_count"),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sku_asset_counter",
+        sa.Column("sku_id", sa.BigInteger(), nullable=False),
+        *(
+            sa.Column(column, sa.Integer(), nullable=False)
+            for _, column in _STATUS_COLUMNS
+        ),
+        sa.Column("available_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("sku_id", name="pk_sku_asset_counter"),
+    )
+
+    # Backfill from existing assets; later changes are applied by the session
+    # flush hook, and app.scripts.reconcile_sku_asset_counters repairs drift.
+    status_sums = ", ".join(
+        f"SUM(CASE WHEN status = '{status}' THEN 1 ELSE 0 END)"
+        for status, _ in _STATUS_COLUMNS
+    )
+    op.execute(
+        sa.text(
+            "INSERT INTO sku_asset_counter "
+            f"(sku_id, {', '.join(column for _, column in _STATUS_COLUMNS)}, available_count) "
+            f"SELECT sku_id, {status_sums}, "
+            "SUM(CASE WHEN status = 'IN_STOCK' AND locked_application_id IS NULL "
+            "THEN 1 ELSE 0 END) "
+            "FROM asset GROUP BY sku_id"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sku_asset_counter")
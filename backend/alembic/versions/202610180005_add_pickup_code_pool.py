@@ -0,0 +1,58 @@
+"""reuse pickup codes through a free-code pool
+
+Revision ID: 202610180005
+Revises: 202610180004
+Create Date: 2026-10-18 17:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202610180005"
+down_revision = "202610180004"
+branch_labels = None
+depends_on = None
+
+_ACTIVE_PICKUP_CODE_CONDITION = (
+    "status NOT IN ('ADMIN_REJECTED', 'CANCELLED', 'DONE', "
+    "'LEADER_REJECTED', 'OUTBOUNDED', 'SHIPPED')"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pickup_code_pool",
+        sa.Column("code", sa.String(length=6), nullable=False),
+        sa.PrimaryKeyConstraint("code", name="pk_pickup_code_pool"),
+    )
+
+    with op.batch_alter_table("application") as batch_op:
+        batch_op.drop_constraint("uk_application_pickup_code", type_="unique")
+    op.create_index(
+        "idx_application_pickup_code",
+        "application",
+        ["pickup_code", "id"],
+        unique=False,
+    )
+    if op.get_bind().dialect.name in {"postgresql", "sqlite"}:
+        op.create_index(
+            "uk_application_active_pickup_code",
+            "application",
+            ["pickup_code"],
+            unique=True,
+            postgresql_where=sa.text(_ACTIVE_PICKUP_CODE_CONDITION),
+            sqlite_where=sa.text(_ACTIVE_PICKUP_CODE_CONDITION),
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in {"postgresql", "sqlite"}:
+        op.drop_index("uk_application_active_pickup_code", table_name="application")
+    op.drop_index("idx_application_pickup_code", table_name="application")
+    # Fails if closed applications have already handed out reused codes.
+    with op.batch_alter_table("application") as batch_op:
+        batch_op.create_unique_constraint("uk_application_pickup_code", ["pickup_code"])
+    op.drop_table("pickup_code_pool")
@@ -0,0 +1,47 @@
+"""add partial indexes for pickup counter lookups
+
+Revision ID: 202610180006
+Revises: 202610180005
+Create Date: 2026-10-18 18:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202610180006"
+down_revision = "202610180005"
+branch_labels = None
+depends_on = None
+
+_PICKUP_READY_CONDITION = "status IN ('ADMIN_APPROVED', 'READY_OUTBOUND')"
+
+
+def upgrade() -> None:
+    partial = op.get_bind().dialect.name in {"postgresql", "sqlite"}
+    if partial:
+        op.create_index(
+            "idx_application_pickup_ready_code",
+            "application",
+            ["pickup_code"],
+            unique=False,
+            postgresql_where=sa.text(_PICKUP_READY_CONDITION),
+            sqlite_where=sa.text(_PICKUP_READY_CONDITION),
+        )
+    # Without partial index support the QR index covers every application.
+    op.create_index(
+        "idx_application_pickup_ready_qr",
+        "application",
+        ["pickup_qr_string"],
+        unique=False,
+        postgresql_where=sa.text(_PICKUP_READY_CONDITION),
+        sqlite_where=sa.text(_PICKUP_READY_CONDITION),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_application_pickup_ready_qr", table_name="application")
+    if op.get_bind().dialect.name in {"postgresql", "sqlite"}:
+        op.drop_index("idx_application_pickup_ready_code", table_name="application")
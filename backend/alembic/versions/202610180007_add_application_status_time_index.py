@@ -0,0 +1,29 @@
+"""add status/time index for keyset approval inbox paging
+
+Revision ID: 202610180007
+Revises: 202610180006
+Create Date: 2026-10-18 19:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "202610180007"
+down_revision = "202610180006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_application_status_time",
+        "application",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_application_status_time", table_name="application")
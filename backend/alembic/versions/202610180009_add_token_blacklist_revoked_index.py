@@ -0,0 +1,29 @@
+"""add revoked_at index for incremental token revocation sync
+
+Revision ID: 202610180009
+Revises: 202610180008
+Create Date: 2026-10-18 21:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "202610180009"
+down_revision = "202610180008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_token_blacklist_revoked",
+        "token_blacklist",
+        ["revoked_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_token_blacklist_revoked", table_name="token_blacklist")
@@ -21,11 +21,12 @@ from ....core.auth import (
     get_auth_context,
     get_user_permissions,
     get_user_roles,
-    hash_password,
+    hash_password_offloaded,
+    password_needs_rehash,
     require_roles,
     set_refresh_cookie,
     validate_password_policy,
-    verify_password,
+    verify_password_offloaded,
 )
 from ....core.config import get_settings
 from ....core.exceptions import AppException
@@ -71,10 +72,18 @@ def login(
 ) -> ApiResponse:
     stmt = select(SysUser).where(SysUser.employee_no == payload.employee_no)
     user = db.scalar(stmt)
-    if user is None or not verify_password(payload.password, user.password_hash):
+    if user is None or not verify_password_offloaded(payload.password, user.password_hash):
         raise AppException(code="UNAUTHORIZED", message="工号或密码错误。")
 
     settings = get_settings()
+    if password_needs_rehash(user.password_hash, settings):
+        # Move the hash to the configured cost while the plain password is at hand.
+        try:
+            user.password_hash = hash_password_offloaded(payload.password)
+        except AppException:
+            pass  # Hashing pool is saturated; a later login retries.
+        else:
+            db.commit()
     access_token = create_access_token(user.id, settings)
     refresh_token = create_refresh_token(user.id, settings)
     set_refresh_cookie(response, refresh_token, settings)
@@ -144,14 +153,14 @@ def change_my_password(
     context: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
 ) -> ApiResponse:
-    if not verify_password(payload.old_password, context.user.password_hash):
+    if not verify_password_offloaded(payload.old_password, context.user.password_hash):
         raise AppException(
             code="INVALID_FIELD_FORMAT",
             message="原密码不正确。",
         )
 
     validate_password_policy(payload.new_password)
-    context.user.password_hash = hash_password(payload.new_password)
+    context.user.password_hash = hash_password_offloaded(payload.new_password)
     blacklist_token(db, context.token_claims, TokenBlacklistReason.PASSWORD_CHANGED)
     db.commit()
     clear_refresh_cookie(response)
@@ -170,7 +179,7 @@ def reset_user_password(
     if user is None:
         raise AppException(code="USER_NOT_FOUND", message="用户不存在。")
 
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = hash_password_offloaded(payload.new_password)
     db.commit()
     return build_success_response({"user_id": user.id, "password_reset": True})
 
@@ -4,26 +4,24 @@ from __future__ import annotations
 
 from datetime import UTC, datetime
 from collections.abc import Sequence
-from random import randint
+from dataclasses import dataclass
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import Select, func, or_, select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
+from ....core.catalog_cache import get_catalog_cache
 from ....core.exceptions import AppException
 from ....db.session import get_db_session
 from ....models.application import Application, ApplicationAsset, ApplicationItem
 from ....models.catalog import Category, Sku
 from ....models.enums import (
     ApplicationStatus,
-    AssetStatus,
     DeliveryType,
     SkuStockFlowAction,
     SkuStockMode,
-    StockFlowAction,
 )
-from ....models.inventory import Asset, StockFlow
 from ....models.sku_stock import SkuStock
 from ....models.notification import UserAddress
 from ....models.organization import Department, SysUser
@@ -33,7 +31,12 @@ from ....schemas.m02 import (
     ApplicationCreateRequest,
     UserAddressCreateRequest,
 )
-from ....services.sku_stock_service import apply_stock_delta
+from ....services.asset_reservation_service import reserve_assets
+from ....services.id_allocation_service import allocate_id, allocate_ids
+from ....services.pickup_code_service import allocate_pickup_code
+from ....services.report_rollup_service import record_application_created
+from ....services.sku_asset_counter_service import load_available_asset_counts
+from ....services.sku_stock_service import StockDelta, apply_stock_deltas
 
 router = APIRouter(tags=["M02"])
 
@@ -119,27 +122,6 @@ def _build_category_tree(rows: Sequence[Category]) -> list[dict[str, object]]:
     return roots
 
 
-def _pickup_code_exists(db: Session, pickup_code: str) -> bool:
-    stmt = select(Application.id).where(Application.pickup_code == pickup_code).limit(1)
-    return db.scalar(stmt) is not None
-
-
-def _create_pickup_code(db: Session) -> str:
-    for _ in range(10):
-        candidate = f"{randint(0, 999999):06d}"
-        if not _pickup_code_exists(db, candidate):
-            return candidate
-    raise AppException(
-        code="INTERNAL_SERVER_ERROR",
-        message="无法分配取件码，请稍后重试。",
-    )
-
-
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
 def _build_application_title(labels: Sequence[str]) -> str:
     names: list[str] = []
     for raw in labels:
@@ -169,26 +151,66 @@ def _sanitize_express_address_snapshot(
     }
 
 
-def _sku_query(
-    *,
-    category_id: int | None,
-    keyword: str | None,
-) -> Select[tuple[Sku]]:
-    stmt: Select[tuple[Sku]] = select(Sku)
-    stmt = stmt.where(Sku.is_visible.is_(True))
-    if category_id is not None:
-        stmt = stmt.where(Sku.category_id == category_id)
-    if keyword:
-        token = f"%{keyword}%"
-        stmt = stmt.where(
-            or_(
-                Sku.name.ilike(token),
-                Sku.brand.ilike(token),
-                Sku.model.ilike(token),
-                Sku.spec.ilike(token),
-            )
+@dataclass(frozen=True, slots=True)
+class _CatalogSku:
+    item: dict[str, object]
+    category_id: int
+    stock_mode: SkuStockMode
+    search_fields: tuple[str, ...]
+
+
+def _load_sku_catalog(db: Session) -> tuple[_CatalogSku, ...]:
+    skus = db.scalars(
+        select(Sku).where(Sku.is_visible.is_(True)).order_by(Sku.id.asc())
+    ).all()
+    return tuple(
+        _CatalogSku(
+            item={
+                "id": sku.id,
+                "category_id": sku.category_id,
+                "name": sku.name,
+                "brand": sku.brand,
+                "model": sku.model,
+                "spec": sku.spec,
+                "reference_price": str(sku.reference_price),
+                "cover_url": sku.cover_url,
+                "stock_mode": sku.stock_mode.value,
+                "safety_stock_threshold": sku.safety_stock_threshold,
+            },
+            category_id=int(sku.category_id),
+            stock_mode=sku.stock_mode,
+            search_fields=tuple(
+                (value or "").lower() for value in (sku.name, sku.brand, sku.model, sku.spec)
+            ),
+        )
+        for sku in skus
+    )
+
+
+def _load_available_stock(
+    db: Session, catalog_skus: Sequence[_CatalogSku]
+) -> dict[int, int]:
+    serialized_ids = [
+        int(entry.item["id"])
+        for entry in catalog_skus
+        if entry.stock_mode != SkuStockMode.QUANTITY
+    ]
+    quantity_ids = [
+        int(entry.item["id"])
+        for entry in catalog_skus
+        if entry.stock_mode == SkuStockMode.QUANTITY
+    ]
+    available = load_available_asset_counts(db, sku_ids=serialized_ids)
+    if quantity_ids:
+        available.update(
+            (int(sku_id), int(available_qty))
+            for sku_id, available_qty in db.execute(
+                select(
+                    SkuStock.sku_id, SkuStock.on_hand_qty - SkuStock.reserved_qty
+                ).where(SkuStock.sku_id.in_(quantity_ids))
+            ).all()
         )
-    return stmt
+    return available
 
 
 @router.get("/categories/tree", response_model=ApiResponse)
@@ -196,8 +218,13 @@ def get_category_tree(
     _: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
 ) -> ApiResponse:
-    categories = db.scalars(select(Category).order_by(Category.id.asc())).all()
-    return build_success_response(_build_category_tree(categories))
+    tree = get_catalog_cache(db).get_or_load(
+        "category_tree",
+        lambda: _build_category_tree(
+            db.scalars(select(Category).order_by(Category.id.asc())).all()
+        ),
+    )
+    return build_success_response(tree)
 
 
 @router.get("/skus", response_model=ApiResponse)
@@ -209,78 +236,34 @@ def list_skus(
     _: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
 ) -> ApiResponse:
-    offset = (page - 1) * page_size
-    sku_stmt = _sku_query(category_id=category_id, keyword=keyword)
-
-    total_stmt = select(func.count()).select_from(sku_stmt.subquery())
-    total = db.scalar(total_stmt) or 0
-
-    available_stock_subquery = (
-        select(
-            Asset.sku_id.label("sku_id"), func.count(Asset.id).label("available_stock")
-        )
-        .where(
-            Asset.status == AssetStatus.IN_STOCK,
-            Asset.locked_application_id.is_(None),
-        )
-        .group_by(Asset.sku_id)
-        .subquery()
-    )
-    quantity_stock_subquery = (
-        select(
-            SkuStock.sku_id.label("sku_id"),
-            (SkuStock.on_hand_qty - SkuStock.reserved_qty).label("available_qty"),
-        ).subquery()
+    catalog = get_catalog_cache(db).get_or_load(
+        "sku_catalog", lambda: _load_sku_catalog(db)
     )
-
-    sku_id_subquery = sku_stmt.with_only_columns(Sku.id).subquery()
-    rows = db.execute(
-        select(
-            Sku,
-            func.coalesce(available_stock_subquery.c.available_stock, 0).label(
-                "serialized_available_stock"
-            ),
-            func.coalesce(quantity_stock_subquery.c.available_qty, 0).label(
-                "quantity_available_qty"
-            ),
-        )
-        .select_from(Sku)
-        .join(sku_id_subquery, Sku.id == sku_id_subquery.c.id)
-        .outerjoin(
-            available_stock_subquery, available_stock_subquery.c.sku_id == Sku.id
-        )
-        .outerjoin(quantity_stock_subquery, quantity_stock_subquery.c.sku_id == Sku.id)
-        .order_by(Sku.id.asc())
-        .offset(offset)
-        .limit(page_size)
-    ).all()
+    token = keyword.lower() if keyword else None
+    matched = [
+        entry
+        for entry in catalog
+        if (category_id is None or entry.category_id == category_id)
+        and (token is None or any(token in field for field in entry.search_fields))
+    ]
+    offset = (page - 1) * page_size
+    page_skus = matched[offset : offset + page_size]
+    # Availability changes on every reservation, so it is never cached.
+    available_stock = _load_available_stock(db, page_skus)
 
     return build_success_response(
         {
             "items": [
                 {
-                    "id": sku.id,
-                    "category_id": sku.category_id,
-                    "name": sku.name,
-                    "brand": sku.brand,
-                    "model": sku.model,
-                    "spec": sku.spec,
-                    "reference_price": str(sku.reference_price),
-                    "cover_url": sku.cover_url,
-                    "stock_mode": sku.stock_mode.value,
-                    "safety_stock_threshold": sku.safety_stock_threshold,
-                    "available_stock": int(
-                        quantity_available_qty
-                        if sku.stock_mode == SkuStockMode.QUANTITY
-                        else serialized_available_stock
-                    ),
+                    **entry.item,
+                    "available_stock": available_stock.get(int(entry.item["id"]), 0),
                 }
-                for sku, serialized_available_stock, quantity_available_qty in rows
+                for entry in page_skus
             ],
             "meta": {
                 "page": page,
                 "page_size": page_size,
-                "total": int(total),
+                "total": len(matched),
             },
         }
     )
@@ -311,7 +294,7 @@ def create_my_address(
         )
 
     record = UserAddress(
-        id=_next_bigint_id(db, UserAddress),
+        id=allocate_id(db, UserAddress),
         user_id=context.user.id,
         receiver_name=payload.receiver_name,
         receiver_phone=payload.receiver_phone,
@@ -500,12 +483,12 @@ def create_application(
 
     now = datetime.now(UTC).replace(tzinfo=None)
     application = Application(
-        id=_next_bigint_id(db, Application),
+        id=allocate_id(db, Application),
         applicant_user_id=context.user.id,
         type=payload.type,
         status=ApplicationStatus.SUBMITTED,
         delivery_type=payload.delivery_type,
-        pickup_code=_create_pickup_code(db),
+        pickup_code=allocate_pickup_code(db),
         pickup_qr_string=None,
         title=None,
         applicant_name_snapshot=context.user.name,
@@ -518,10 +501,10 @@ def create_application(
     db.flush()
 
     item_rows: list[ApplicationItem] = []
-    relation_rows: list[ApplicationAsset] = []
     title_labels: list[str] = []
-    next_application_asset_id = _next_bigint_id(db, ApplicationAsset)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
+    item_ids = iter(allocate_ids(db, ApplicationItem, len(payload.items)))
+    serialized_quantities: list[tuple[int, int]] = []
+    stock_deltas: list[StockDelta] = []
 
     for item in payload.items:
         sku = sku_by_id[int(item.sku_id)]
@@ -529,7 +512,7 @@ def create_application(
         title_labels.append((sku.name or sku.model or sku.brand).strip())
 
         item_record = ApplicationItem(
-            id=_next_bigint_id(db, ApplicationItem),
+            id=next(item_ids),
             application_id=application.id,
             sku_id=item.sku_id,
             quantity=item.quantity,
@@ -540,64 +523,56 @@ def create_application(
         item_rows.append(item_record)
 
         if sku.stock_mode == SkuStockMode.QUANTITY:
-            apply_stock_delta(
-                db,
-                sku_id=sku.id,
-                action=SkuStockFlowAction.LOCK,
-                on_hand_delta=0,
-                reserved_delta=int(item.quantity),
-                operator_user_id=context.user.id,
-                related_application_id=application.id,
-                occurred_at=now,
-                meta_json={"event": "lock_inventory", "sku_id": item.sku_id},
+            stock_deltas.append(
+                StockDelta(
+                    sku_id=sku.id,
+                    action=SkuStockFlowAction.LOCK,
+                    on_hand_delta=0,
+                    reserved_delta=int(item.quantity),
+                    meta_json={"event": "lock_inventory", "sku_id": item.sku_id},
+                )
             )
             continue
 
-        available_assets = db.scalars(
-            select(Asset)
-            .where(
-                Asset.sku_id == item.sku_id,
-                Asset.status == AssetStatus.IN_STOCK,
-                Asset.locked_application_id.is_(None),
-            )
-            .order_by(Asset.id.asc())
-            .limit(item.quantity)
-        ).all()
+        serialized_quantities.append((int(item.sku_id), int(item.quantity)))
 
-        if len(available_assets) < item.quantity:
-            raise AppException(
-                code="STOCK_INSUFFICIENT",
-                message="���ÿ�治�㡣",
-                details={
-                    "sku_id": item.sku_id,
-                    "requested": item.quantity,
-                    "available": len(available_assets),
-                },
-            )
+    reservation = reserve_assets(
+        db,
+        application_id=application.id,
+        quantities=serialized_quantities,
+        operator_user_id=context.user.id,
+        occurred_at=now,
+        flow_meta={"event": "lock_inventory"},
+    )
+    if reservation.shortfall_by_sku:
+        sku_id, claimed = min(reservation.shortfall_by_sku.items())
+        raise AppException(
+            code="STOCK_INSUFFICIENT",
+            message="���ÿ�治�㡣",
+            details={
+                "sku_id": sku_id,
+                "requested": sum(
+                    quantity
+                    for requested_sku_id, quantity in serialized_quantities
+                    if requested_sku_id == sku_id
+                ),
+                "available": claimed,
+            },
+        )
 
-        for asset in available_assets:
-            asset.status = AssetStatus.LOCKED
-            asset.locked_application_id = application.id
-            mapping = ApplicationAsset(
-                id=next_application_asset_id,
-                application_id=application.id,
-                asset_id=asset.id,
-            )
-            next_application_asset_id += 1
-            db.add(mapping)
-            relation_rows.append(mapping)
-            db.add(
-                StockFlow(
-                    id=next_stock_flow_id,
-                    asset_id=asset.id,
-                    action=StockFlowAction.LOCK,
-                    operator_user_id=context.user.id,
-                    related_application_id=application.id,
-                    occurred_at=now,
-                    meta_json={"event": "lock_inventory", "sku_id": item.sku_id},
-                )
-            )
-            next_stock_flow_id += 1
+    apply_stock_deltas(
+        db,
+        deltas=stock_deltas,
+        operator_user_id=context.user.id,
+        related_application_id=application.id,
+        occurred_at=now,
+    )
+    record_application_created(
+        db,
+        created_at=application.created_at,
+        department_id=context.user.department_id,
+        items=[(sku_by_id[int(item.sku_id)], int(item.quantity)) for item in payload.items],
+    )
 
     application.title = _build_application_title(title_labels)
     application.status = ApplicationStatus.LOCKED
@@ -605,8 +580,11 @@ def create_application(
     db.refresh(application)
     for row in item_rows:
         db.refresh(row)
-    for row in relation_rows:
-        db.refresh(row)
+    relation_rows = db.scalars(
+        select(ApplicationAsset)
+        .where(ApplicationAsset.application_id == application.id)
+        .order_by(ApplicationAsset.id.asc())
+    ).all()
 
     return build_success_response(
         _serialize_application(application, item_rows, relation_rows, resolved_address)
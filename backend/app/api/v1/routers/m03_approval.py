@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import base64
+import json
+from collections.abc import Sequence
 from datetime import UTC, datetime
+from typing import Literal
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, and_, exists, func, insert, or_, select
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
@@ -18,7 +22,7 @@ from ....models.application import (
     ApprovalHistory,
     Logistics,
 )
-from ....models.catalog import Sku
+from ....models.catalog import Category, Sku
 from ....models.enums import (
     ApplicationStatus,
     ApprovalAction,
@@ -35,11 +39,17 @@ from ....schemas.common import ApiResponse, build_success_response
 from ....schemas.m03 import (
     ApplicationApproveRequest,
     ApplicationAssignAssetsRequest,
+    ApprovalBatchRequest,
 )
-from ....services.sku_stock_service import apply_stock_delta
+from ....services.asset_reservation_service import claim_assets
+from ....services.id_allocation_service import allocate_id, allocate_ids
+from ....services.sku_asset_counter_service import load_available_asset_counts
+from ....services.sku_stock_service import StockDelta, apply_stock_deltas
 
 router = APIRouter(tags=["M03"])
 
+INBOX_TOTAL_CAP = 1000
+
 
 def _to_iso8601(value: datetime) -> str:
     if value.tzinfo is None:
@@ -49,11 +59,6 @@ def _to_iso8601(value: datetime) -> str:
     return normalized.isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
 def _build_application_title(labels: list[str]) -> str:
     names: list[str] = []
     for raw in labels:
@@ -77,17 +82,65 @@ def _require_any_role(context: AuthContext, allowed_roles: set[str]) -> None:
     )
 
 
-def _build_inbox_query(node: ApprovalNode) -> Select[tuple[Application, SysUser]]:
+def _build_inbox_query(
+    node: ApprovalNode, *, approver_user_id: int | None = None
+) -> Select[tuple[Application, SysUser]]:
+    """Inbox rows in (created_at, id) order, served by idx_application_status_time.
+
+    With ``approver_user_id`` only applications that contain an item from a
+    category routed to that approver, or from a category with no approver
+    configured for the node, are returned.
+    """
+
     if node == ApprovalNode.LEADER:
         status = ApplicationStatus.LOCKED
+        approver_column = Category.leader_approver_user_id
     else:
         status = ApplicationStatus.LEADER_APPROVED
-    return (
+        approver_column = Category.admin_reviewer_user_id
+    stmt = (
         select(Application, SysUser)
         .join(SysUser, SysUser.id == Application.applicant_user_id)
         .where(Application.status == status)
         .order_by(Application.created_at.asc(), Application.id.asc())
     )
+    if approver_user_id is not None:
+        stmt = stmt.where(
+            exists(
+                select(ApplicationItem.id)
+                .join(Sku, Sku.id == ApplicationItem.sku_id)
+                .join(Category, Category.id == Sku.category_id)
+                .where(
+                    ApplicationItem.application_id == Application.id,
+                    or_(
+                        approver_column == approver_user_id,
+                        approver_column.is_(None),
+                    ),
+                )
+            )
+        )
+    return stmt
+
+
+def _encode_inbox_cursor(created_at: datetime, application_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), application_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_inbox_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_raw, application_id = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = datetime.fromisoformat(created_at_raw)
+        if not isinstance(application_id, int):
+            raise ValueError("cursor id must be an integer")
+    except (ValueError, TypeError) as error:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="分页游标无效，请从第一页重新查询。",
+            details={"cursor": cursor},
+        ) from error
+    return created_at, application_id
 
 
 def _assert_application_status(
@@ -117,63 +170,108 @@ def _unlock_application_assets(
     operator_user_id: int,
     reason: str,
 ) -> None:
+    _unlock_applications_assets(
+        db,
+        applications=[application],
+        operator_user_id=operator_user_id,
+        reason=reason,
+    )
+
+
+def _unlock_applications_assets(
+    db: Session,
+    *,
+    applications: Sequence[Application],
+    operator_user_id: int,
+    reason: str,
+) -> None:
+    """Release locked assets and quantity reservations of several applications
+    with one query per table, whatever the number of applications."""
+
+    application_ids = [int(application.id) for application in applications]
+    if not application_ids:
+        return
+
     now = datetime.now(UTC).replace(tzinfo=None)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
     locked_assets = db.scalars(
         select(Asset)
         .where(
-            Asset.locked_application_id == application.id,
+            Asset.locked_application_id.in_(application_ids),
             Asset.status == AssetStatus.LOCKED,
         )
         .order_by(Asset.id.asc())
     ).all()
+    stock_flow_ids = iter(allocate_ids(db, StockFlow, len(locked_assets)))
     for asset in locked_assets:
+        application_id = asset.locked_application_id
         asset.status = AssetStatus.IN_STOCK
         asset.locked_application_id = None
         db.add(
             StockFlow(
-                id=next_stock_flow_id,
+                id=next(stock_flow_ids),
                 asset_id=asset.id,
                 action=StockFlowAction.UNLOCK,
                 operator_user_id=operator_user_id,
-                related_application_id=application.id,
+                related_application_id=application_id,
                 occurred_at=now,
                 meta_json={"event": reason},
             )
         )
-        next_stock_flow_id += 1
     db.query(ApplicationAsset).filter(
-        ApplicationAsset.application_id == application.id
+        ApplicationAsset.application_id.in_(application_ids)
     ).delete()
 
     # Release quantity-stock reservations.
     items = db.scalars(
         select(ApplicationItem)
-        .where(ApplicationItem.application_id == application.id)
-        .order_by(ApplicationItem.id.asc())
+        .where(ApplicationItem.application_id.in_(application_ids))
+        .order_by(ApplicationItem.application_id.asc(), ApplicationItem.id.asc())
     ).all()
     if not items:
         return
 
     sku_rows = db.scalars(
-        select(Sku).where(Sku.id.in_([item.sku_id for item in items]))
+        select(Sku).where(Sku.id.in_({item.sku_id for item in items}))
     ).all()
     mode_by_sku_id = {int(row.id): row.stock_mode for row in sku_rows}
 
-    for item in items:
-        if mode_by_sku_id.get(int(item.sku_id)) != SkuStockMode.QUANTITY:
-            continue
-        apply_stock_delta(
-            db,
-            sku_id=item.sku_id,
-            action=SkuStockFlowAction.UNLOCK,
-            on_hand_delta=0,
-            reserved_delta=-int(item.quantity),
-            operator_user_id=operator_user_id,
-            related_application_id=application.id,
-            occurred_at=now,
-            meta_json={"event": reason},
-        )
+    apply_stock_deltas(
+        db,
+        deltas=[
+            StockDelta(
+                sku_id=item.sku_id,
+                action=SkuStockFlowAction.UNLOCK,
+                on_hand_delta=0,
+                reserved_delta=-int(item.quantity),
+                meta_json={"event": reason},
+                related_application_id=int(item.application_id),
+            )
+            for item in items
+            if mode_by_sku_id.get(int(item.sku_id)) == SkuStockMode.QUANTITY
+        ],
+        operator_user_id=operator_user_id,
+        related_application_id=None,
+        occurred_at=now,
+    )
+
+
+def _quantity_only_application_ids(db: Session, application_ids: Sequence[int]) -> set[int]:
+    """Ids of applications whose items are all quantity-stock SKUs."""
+
+    if not application_ids:
+        return set()
+    modes_by_application: dict[int, set[SkuStockMode]] = {}
+    for application_id, stock_mode in db.execute(
+        select(ApplicationItem.application_id, Sku.stock_mode)
+        .join(Sku, Sku.id == ApplicationItem.sku_id)
+        .where(ApplicationItem.application_id.in_(list(application_ids)))
+    ).all():
+        modes_by_application.setdefault(int(application_id), set()).add(stock_mode)
+    return {
+        application_id
+        for application_id, modes in modes_by_application.items()
+        if modes == {SkuStockMode.QUANTITY}
+    }
 
 
 def _create_pickup_qr_string(application: Application) -> str:
@@ -260,6 +358,9 @@ def get_approval_inbox(
     status: ApplicationStatus | None = Query(default=None),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=50),
+    scope: Literal["assigned", "all"] | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
     context: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
 ) -> ApiResponse:
@@ -281,10 +382,57 @@ def get_approval_inbox(
             },
         )
 
-    base_stmt = _build_inbox_query(node)
-    total = db.scalar(select(func.count()).select_from(base_stmt.subquery())) or 0
-    offset = (page - 1) * page_size
-    rows = db.execute(base_stmt.offset(offset).limit(page_size)).all()
+    # Leaders only see their own categories; admins may opt in.
+    is_admin = bool(context.roles.intersection({"ADMIN", "SUPER_ADMIN"}))
+    if scope is None:
+        scope = "all" if is_admin else "assigned"
+    if scope == "all" and not is_admin:
+        raise AppException(
+            code="ROLE_INSUFFICIENT",
+            message="当前角色权限不足，无法执行此操作。",
+        )
+    base_stmt = _build_inbox_query(
+        node,
+        approver_user_id=int(context.user.id) if scope == "assigned" else None,
+    )
+
+    total: int | None = None
+    total_is_estimate = False
+    if include_total:
+        # Counting stops at the cap so a large backlog cannot slow the inbox.
+        capped_ids = (
+            base_stmt.with_only_columns(Application.id)
+            .order_by(None)
+            .limit(INBOX_TOTAL_CAP + 1)
+            .subquery()
+        )
+        total = int(db.scalar(select(func.count()).select_from(capped_ids)) or 0)
+        if total > INBOX_TOTAL_CAP:
+            total = INBOX_TOTAL_CAP
+            total_is_estimate = True
+
+    page_stmt = base_stmt.limit(page_size + 1)
+    if cursor:
+        created_at, application_id = _decode_inbox_cursor(cursor)
+        page_stmt = page_stmt.where(
+            or_(
+                Application.created_at > created_at,
+                and_(
+                    Application.created_at == created_at,
+                    Application.id > application_id,
+                ),
+            )
+        )
+    else:
+        page_stmt = page_stmt.offset((page - 1) * page_size)
+    rows = db.execute(page_stmt).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_application = rows[-1][0]
+        next_cursor = _encode_inbox_cursor(
+            last_application.created_at, int(last_application.id)
+        )
 
     application_ids = [application.id for application, _ in rows]
     items_by_application: dict[int, list[dict[str, object]]] = {
@@ -349,7 +497,10 @@ def get_approval_inbox(
             "meta": {
                 "page": page,
                 "page_size": page_size,
-                "total": int(total),
+                "total": total,
+                "total_is_estimate": total_is_estimate,
+                "next_cursor": next_cursor,
+                "scope": scope,
             },
         }
     )
@@ -378,22 +529,7 @@ def get_application_detail(
     ).all()
     sku_ids = sorted({int(sku.id) for _, sku in item_rows})
 
-    serialized_available_rows = (
-        db.execute(
-            select(Asset.sku_id, func.count(Asset.id))
-            .where(
-                Asset.sku_id.in_(sku_ids),
-                Asset.status == AssetStatus.IN_STOCK,
-                Asset.locked_application_id.is_(None),
-            )
-            .group_by(Asset.sku_id)
-        ).all()
-        if sku_ids
-        else []
-    )
-    serialized_available_map = {
-        int(sku_id): int(count) for sku_id, count in serialized_available_rows
-    }
+    serialized_available_map = load_available_asset_counts(db, sku_ids=sku_ids)
 
     quantity_stock_rows = (
         db.scalars(select(SkuStock).where(SkuStock.sku_id.in_(sku_ids))).all()
@@ -573,16 +709,9 @@ def approve_application(
             application.admin_reviewer_user_id = context.user.id
 
             # Quantity-only applications do not require asset assignment; they can proceed to outbound directly.
-            items = db.scalars(
-                select(ApplicationItem).where(ApplicationItem.application_id == application.id)
-            ).all()
-            if items:
-                skus = db.scalars(
-                    select(Sku).where(Sku.id.in_([item.sku_id for item in items]))
-                ).all()
-                if skus and all(row.stock_mode == SkuStockMode.QUANTITY for row in skus):
-                    application.status = ApplicationStatus.READY_OUTBOUND
-                    application.pickup_qr_string = _create_pickup_qr_string(application)
+            if application.id in _quantity_only_application_ids(db, [application.id]):
+                application.status = ApplicationStatus.READY_OUTBOUND
+                application.pickup_qr_string = _create_pickup_qr_string(application)
         else:
             application.status = ApplicationStatus.ADMIN_REJECTED
             application.admin_reviewer_user_id = context.user.id
@@ -594,7 +723,7 @@ def approve_application(
             )
 
     history = ApprovalHistory(
-        id=_next_bigint_id(db, ApprovalHistory),
+        id=allocate_id(db, ApprovalHistory),
         application_id=application.id,
         node=payload.node,
         action=payload.action,
@@ -613,6 +742,133 @@ def approve_application(
     )
 
 
+@router.post("/approvals/batch", response_model=ApiResponse)
+def approve_applications_batch(
+    payload: ApprovalBatchRequest,
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    if payload.node == ApprovalNode.LEADER:
+        _require_any_role(context, {"LEADER"})
+        expected_status = ApplicationStatus.LOCKED
+        event = "leader_approval"
+    else:
+        _require_any_role(context, {"ADMIN", "SUPER_ADMIN"})
+        expected_status = ApplicationStatus.LEADER_APPROVED
+        event = "admin_approval"
+
+    application_ids = list(dict.fromkeys(int(item) for item in payload.application_ids))
+    application_by_id = {
+        int(row.id): row
+        for row in db.scalars(
+            select(Application)
+            .where(Application.id.in_(application_ids))
+            .order_by(Application.id.asc())
+            .with_for_update()
+        ).all()
+    }
+
+    results: list[dict[str, object]] = []
+    accepted: list[Application] = []
+    for application_id in application_ids:
+        application = application_by_id.get(application_id)
+        if application is None:
+            results.append(
+                {
+                    "application_id": application_id,
+                    "success": False,
+                    "error": {"code": "APPLICATION_NOT_FOUND", "message": "申请单不存在。"},
+                }
+            )
+            continue
+        if application.status != expected_status:
+            results.append(
+                {
+                    "application_id": application_id,
+                    "success": False,
+                    "error": {
+                        "code": "APPLICATION_STATUS_INVALID",
+                        "message": "申请单状态不支持该操作。",
+                        "details": {
+                            "current_status": application.status.value,
+                            "expected_status": expected_status.value,
+                            "event": event,
+                        },
+                    },
+                }
+            )
+            continue
+        accepted.append(application)
+        results.append({"application_id": application_id, "success": True})
+
+    if accepted:
+        approve = payload.action == ApprovalAction.APPROVE
+        if payload.node == ApprovalNode.LEADER:
+            next_status = (
+                ApplicationStatus.LEADER_APPROVED if approve else ApplicationStatus.LEADER_REJECTED
+            )
+            for application in accepted:
+                application.status = next_status
+                application.leader_approver_user_id = context.user.id
+        else:
+            next_status = (
+                ApplicationStatus.ADMIN_APPROVED if approve else ApplicationStatus.ADMIN_REJECTED
+            )
+            quantity_only_ids = (
+                _quantity_only_application_ids(db, [row.id for row in accepted])
+                if approve
+                else set()
+            )
+            for application in accepted:
+                application.status = next_status
+                application.admin_reviewer_user_id = context.user.id
+                if application.id in quantity_only_ids:
+                    application.status = ApplicationStatus.READY_OUTBOUND
+                    application.pickup_qr_string = _create_pickup_qr_string(application)
+        if not approve:
+            _unlock_applications_assets(
+                db,
+                applications=accepted,
+                operator_user_id=context.user.id,
+                reason=(
+                    "leader_reject" if payload.node == ApprovalNode.LEADER else "admin_reject"
+                ),
+            )
+
+        history_ids = allocate_ids(db, ApprovalHistory, len(accepted))
+        db.execute(
+            insert(ApprovalHistory.__table__),
+            [
+                {
+                    "id": history_id,
+                    "application_id": int(application.id),
+                    "node": payload.node,
+                    "action": payload.action,
+                    "actor_user_id": int(context.user.id),
+                    "comment": payload.comment,
+                    "ai_recommendation_json": None,
+                }
+                for history_id, application in zip(history_ids, accepted)
+            ],
+        )
+        db.commit()
+
+    status_by_id = {int(application.id): application.status.value for application in accepted}
+    for result in results:
+        if result["success"]:
+            result["status"] = status_by_id[int(result["application_id"])]
+
+    return build_success_response(
+        {
+            "node": payload.node.value,
+            "action": payload.action.value,
+            "succeeded": len(accepted),
+            "failed": len(results) - len(accepted),
+            "results": results,
+        }
+    )
+
+
 @router.post("/applications/{id}/assign-assets", response_model=ApiResponse)
 def assign_application_assets(
     id: int,
@@ -718,8 +974,6 @@ def assign_application_assets(
         )
 
     now = datetime.now(UTC).replace(tzinfo=None)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
-    next_relation_id = _next_bigint_id(db, ApplicationAsset)
     selected_assets_by_id = {asset.id: asset for asset in selected_assets}
 
     current_relations = db.scalars(
@@ -731,6 +985,7 @@ def assign_application_assets(
 
     removed_asset_ids = sorted(current_asset_ids - provided_asset_ids)
     added_asset_ids = sorted(provided_asset_ids - current_asset_ids)
+    stock_flow_ids = iter(allocate_ids(db, StockFlow, len(removed_asset_ids)))
 
     if removed_asset_ids:
         removed_assets = db.scalars(
@@ -752,7 +1007,7 @@ def assign_application_assets(
             asset.locked_application_id = None
             db.add(
                 StockFlow(
-                    id=next_stock_flow_id,
+                    id=next(stock_flow_ids),
                     asset_id=asset.id,
                     action=StockFlowAction.UNLOCK,
                     operator_user_id=context.user.id,
@@ -761,8 +1016,8 @@ def assign_application_assets(
                     meta_json={"event": "assign_assets_rebalance"},
                 )
             )
-            next_stock_flow_id += 1
 
+    assets_to_claim: list[Asset] = []
     for asset_id in added_asset_ids:
         asset = selected_assets_by_id[asset_id]
         if asset.sku_id not in assigned_by_sku:
@@ -772,20 +1027,7 @@ def assign_application_assets(
                 details={"asset_id": asset.id, "sku_id": asset.sku_id},
             )
         if asset.status == AssetStatus.IN_STOCK and asset.locked_application_id is None:
-            asset.status = AssetStatus.LOCKED
-            asset.locked_application_id = application.id
-            db.add(
-                StockFlow(
-                    id=next_stock_flow_id,
-                    asset_id=asset.id,
-                    action=StockFlowAction.LOCK,
-                    operator_user_id=context.user.id,
-                    related_application_id=application.id,
-                    occurred_at=now,
-                    meta_json={"event": "assign_assets_rebalance"},
-                )
-            )
-            next_stock_flow_id += 1
+            assets_to_claim.append(asset)
         elif (
             asset.status == AssetStatus.LOCKED
             and asset.locked_application_id == application.id
@@ -798,6 +1040,26 @@ def assign_application_assets(
                 details={"asset_id": asset.id},
             )
 
+    # The conditional UPDATE re-checks availability, so an asset claimed by a
+    # concurrent request since it was read above is reported, not double-locked.
+    claimed_asset_ids = set(
+        claim_assets(
+            db,
+            application_id=application.id,
+            assets=assets_to_claim,
+            operator_user_id=context.user.id,
+            occurred_at=now,
+            flow_meta={"event": "assign_assets_rebalance"},
+        )
+    )
+    for asset in assets_to_claim:
+        if asset.id not in claimed_asset_ids:
+            raise AppException(
+                code="ASSET_LOCKED",
+                message="该资产当前不可分配。",
+                details={"asset_id": asset.id},
+            )
+
     for asset in selected_assets:
         expected_skus = [
             sku_id for sku_id, ids in assigned_by_sku.items() if asset.id in ids
@@ -812,16 +1074,22 @@ def assign_application_assets(
     db.query(ApplicationAsset).filter(
         ApplicationAsset.application_id == application.id
     ).delete()
+    relation_ids = iter(
+        allocate_ids(
+            db,
+            ApplicationAsset,
+            sum(len(entry.asset_ids) for entry in payload.assignments),
+        )
+    )
     for entry in payload.assignments:
         for asset_id in entry.asset_ids:
             db.add(
                 ApplicationAsset(
-                    id=next_relation_id,
+                    id=next(relation_ids),
                     application_id=application.id,
                     asset_id=asset_id,
                 )
             )
-            next_relation_id += 1
 
     application.status = ApplicationStatus.READY_OUTBOUND
     application.pickup_qr_string = _create_pickup_qr_string(application)
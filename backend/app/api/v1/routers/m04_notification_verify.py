@@ -6,7 +6,7 @@ from datetime import UTC, datetime
 from typing import Sequence
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
@@ -18,6 +18,8 @@ from ....models.inventory import Asset
 from ....models.notification import NotificationOutbox
 from ....schemas.common import ApiResponse, build_success_response
 from ....schemas.m04 import NotificationTestRequest, PickupVerifyRequest
+from ....services.id_allocation_service import allocate_id
+from ....services.pickup_lookup_service import find_pickup_application
 
 router = APIRouter(tags=["M04"])
 
@@ -30,11 +32,6 @@ def _to_iso8601(value: datetime) -> str:
     return normalized.isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
 def _require_admin(context: AuthContext) -> None:
     if context.roles.intersection({"ADMIN", "SUPER_ADMIN"}):
         return
@@ -67,16 +64,9 @@ def _resolve_application_by_verify(
             message="核验值不能为空。",
         )
 
-    if verify_type == "QR":
-        stmt = (
-            select(Application)
-            .where(Application.pickup_qr_string == candidate)
-            .limit(1)
-        )
-    else:
-        stmt = select(Application).where(Application.pickup_code == candidate).limit(1)
-
-    application = db.scalar(stmt)
+    application = find_pickup_application(
+        db, by_qr=verify_type == "QR", value=candidate
+    )
     if application is None:
         raise AppException(
             code="PICKUP_CODE_INVALID",
@@ -217,7 +207,7 @@ def send_test_notification(
     now = datetime.now(UTC).replace(tzinfo=None)
     message = payload.message.strip() if payload.message else "步骤 13 测试通知"
     outbox = NotificationOutbox(
-        id=_next_bigint_id(db, NotificationOutbox),
+        id=allocate_id(db, NotificationOutbox),
         channel=payload.channel,
         receiver=payload.receiver.strip(),
         template_key="TEST_NOTIFICATION",
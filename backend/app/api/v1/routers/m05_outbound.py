@@ -2,15 +2,34 @@
 
 from __future__ import annotations
 
+import base64
 import csv
+import heapq
 import io
 import json
+from collections.abc import Callable, Iterator
+from contextlib import closing
+from dataclasses import dataclass
 from datetime import UTC, datetime
+from operator import itemgetter
 from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy import String, cast, func, or_, select
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    Row,
+    Select,
+    String,
+    and_,
+    cast,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    union_all,
+)
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
@@ -35,9 +54,22 @@ from ....models.inventory import Asset, StockFlow
 from ....models.notification import UserAddress
 from ....models.organization import SysUser
 from ....models.sku_stock import SkuStockFlow
-from ....schemas.common import ApiResponse, build_success_response
-from ....schemas.m05 import OutboundConfirmPickupRequest, OutboundShipRequest
-from ....services.sku_stock_service import apply_stock_delta
+from ....schemas.common import ApiResponse, build_success_response, success_json
+from ....schemas.m05 import (
+    OutboundConfirmPickupRequest,
+    OutboundShipBatchEntry,
+    OutboundShipBatchRequest,
+    OutboundShipRequest,
+)
+from ....services.asset_reservation_service import reserve_assets
+from ....services.id_allocation_service import allocate_id, allocate_ids
+from ....services.import_file_service import (
+    iter_csv_import_rows,
+    normalize_import_header,
+)
+from ....services.pickup_lookup_service import find_pickup_application
+from ....services.sku_asset_counter_service import load_available_asset_counts
+from ....services.sku_stock_service import StockDelta, apply_stock_deltas
 
 router = APIRouter(tags=["M05"])
 PERMISSION_OUTBOUND_READ = "OUTBOUND:READ"
@@ -57,18 +89,6 @@ def _to_naive_utc(value: datetime) -> datetime:
     return value.astimezone(UTC).replace(tzinfo=None)
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    # Cache per-session counters to avoid duplicate ids before transaction flush.
-    cache_key = f"next_bigint_id:{getattr(model, '__tablename__', model.__name__)}"
-    cached_value = db.info.get(cache_key)
-    if cached_value is None:
-        value = db.scalar(select(func.max(getattr(model, "id"))))
-        cached_value = int(value or 0)
-    next_value = int(cached_value) + 1
-    db.info[cache_key] = next_value
-    return next_value
-
-
 def _normalize_required_permissions(
     required_permissions: set[str] | None,
 ) -> set[str]:
@@ -229,6 +249,7 @@ def _auto_assign_assets(
     for asset in existing_locked_assets:
         existing_locked_by_sku.setdefault(int(asset.sku_id), []).append(asset)
 
+    now = datetime.now(UTC).replace(tzinfo=None)
     selected_assets: list[Asset] = []
     extra_locked_assets: list[Asset] = []
     shortfall_by_sku: dict[int, int] = {}
@@ -242,31 +263,42 @@ def _auto_assign_assets(
         if missing_qty > 0:
             shortfall_by_sku[sku_id] = missing_qty
 
-    available_by_sku: dict[int, list[Asset]] = {}
-    if shortfall_by_sku:
-        available_assets = db.scalars(
-            select(Asset)
-            .where(
-                Asset.sku_id.in_(shortfall_by_sku.keys()),
-                Asset.status == AssetStatus.IN_STOCK,
-                Asset.locked_application_id.is_(None),
-            )
-            .order_by(Asset.id.asc())
-        ).all()
-        for asset in available_assets:
-            available_by_sku.setdefault(int(asset.sku_id), []).append(asset)
+    # Reject shortfalls from the per-SKU counters before touching any asset rows.
+    available_count_by_sku = load_available_asset_counts(
+        db, sku_ids=list(shortfall_by_sku.keys())
+    )
+    claimed_by_sku: dict[int, int] = {}
+    claimed_asset_ids: list[int] = []
+    if all(
+        available_count_by_sku.get(sku_id, 0) >= missing_qty
+        for sku_id, missing_qty in shortfall_by_sku.items()
+    ):
+        reservation = reserve_assets(
+            db,
+            application_id=application.id,
+            quantities=list(shortfall_by_sku.items()),
+            operator_user_id=operator_user_id,
+            occurred_at=now,
+            flow_meta={"event": "auto_assign_outbound"},
+            link_to_application=False,
+        )
+        claimed_by_sku = {
+            sku_id: len(asset_ids)
+            for sku_id, asset_ids in reservation.asset_ids_by_sku.items()
+        }
+        claimed_asset_ids = reservation.asset_ids
 
     insufficient_assets: list[dict[str, Any]] = []
     for sku_id, missing_qty in shortfall_by_sku.items():
-        available = available_by_sku.get(sku_id, [])
-        if len(available) < missing_qty:
+        available_count = claimed_by_sku.get(sku_id, available_count_by_sku.get(sku_id, 0))
+        if available_count < missing_qty:
             sku = sku_by_id.get(sku_id)
             insufficient_assets.append(
                 {
                     "sku_id": sku_id,
                     "sku_name": f"{sku.brand} {sku.model}" if sku else "Unknown",
                     "required": required_by_sku[sku_id],
-                    "available": len(existing_locked_by_sku.get(sku_id, [])) + len(available),
+                    "available": len(existing_locked_by_sku.get(sku_id, [])) + available_count,
                 }
             )
 
@@ -277,30 +309,12 @@ def _auto_assign_assets(
             details={"insufficient_items": insufficient_assets},
         )
 
-    assets_to_lock: list[Asset] = []
-    for sku_id, missing_qty in shortfall_by_sku.items():
-        assets_to_lock.extend(available_by_sku.get(sku_id, [])[:missing_qty])
-
-    now = datetime.now(UTC).replace(tzinfo=None)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
-    next_relation_id = _next_bigint_id(db, ApplicationAsset)
-
-    for asset in assets_to_lock:
-        asset.status = AssetStatus.LOCKED
-        asset.locked_application_id = application.id
-        db.add(
-            StockFlow(
-                id=next_stock_flow_id,
-                asset_id=asset.id,
-                action=StockFlowAction.LOCK,
-                operator_user_id=operator_user_id,
-                related_application_id=application.id,
-                occurred_at=now,
-                meta_json={"event": "auto_assign_outbound"},
-            )
+    if claimed_asset_ids:
+        selected_assets.extend(
+            db.scalars(select(Asset).where(Asset.id.in_(claimed_asset_ids))).all()
         )
-        next_stock_flow_id += 1
-    selected_assets.extend(assets_to_lock)
+
+    stock_flow_ids = iter(allocate_ids(db, StockFlow, len(extra_locked_assets)))
 
     # If this application has more locked assets than required, release the extras.
     for asset in extra_locked_assets:
@@ -308,7 +322,7 @@ def _auto_assign_assets(
         asset.locked_application_id = None
         db.add(
             StockFlow(
-                id=next_stock_flow_id,
+                id=next(stock_flow_ids),
                 asset_id=asset.id,
                 action=StockFlowAction.UNLOCK,
                 operator_user_id=operator_user_id,
@@ -317,19 +331,19 @@ def _auto_assign_assets(
                 meta_json={"event": "auto_assign_outbound_rebalance"},
             )
         )
-        next_stock_flow_id += 1
 
     # Rebuild relations to keep a single, exact mapping between application and selected assets.
     db.query(ApplicationAsset).filter(ApplicationAsset.application_id == application.id).delete()
-    for asset_id in sorted({int(asset.id) for asset in selected_assets}):
+    selected_asset_ids = sorted({int(asset.id) for asset in selected_assets})
+    relation_ids = iter(allocate_ids(db, ApplicationAsset, len(selected_asset_ids)))
+    for asset_id in selected_asset_ids:
         db.add(
             ApplicationAsset(
-                id=next_relation_id,
+                id=next(relation_ids),
                 application_id=application.id,
                 asset_id=asset_id,
             )
         )
-        next_relation_id += 1
 
     application.status = ApplicationStatus.READY_OUTBOUND
 
@@ -504,6 +518,7 @@ def _resolve_pickup_application(
     *,
     verify_type: str,
     value: str,
+    for_update: bool = False,
 ) -> Application:
     candidate = value.strip()
     if not candidate:
@@ -527,7 +542,7 @@ def _resolve_pickup_application(
                 message="申请单编号核验值必须为正整数。",
                 details={"value": candidate},
             )
-        application = db.get(Application, application_id)
+        application = db.get(Application, application_id, with_for_update=for_update)
         if application is None:
             raise AppException(
                 code="APPLICATION_NOT_FOUND",
@@ -535,15 +550,9 @@ def _resolve_pickup_application(
             )
         return application
 
-    if verify_type == "QR":
-        stmt = (
-            select(Application)
-            .where(Application.pickup_qr_string == candidate)
-            .limit(1)
-        )
-    else:
-        stmt = select(Application).where(Application.pickup_code == candidate).limit(1)
-    application = db.scalar(stmt)
+    application = find_pickup_application(
+        db, by_qr=verify_type == "QR", value=candidate, for_update=for_update
+    )
     if application is None:
         raise AppException(
             code="PICKUP_CODE_INVALID",
@@ -569,7 +578,7 @@ def _apply_outbound_asset_transition(
         )
 
     now = datetime.now(UTC).replace(tzinfo=None)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
+    stock_flow_ids = iter(allocate_ids(db, StockFlow, len(assets)))
     for asset in assets:
         if (
             asset.status != AssetStatus.LOCKED
@@ -595,7 +604,7 @@ def _apply_outbound_asset_transition(
 
         db.add(
             StockFlow(
-                id=next_stock_flow_id,
+                id=next(stock_flow_ids),
                 asset_id=asset.id,
                 action=action,
                 operator_user_id=operator_user_id,
@@ -604,7 +613,6 @@ def _apply_outbound_asset_transition(
                 meta_json=meta_json,
             )
         )
-        next_stock_flow_id += 1
 
 
 def _release_remaining_locked_assets(
@@ -628,13 +636,13 @@ def _release_remaining_locked_assets(
         return []
 
     now = datetime.now(UTC).replace(tzinfo=None)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
+    stock_flow_ids = iter(allocate_ids(db, StockFlow, len(locked_assets)))
     for asset in locked_assets:
         asset.status = AssetStatus.IN_STOCK
         asset.locked_application_id = None
         db.add(
             StockFlow(
-                id=next_stock_flow_id,
+                id=next(stock_flow_ids),
                 asset_id=asset.id,
                 action=StockFlowAction.UNLOCK,
                 operator_user_id=operator_user_id,
@@ -643,7 +651,6 @@ def _release_remaining_locked_assets(
                 meta_json={"event": event},
             )
         )
-        next_stock_flow_id += 1
     return list(locked_assets)
 
 
@@ -652,34 +659,63 @@ def _resolve_receiver_snapshot(
     *,
     applicant_user_id: int,
 ) -> dict[str, str]:
-    address = db.scalar(
+    return _resolve_receiver_snapshots(db, applicant_user_ids=[applicant_user_id])[
+        applicant_user_id
+    ]
+
+
+def _resolve_receiver_snapshots(
+    db: Session,
+    *,
+    applicant_user_ids: list[int],
+) -> dict[int, dict[str, str]]:
+    snapshots: dict[int, dict[str, str]] = {}
+    if not applicant_user_ids:
+        return snapshots
+
+    # The default address, else the oldest one, of every applicant in one query.
+    addresses = db.scalars(
         select(UserAddress)
-        .where(UserAddress.user_id == applicant_user_id)
-        .order_by(UserAddress.is_default.desc(), UserAddress.id.asc())
-        .limit(1)
-    )
-    if address is not None:
-        return {
-            "receiver_name": address.receiver_name,
-            "receiver_phone": address.receiver_phone,
-            "province": address.province,
-            "city": address.city,
-            "district": address.district,
-            "detail": address.detail,
-        }
+        .where(UserAddress.user_id.in_(applicant_user_ids))
+        .order_by(
+            UserAddress.user_id.asc(),
+            UserAddress.is_default.desc(),
+            UserAddress.id.asc(),
+        )
+    ).all()
+    for address in addresses:
+        snapshots.setdefault(
+            int(address.user_id),
+            {
+                "receiver_name": address.receiver_name,
+                "receiver_phone": address.receiver_phone,
+                "province": address.province,
+                "city": address.city,
+                "district": address.district,
+                "detail": address.detail,
+            },
+        )
 
-    applicant = db.get(SysUser, applicant_user_id)
-    receiver_name = (
-        applicant.name if applicant is not None else f"\u7528\u6237-{applicant_user_id}"
-    )
-    return {
-        "receiver_name": receiver_name,
-        "receiver_phone": "\u672a\u77e5",
-        "province": "\u672a\u77e5",
-        "city": "\u672a\u77e5",
-        "district": "\u672a\u77e5",
-        "detail": "\u672a\u77e5",
-    }
+    missing_user_ids = [
+        user_id for user_id in dict.fromkeys(applicant_user_ids) if user_id not in snapshots
+    ]
+    if missing_user_ids:
+        name_by_user_id = {
+            int(user_id): name
+            for user_id, name in db.execute(
+                select(SysUser.id, SysUser.name).where(SysUser.id.in_(missing_user_ids))
+            ).all()
+        }
+        for user_id in missing_user_ids:
+            snapshots[user_id] = {
+                "receiver_name": name_by_user_id.get(user_id, f"\u7528\u6237-{user_id}"),
+                "receiver_phone": "\u672a\u77e5",
+                "province": "\u672a\u77e5",
+                "city": "\u672a\u77e5",
+                "district": "\u672a\u77e5",
+                "detail": "\u672a\u77e5",
+            }
+    return snapshots
 
 
 @router.get("/outbound/pickup-queue", response_model=ApiResponse)
@@ -748,10 +784,12 @@ def confirm_pickup_outbound(
 ) -> ApiResponse:
     _require_admin(context)
 
+    # Locked so two counters scanning the same code cannot both pass the status check.
     application = _resolve_pickup_application(
         db,
         verify_type=payload.verify_type,
         value=payload.value,
+        for_update=True,
     )
     if application.delivery_type != DeliveryType.PICKUP:
         raise AppException(
@@ -804,20 +842,23 @@ def confirm_pickup_outbound(
         delivered_assets = assigned_assets
 
     now = datetime.now(UTC).replace(tzinfo=None)
-    for item in items:
-        if mode_by_sku_id.get(int(item.sku_id)) != SkuStockMode.QUANTITY:
-            continue
-        apply_stock_delta(
-            db,
-            sku_id=item.sku_id,
-            action=SkuStockFlowAction.OUTBOUND,
-            on_hand_delta=-int(item.quantity),
-            reserved_delta=-int(item.quantity),
-            operator_user_id=context.user.id,
-            related_application_id=application.id,
-            occurred_at=now,
-            meta_json={"event": "confirm_pickup"},
-        )
+    apply_stock_deltas(
+        db,
+        deltas=[
+            StockDelta(
+                sku_id=item.sku_id,
+                action=SkuStockFlowAction.OUTBOUND,
+                on_hand_delta=-int(item.quantity),
+                reserved_delta=-int(item.quantity),
+                meta_json={"event": "confirm_pickup"},
+            )
+            for item in items
+            if mode_by_sku_id.get(int(item.sku_id)) == SkuStockMode.QUANTITY
+        ],
+        operator_user_id=context.user.id,
+        related_application_id=application.id,
+        occurred_at=now,
+    )
 
     _release_remaining_locked_assets(
         db,
@@ -980,20 +1021,23 @@ def ship_express_outbound(
         if payload.shipped_at is not None
         else datetime.now(UTC).replace(tzinfo=None)
     )
-    for item in items:
-        if mode_by_sku_id.get(int(item.sku_id)) != SkuStockMode.QUANTITY:
-            continue
-        apply_stock_delta(
-            db,
-            sku_id=item.sku_id,
-            action=SkuStockFlowAction.SHIP,
-            on_hand_delta=-int(item.quantity),
-            reserved_delta=-int(item.quantity),
-            operator_user_id=context.user.id,
-            related_application_id=application.id,
-            occurred_at=now,
-            meta_json={"event": "ship_express", "carrier": payload.carrier, "tracking_no": payload.tracking_no},
-        )
+    apply_stock_deltas(
+        db,
+        deltas=[
+            StockDelta(
+                sku_id=item.sku_id,
+                action=SkuStockFlowAction.SHIP,
+                on_hand_delta=-int(item.quantity),
+                reserved_delta=-int(item.quantity),
+                meta_json={"event": "ship_express", "carrier": payload.carrier, "tracking_no": payload.tracking_no},
+            )
+            for item in items
+            if mode_by_sku_id.get(int(item.sku_id)) == SkuStockMode.QUANTITY
+        ],
+        operator_user_id=context.user.id,
+        related_application_id=application.id,
+        occurred_at=now,
+    )
 
     _release_remaining_locked_assets(
         db,
@@ -1017,7 +1061,7 @@ def ship_express_outbound(
 
     if logistics is None:
         logistics = Logistics(
-            id=_next_bigint_id(db, Logistics),
+            id=allocate_id(db, Logistics),
             application_id=application.id,
             receiver_name=receiver_snapshot["receiver_name"],
             receiver_phone=receiver_snapshot["receiver_phone"],
@@ -1054,6 +1098,583 @@ def ship_express_outbound(
     )
 
 
+SHIP_BATCH_CHUNK_SIZE = 100
+MAX_SHIP_BATCH_ROWS = 2000
+
+_STOCK_FLOW_TABLE = StockFlow.__table__
+_LOGISTICS_TABLE = Logistics.__table__
+
+
+@dataclass(frozen=True, slots=True)
+class _ShipBatchRow:
+    # 1-based item index for JSON bodies, line number for CSV files.
+    row: int
+    application_id: int
+    carrier: str
+    tracking_no: str
+
+
+class _ShipBatchRowFailed(Exception):
+    def __init__(self, row: _ShipBatchRow, error: AppException) -> None:
+        super().__init__(error.message)
+        self.row = row
+        self.error = error
+
+
+def _ship_batch_error(error: AppException) -> dict[str, object]:
+    payload: dict[str, object] = {"code": error.code, "message": error.message}
+    if error.details:
+        payload["details"] = error.details
+    return payload
+
+
+def _insert_stock_flows(
+    db: Session,
+    *,
+    flows: list[tuple[int, int]],
+    action: StockFlowAction,
+    operator_user_id: int,
+    occurred_at: datetime,
+    meta_by_application: dict[int, dict[str, object]],
+) -> None:
+    """Insert one flow per ``(asset_id, application_id)`` in a single statement."""
+
+    if not flows:
+        return
+    flow_ids = allocate_ids(db, StockFlow, len(flows))
+    db.execute(
+        insert(_STOCK_FLOW_TABLE),
+        [
+            {
+                "id": flow_id,
+                "asset_id": asset_id,
+                "action": action,
+                "operator_user_id": int(operator_user_id),
+                "related_application_id": application_id,
+                "occurred_at": occurred_at,
+                "meta_json": meta_by_application[application_id],
+            }
+            for flow_id, (asset_id, application_id) in zip(flow_ids, flows)
+        ],
+    )
+
+
+def _write_express_shipments(
+    db: Session,
+    *,
+    rows: list[_ShipBatchRow],
+    operator_user_id: int,
+    shipped_at: datetime,
+) -> tuple[list[tuple[_ShipBatchRow, Application, int]], dict[int, AppException]]:
+    """Run the ship state machine for one chunk without committing.
+
+    Rows are validated against set-based loads before anything is written;
+    rejected rows are returned keyed by row number. Raises
+    ``_ShipBatchRowFailed`` when a row fails mid-write (auto-assignment
+    running out of assets), after which the caller must roll back.
+    """
+
+    rejected: dict[int, AppException] = {}
+    application_by_id = {
+        int(application.id): application
+        for application in db.scalars(
+            select(Application)
+            .where(Application.id.in_({row.application_id for row in rows}))
+            .order_by(Application.id.asc())
+            .with_for_update()
+        ).all()
+    }
+
+    accepted: list[tuple[_ShipBatchRow, Application, bool]] = []
+    seen_application_ids: set[int] = set()
+    for row in rows:
+        application = application_by_id.get(row.application_id)
+        try:
+            if row.application_id in seen_application_ids:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message="发货清单中申请单重复。",
+                    details={"application_id": row.application_id},
+                )
+            seen_application_ids.add(row.application_id)
+            if application is None:
+                raise AppException(
+                    code="APPLICATION_NOT_FOUND",
+                    message="申请单不存在。",
+                )
+            if application.delivery_type != DeliveryType.EXPRESS:
+                raise AppException(
+                    code="APPLICATION_STATUS_INVALID",
+                    message="申请单交付方式不是快递。",
+                    details={"application_id": application.id},
+                )
+            needs_auto_assign = not _assert_application_status(
+                application,
+                expected=ApplicationStatus.READY_OUTBOUND,
+                event="ship_express",
+            )
+        except AppException as error:
+            rejected[row.row] = error
+            continue
+        accepted.append((row, application, needs_auto_assign))
+
+    application_ids = [int(application.id) for _, application, _ in accepted]
+    items_by_application = _load_application_items(db, application_ids=application_ids)
+    sku_ids = {
+        int(item.sku_id) for items in items_by_application.values() for item in items
+    }
+    mode_by_sku_id = {
+        int(sku_id): stock_mode
+        for sku_id, stock_mode in db.execute(
+            select(Sku.id, Sku.stock_mode).where(Sku.id.in_(sku_ids))
+        ).all()
+    }
+
+    # Assets already assigned to every ready application, in one query.
+    assigned_by_application: dict[int, list[Asset]] = {}
+    ready_serialized_ids = [
+        int(application.id)
+        for _, application, needs_auto_assign in accepted
+        if not needs_auto_assign
+        and any(
+            mode_by_sku_id.get(int(item.sku_id)) != SkuStockMode.QUANTITY
+            for item in items_by_application[int(application.id)]
+        )
+    ]
+    if ready_serialized_ids:
+        for application_id, asset in db.execute(
+            select(ApplicationAsset.application_id, Asset)
+            .join(Asset, Asset.id == ApplicationAsset.asset_id)
+            .where(ApplicationAsset.application_id.in_(ready_serialized_ids))
+            .order_by(Asset.id.asc())
+        ).all():
+            assigned_by_application.setdefault(int(application_id), []).append(asset)
+
+    shippable: list[tuple[_ShipBatchRow, Application, bool]] = []
+    for row, application, needs_auto_assign in accepted:
+        if int(application.id) in ready_serialized_ids:
+            assets = assigned_by_application.get(int(application.id), [])
+            if not assets:
+                rejected[row.row] = AppException(
+                    code="ASSET_NOT_FOUND",
+                    message="申请单未分配任何资产。",
+                )
+                continue
+            foreign = next(
+                (
+                    asset
+                    for asset in assets
+                    if asset.status != AssetStatus.LOCKED
+                    or asset.locked_application_id != application.id
+                ),
+                None,
+            )
+            if foreign is not None:
+                rejected[row.row] = AppException(
+                    code="ASSET_LOCKED",
+                    message="资产未被当前申请单锁定。",
+                    details={
+                        "asset_id": foreign.id,
+                        "asset_status": foreign.status.value,
+                        "locked_application_id": foreign.locked_application_id,
+                    },
+                )
+                continue
+        shippable.append((row, application, needs_auto_assign))
+
+    meta_by_application: dict[int, dict[str, object]] = {}
+    delivered_by_application: dict[int, list[Asset]] = {}
+    for row, application, needs_auto_assign in shippable:
+        meta_by_application[int(application.id)] = {
+            "event": "ship_express",
+            "carrier": row.carrier,
+            "tracking_no": row.tracking_no,
+        }
+        if needs_auto_assign:
+            try:
+                delivered_by_application[int(application.id)] = _auto_assign_assets(
+                    db,
+                    application=application,
+                    operator_user_id=operator_user_id,
+                )
+            except AppException as error:
+                raise _ShipBatchRowFailed(row, error) from error
+        else:
+            delivered_by_application[int(application.id)] = assigned_by_application.get(
+                int(application.id), []
+            )
+
+    ship_flows: list[tuple[int, int]] = []
+    for application_id, assets in delivered_by_application.items():
+        applicant_user_id = application_by_id[application_id].applicant_user_id
+        for asset in assets:
+            asset.status = AssetStatus.IN_USE
+            asset.holder_user_id = applicant_user_id
+            asset.locked_application_id = None
+            ship_flows.append((int(asset.id), application_id))
+    _insert_stock_flows(
+        db,
+        flows=ship_flows,
+        action=StockFlowAction.SHIP,
+        operator_user_id=operator_user_id,
+        occurred_at=shipped_at,
+        meta_by_application=meta_by_application,
+    )
+
+    apply_stock_deltas(
+        db,
+        deltas=[
+            StockDelta(
+                sku_id=item.sku_id,
+                action=SkuStockFlowAction.SHIP,
+                on_hand_delta=-int(item.quantity),
+                reserved_delta=-int(item.quantity),
+                meta_json=meta_by_application[int(application.id)],
+                related_application_id=int(application.id),
+            )
+            for _, application, _ in shippable
+            for item in items_by_application[int(application.id)]
+            if mode_by_sku_id.get(int(item.sku_id)) == SkuStockMode.QUANTITY
+        ],
+        operator_user_id=operator_user_id,
+        related_application_id=None,
+        occurred_at=shipped_at,
+    )
+
+    # Session uses autoflush=False; flush first so we don't unlock just-shipped assets.
+    db.flush()
+    shipped_ids = [int(application.id) for _, application, _ in shippable]
+    leftover_assets = (
+        db.scalars(
+            select(Asset)
+            .where(
+                Asset.locked_application_id.in_(shipped_ids),
+                Asset.status == AssetStatus.LOCKED,
+            )
+            .order_by(Asset.id.asc())
+        ).all()
+        if shipped_ids
+        else []
+    )
+    cleanup_flows: list[tuple[int, int]] = []
+    for asset in leftover_assets:
+        cleanup_flows.append((int(asset.id), int(asset.locked_application_id)))
+        asset.status = AssetStatus.IN_STOCK
+        asset.locked_application_id = None
+    _insert_stock_flows(
+        db,
+        flows=cleanup_flows,
+        action=StockFlowAction.UNLOCK,
+        operator_user_id=operator_user_id,
+        occurred_at=shipped_at,
+        meta_by_application={
+            application_id: {"event": "ship_express_cleanup"} for application_id in shipped_ids
+        },
+    )
+
+    logistics_by_application = (
+        {
+            int(logistics.application_id): logistics
+            for logistics in db.scalars(
+                select(Logistics).where(Logistics.application_id.in_(shipped_ids))
+            ).all()
+        }
+        if shipped_ids
+        else {}
+    )
+    receiver_snapshots = _resolve_receiver_snapshots(
+        db,
+        applicant_user_ids=[
+            int(application.applicant_user_id)
+            for _, application, _ in shippable
+            if int(application.id) not in logistics_by_application
+        ],
+    )
+    new_logistics: list[dict[str, object]] = []
+    for row, application, _ in shippable:
+        logistics = logistics_by_application.get(int(application.id))
+        if logistics is None:
+            new_logistics.append(
+                {
+                    "application_id": int(application.id),
+                    **receiver_snapshots[int(application.applicant_user_id)],
+                    "carrier": row.carrier,
+                    "tracking_no": row.tracking_no,
+                    "shipped_at": shipped_at,
+                }
+            )
+        else:
+            # Keep the receiver already recorded; the manifest only carries tracking data.
+            logistics.carrier = row.carrier
+            logistics.tracking_no = row.tracking_no
+            logistics.shipped_at = shipped_at
+        application.status = ApplicationStatus.SHIPPED
+    if new_logistics:
+        logistics_ids = allocate_ids(db, Logistics, len(new_logistics))
+        db.execute(
+            insert(_LOGISTICS_TABLE),
+            [
+                {"id": logistics_id, **values}
+                for logistics_id, values in zip(logistics_ids, new_logistics)
+            ],
+        )
+
+    return (
+        [
+            (row, application, len(delivered_by_application[int(application.id)]))
+            for row, application, _ in shippable
+        ],
+        rejected,
+    )
+
+
+def _ship_batch_failure(row: _ShipBatchRow, error: AppException) -> dict[str, object]:
+    return {
+        "row": row.row,
+        "application_id": row.application_id,
+        "success": False,
+        "error": _ship_batch_error(error),
+    }
+
+
+def _ship_express_chunk(
+    db: Session,
+    *,
+    rows: list[_ShipBatchRow],
+    operator_user_id: int,
+    shipped_at: datetime,
+    results: dict[int, dict[str, object]],
+) -> None:
+    """Ship one chunk in a single transaction, recording a result per row.
+
+    A row failing mid-write rolls the chunk back; it is reported and the rest
+    of the chunk is retried. A chunk-level failure (a quantity SKU running
+    short across the chunk) does not name a row, so the chunk is then shipped
+    one row at a time and only the rows that still fail are reported.
+    """
+
+    pending = rows
+    while pending:
+        try:
+            shipped, rejected = _write_express_shipments(
+                db,
+                rows=pending,
+                operator_user_id=operator_user_id,
+                shipped_at=shipped_at,
+            )
+            db.commit()
+        except _ShipBatchRowFailed as failure:
+            db.rollback()
+            results[failure.row.row] = _ship_batch_failure(failure.row, failure.error)
+            pending = [row for row in pending if row is not failure.row]
+            continue
+        except AppException as error:
+            db.rollback()
+            if len(pending) == 1:
+                results[pending[0].row] = _ship_batch_failure(pending[0], error)
+                return
+            for row in pending:
+                _ship_express_chunk(
+                    db,
+                    rows=[row],
+                    operator_user_id=operator_user_id,
+                    shipped_at=shipped_at,
+                    results=results,
+                )
+            return
+
+        for row in pending:
+            if row.row in rejected:
+                results[row.row] = _ship_batch_failure(row, rejected[row.row])
+        for row, application, delivered_asset_count in shipped:
+            results[row.row] = {
+                "row": row.row,
+                "application_id": int(application.id),
+                "success": True,
+                "status": application.status.value,
+                "carrier": row.carrier,
+                "tracking_no": row.tracking_no,
+                "delivered_asset_count": delivered_asset_count,
+            }
+        return
+
+
+def _ship_express_batch(
+    db: Session,
+    *,
+    rows: list[_ShipBatchRow],
+    operator_user_id: int,
+    shipped_at: datetime,
+) -> dict[int, dict[str, object]]:
+    """Ship manifest rows in chunks, committing each chunk on its own.
+
+    Returns a result per row number; one bad parcel never blocks its
+    neighbours (see ``_ship_express_chunk``).
+    """
+
+    results: dict[int, dict[str, object]] = {}
+    for start in range(0, len(rows), SHIP_BATCH_CHUNK_SIZE):
+        _ship_express_chunk(
+            db,
+            rows=rows[start : start + SHIP_BATCH_CHUNK_SIZE],
+            operator_user_id=operator_user_id,
+            shipped_at=shipped_at,
+            results=results,
+        )
+    return results
+
+
+def _build_ship_batch_response(
+    results: dict[int, dict[str, object]],
+    *,
+    extra_failures: list[dict[str, object]] | None = None,
+) -> ApiResponse:
+    ordered = sorted(
+        [*results.values(), *(extra_failures or [])], key=itemgetter("row")
+    )
+    succeeded = sum(1 for result in ordered if result["success"])
+    return build_success_response(
+        {
+            "total": len(ordered),
+            "succeeded": succeeded,
+            "failed": len(ordered) - succeeded,
+            "results": ordered,
+        }
+    )
+
+
+def _parse_ship_manifest_csv(
+    file: UploadFile,
+) -> tuple[list[_ShipBatchRow], list[dict[str, object]]]:
+    """Read ``application_id,carrier,tracking_no`` rows from a carrier manifest.
+
+    Malformed lines are returned as failures instead of aborting the import.
+    """
+
+    rows: list[_ShipBatchRow] = []
+    failures: list[dict[str, object]] = []
+    with closing(iter_csv_import_rows(file)) as lines:
+        header = [normalize_import_header(value) for value in next(lines, ())]
+        required = ("application_id", "carrier", "tracking_no")
+        missing = [column for column in required if column not in header]
+        if missing:
+            raise AppException(
+                code="VALIDATION_ERROR",
+                message="发货清单缺少必要列。",
+                details={"missing_columns": missing},
+            )
+        indexes = {column: header.index(column) for column in required}
+
+        for line_number, line in enumerate(lines, start=2):
+            if not any(str(value).strip() for value in line):
+                continue
+            if len(rows) + len(failures) >= MAX_SHIP_BATCH_ROWS:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message=f"单次最多导入 {MAX_SHIP_BATCH_ROWS} 条发货记录。",
+                )
+            values = {
+                column: str(line[index]).strip() if index < len(line) else ""
+                for column, index in indexes.items()
+            }
+            try:
+                entry = OutboundShipBatchEntry.model_validate(values)
+            except ValidationError as error:
+                failures.append(
+                    {
+                        "row": line_number,
+                        "application_id": None,
+                        "success": False,
+                        "error": {
+                            "code": "VALIDATION_ERROR",
+                            "message": "发货记录格式无效。",
+                            "details": {
+                                "fields": sorted(
+                                    {str(item["loc"][0]) for item in error.errors()}
+                                )
+                            },
+                        },
+                    }
+                )
+                continue
+            rows.append(
+                _ShipBatchRow(
+                    row=line_number,
+                    application_id=entry.application_id,
+                    carrier=entry.carrier,
+                    tracking_no=entry.tracking_no,
+                )
+            )
+    return rows, failures
+
+
+@router.post("/outbound/ship/batch", response_model=ApiResponse)
+def ship_express_outbound_batch(
+    payload: OutboundShipBatchRequest,
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    _require_admin(context)
+
+    rows = [
+        _ShipBatchRow(
+            row=index,
+            application_id=entry.application_id,
+            carrier=entry.carrier,
+            tracking_no=entry.tracking_no,
+        )
+        for index, entry in enumerate(payload.items, start=1)
+    ]
+    shipped_at = (
+        _to_naive_utc(payload.shipped_at)
+        if payload.shipped_at is not None
+        else datetime.now(UTC).replace(tzinfo=None)
+    )
+    return _build_ship_batch_response(
+        _ship_express_batch(
+            db, rows=rows, operator_user_id=context.user.id, shipped_at=shipped_at
+        )
+    )
+
+
+@router.post("/outbound/ship/batch/import", response_model=ApiResponse)
+def import_express_shipments(
+    file: UploadFile = File(...),
+    shipped_at: datetime | None = Form(default=None),
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    _require_admin(context)
+
+    if not (file.filename or "").lower().endswith(".csv"):
+        raise AppException(
+            code="UNSUPPORTED_MEDIA_TYPE",
+            message="发货清单仅支持 csv 文件。",
+        )
+    rows, failures = _parse_ship_manifest_csv(file)
+    if not rows and not failures:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="发货清单中没有数据。",
+        )
+    results = _ship_express_batch(
+        db,
+        rows=rows,
+        operator_user_id=context.user.id,
+        shipped_at=(
+            _to_naive_utc(shipped_at)
+            if shipped_at is not None
+            else datetime.now(UTC).replace(tzinfo=None)
+        ),
+    )
+    return _build_ship_batch_response(results, extra_failures=failures)
+
+
+OUTBOUND_RECORD_BATCH_SIZE = 500
+# Tie-break rank between the two flow sources at the same occurred_at.
+OUTBOUND_RECORD_KIND_ASSET = 0
+OUTBOUND_RECORD_KIND_SKU_QUANTITY = 1
+
 OUTBOUND_RECORD_COLUMNS: tuple[str, ...] = (
     "record_key",
     "record_type",
@@ -1157,8 +1778,7 @@ def _format_reference_price(sku: Sku | None) -> str | None:
     return str(sku.reference_price)
 
 
-def _build_asset_outbound_records(
-    db: Session,
+def _asset_outbound_records_stmt(
     *,
     action: Literal["OUTBOUND", "SHIP"] | None,
     delivery_type: DeliveryType | None,
@@ -1169,7 +1789,7 @@ def _build_asset_outbound_records(
     from_at: datetime | None,
     to_at: datetime | None,
     q: str | None,
-) -> list[dict[str, Any]]:
+) -> Select[Any]:
     operator_alias = SysUser
     stmt = (
         select(
@@ -1218,110 +1838,109 @@ def _build_asset_outbound_records(
             )
         )
 
-    rows = db.execute(stmt).all()
-    records: list[dict[str, Any]] = []
-    for flow, asset, sku, category, application, logistics, operator in rows:
-        meta_json = _json_dict(flow.meta_json)
-        record = {
-            "_occurred_at_dt": flow.occurred_at,
-            "record_key": f"ASSET_FLOW-{int(flow.id)}",
-            "record_type": "ASSET",
-            "action": flow.action.value,
-            "occurred_at": _to_iso8601(flow.occurred_at),
-            "meta_json": meta_json,
-            "application_id": (
-                int(flow.related_application_id)
-                if flow.related_application_id is not None
-                else None
-            ),
-            "application_title": application.title if application is not None else None,
-            "application_type": _application_type_value(application),
-            "application_status": _application_status_value(application),
-            "delivery_type": _delivery_type_value(
-                application.delivery_type if application is not None else None
-            ),
-            "pickup_code": application.pickup_code if application is not None else None,
-            "pickup_qr_string": (
-                application.pickup_qr_string if application is not None else None
-            ),
-            "application_created_at": _to_iso8601_or_none(
-                application.created_at if application is not None else None
-            ),
-            "applicant_user_id": (
-                int(application.applicant_user_id) if application is not None else None
-            ),
-            "applicant_name_snapshot": (
-                application.applicant_name_snapshot if application is not None else None
-            ),
-            "applicant_department_snapshot": (
-                application.applicant_department_snapshot
-                if application is not None
-                else None
-            ),
-            "applicant_phone_snapshot": (
-                application.applicant_phone_snapshot if application is not None else None
-            ),
-            "applicant_job_title_snapshot": (
-                application.applicant_job_title_snapshot
-                if application is not None
-                else None
-            ),
-            "carrier": (
-                logistics.carrier
-                if logistics is not None
-                else _record_value(meta_json=meta_json, key="carrier")
-            ),
-            "tracking_no": (
-                logistics.tracking_no
-                if logistics is not None
-                else _record_value(meta_json=meta_json, key="tracking_no")
-            ),
-            "shipped_at": _to_iso8601_or_none(
-                logistics.shipped_at if logistics is not None else None
-            ),
-            "logistics_receiver_name": (
-                logistics.receiver_name if logistics is not None else None
-            ),
-            "logistics_receiver_phone": (
-                logistics.receiver_phone if logistics is not None else None
-            ),
-            "logistics_province": logistics.province if logistics is not None else None,
-            "logistics_city": logistics.city if logistics is not None else None,
-            "logistics_district": logistics.district if logistics is not None else None,
-            "logistics_detail": logistics.detail if logistics is not None else None,
-            "sku_id": int(sku.id),
-            "category_id": int(category.id) if category is not None else None,
-            "category_name": category.name if category is not None else None,
-            "brand": sku.brand,
-            "model": sku.model,
-            "spec": sku.spec,
-            "stock_mode": sku.stock_mode.value,
-            "reference_price": _format_reference_price(sku),
-            "cover_url": sku.cover_url,
-            "safety_stock_threshold": int(sku.safety_stock_threshold),
-            "asset_id": int(asset.id),
-            "asset_tag": asset.asset_tag,
-            "sn": asset.sn,
-            "asset_status": asset.status.value,
-            "holder_user_id": (
-                int(asset.holder_user_id) if asset.holder_user_id is not None else None
-            ),
-            "inbound_at": _to_iso8601(asset.inbound_at),
-            "quantity": None,
-            "on_hand_delta": None,
-            "reserved_delta": None,
-            "on_hand_qty_after": None,
-            "reserved_qty_after": None,
-            "operator_user_id": int(flow.operator_user_id),
-            "operator_name": operator.name,
-        }
-        records.append(record)
-
-    return records
+    return stmt.order_by(StockFlow.occurred_at.desc(), StockFlow.id.desc())
+
+
+def _asset_outbound_record(row: Row[Any]) -> dict[str, Any]:
+    flow, asset, sku, category, application, logistics, operator = row
+    meta_json = _json_dict(flow.meta_json)
+    record = {
+        "_sort_key": (flow.occurred_at, OUTBOUND_RECORD_KIND_ASSET, int(flow.id)),
+        "record_key": f"ASSET_FLOW-{int(flow.id)}",
+        "record_type": "ASSET",
+        "action": flow.action.value,
+        "occurred_at": _to_iso8601(flow.occurred_at),
+        "meta_json": meta_json,
+        "application_id": (
+            int(flow.related_application_id)
+            if flow.related_application_id is not None
+            else None
+        ),
+        "application_title": application.title if application is not None else None,
+        "application_type": _application_type_value(application),
+        "application_status": _application_status_value(application),
+        "delivery_type": _delivery_type_value(
+            application.delivery_type if application is not None else None
+        ),
+        "pickup_code": application.pickup_code if application is not None else None,
+        "pickup_qr_string": (
+            application.pickup_qr_string if application is not None else None
+        ),
+        "application_created_at": _to_iso8601_or_none(
+            application.created_at if application is not None else None
+        ),
+        "applicant_user_id": (
+            int(application.applicant_user_id) if application is not None else None
+        ),
+        "applicant_name_snapshot": (
+            application.applicant_name_snapshot if application is not None else None
+        ),
+        "applicant_department_snapshot": (
+            application.applicant_department_snapshot
+            if application is not None
+            else None
+        ),
+        "applicant_phone_snapshot": (
+            application.applicant_phone_snapshot if application is not None else None
+        ),
+        "applicant_job_title_snapshot": (
+            application.applicant_job_title_snapshot
+            if application is not None
+            else None
+        ),
+        "carrier": (
+            logistics.carrier
+            if logistics is not None
+            else _record_value(meta_json=meta_json, key="carrier")
+        ),
+        "tracking_no": (
+            logistics.tracking_no
+            if logistics is not None
+            else _record_value(meta_json=meta_json, key="tracking_no")
+        ),
+        "shipped_at": _to_iso8601_or_none(
+            logistics.shipped_at if logistics is not None else None
+        ),
+        "logistics_receiver_name": (
+            logistics.receiver_name if logistics is not None else None
+        ),
+        "logistics_receiver_phone": (
+            logistics.receiver_phone if logistics is not None else None
+        ),
+        "logistics_province": logistics.province if logistics is not None else None,
+        "logistics_city": logistics.city if logistics is not None else None,
+        "logistics_district": logistics.district if logistics is not None else None,
+        "logistics_detail": logistics.detail if logistics is not None else None,
+        "sku_id": int(sku.id),
+        "category_id": int(category.id) if category is not None else None,
+        "category_name": category.name if category is not None else None,
+        "brand": sku.brand,
+        "model": sku.model,
+        "spec": sku.spec,
+        "stock_mode": sku.stock_mode.value,
+        "reference_price": _format_reference_price(sku),
+        "cover_url": sku.cover_url,
+        "safety_stock_threshold": int(sku.safety_stock_threshold),
+        "asset_id": int(asset.id),
+        "asset_tag": asset.asset_tag,
+        "sn": asset.sn,
+        "asset_status": asset.status.value,
+        "holder_user_id": (
+            int(asset.holder_user_id) if asset.holder_user_id is not None else None
+        ),
+        "inbound_at": _to_iso8601(asset.inbound_at),
+        "quantity": None,
+        "on_hand_delta": None,
+        "reserved_delta": None,
+        "on_hand_qty_after": None,
+        "reserved_qty_after": None,
+        "operator_user_id": int(flow.operator_user_id),
+        "operator_name": operator.name,
+    }
+    return record
 
 
-def _build_quantity_outbound_records(
-    db: Session,
+def _quantity_outbound_records_stmt(
     *,
     action: Literal["OUTBOUND", "SHIP"] | None,
     delivery_type: DeliveryType | None,
@@ -1331,7 +1950,7 @@ def _build_quantity_outbound_records(
     from_at: datetime | None,
     to_at: datetime | None,
     q: str | None,
-) -> list[dict[str, Any]]:
+) -> Select[Any]:
     operator_alias = SysUser
     stmt = (
         select(
@@ -1378,111 +1997,130 @@ def _build_quantity_outbound_records(
             )
         )
 
-    rows = db.execute(stmt).all()
-    records: list[dict[str, Any]] = []
-    for flow, sku, category, application, logistics, operator in rows:
-        meta_json = _json_dict(flow.meta_json)
-        quantity = abs(int(flow.on_hand_delta))
-        if quantity == 0:
-            quantity = abs(int(flow.reserved_delta))
-        record = {
-            "_occurred_at_dt": flow.occurred_at,
-            "record_key": f"SKU_FLOW-{int(flow.id)}",
-            "record_type": "SKU_QUANTITY",
-            "action": flow.action.value,
-            "occurred_at": _to_iso8601(flow.occurred_at),
-            "meta_json": meta_json,
-            "application_id": (
-                int(flow.related_application_id)
-                if flow.related_application_id is not None
-                else None
-            ),
-            "application_title": application.title if application is not None else None,
-            "application_type": _application_type_value(application),
-            "application_status": _application_status_value(application),
-            "delivery_type": _delivery_type_value(
-                application.delivery_type if application is not None else None
-            ),
-            "pickup_code": application.pickup_code if application is not None else None,
-            "pickup_qr_string": (
-                application.pickup_qr_string if application is not None else None
-            ),
-            "application_created_at": _to_iso8601_or_none(
-                application.created_at if application is not None else None
-            ),
-            "applicant_user_id": (
-                int(application.applicant_user_id) if application is not None else None
-            ),
-            "applicant_name_snapshot": (
-                application.applicant_name_snapshot if application is not None else None
-            ),
-            "applicant_department_snapshot": (
-                application.applicant_department_snapshot
-                if application is not None
-                else None
-            ),
-            "applicant_phone_snapshot": (
-                application.applicant_phone_snapshot if application is not None else None
-            ),
-            "applicant_job_title_snapshot": (
-                application.applicant_job_title_snapshot
-                if application is not None
-                else None
-            ),
-            "carrier": (
-                logistics.carrier
-                if logistics is not None
-                else _record_value(meta_json=meta_json, key="carrier")
-            ),
-            "tracking_no": (
-                logistics.tracking_no
-                if logistics is not None
-                else _record_value(meta_json=meta_json, key="tracking_no")
-            ),
-            "shipped_at": _to_iso8601_or_none(
-                logistics.shipped_at if logistics is not None else None
-            ),
-            "logistics_receiver_name": (
-                logistics.receiver_name if logistics is not None else None
-            ),
-            "logistics_receiver_phone": (
-                logistics.receiver_phone if logistics is not None else None
-            ),
-            "logistics_province": logistics.province if logistics is not None else None,
-            "logistics_city": logistics.city if logistics is not None else None,
-            "logistics_district": logistics.district if logistics is not None else None,
-            "logistics_detail": logistics.detail if logistics is not None else None,
-            "sku_id": int(sku.id),
-            "category_id": int(category.id) if category is not None else None,
-            "category_name": category.name if category is not None else None,
-            "brand": sku.brand,
-            "model": sku.model,
-            "spec": sku.spec,
-            "stock_mode": sku.stock_mode.value,
-            "reference_price": _format_reference_price(sku),
-            "cover_url": sku.cover_url,
-            "safety_stock_threshold": int(sku.safety_stock_threshold),
-            "asset_id": None,
-            "asset_tag": None,
-            "sn": None,
-            "asset_status": None,
-            "holder_user_id": None,
-            "inbound_at": None,
-            "quantity": quantity,
-            "on_hand_delta": int(flow.on_hand_delta),
-            "reserved_delta": int(flow.reserved_delta),
-            "on_hand_qty_after": int(flow.on_hand_qty_after),
-            "reserved_qty_after": int(flow.reserved_qty_after),
-            "operator_user_id": int(flow.operator_user_id),
-            "operator_name": operator.name,
-        }
-        records.append(record)
+    return stmt.order_by(SkuStockFlow.occurred_at.desc(), SkuStockFlow.id.desc())
+
+
+def _quantity_outbound_record(row: Row[Any]) -> dict[str, Any]:
+    flow, sku, category, application, logistics, operator = row
+    meta_json = _json_dict(flow.meta_json)
+    quantity = abs(int(flow.on_hand_delta))
+    if quantity == 0:
+        quantity = abs(int(flow.reserved_delta))
+    record = {
+        "_sort_key": (
+            flow.occurred_at,
+            OUTBOUND_RECORD_KIND_SKU_QUANTITY,
+            int(flow.id),
+        ),
+        "record_key": f"SKU_FLOW-{int(flow.id)}",
+        "record_type": "SKU_QUANTITY",
+        "action": flow.action.value,
+        "occurred_at": _to_iso8601(flow.occurred_at),
+        "meta_json": meta_json,
+        "application_id": (
+            int(flow.related_application_id)
+            if flow.related_application_id is not None
+            else None
+        ),
+        "application_title": application.title if application is not None else None,
+        "application_type": _application_type_value(application),
+        "application_status": _application_status_value(application),
+        "delivery_type": _delivery_type_value(
+            application.delivery_type if application is not None else None
+        ),
+        "pickup_code": application.pickup_code if application is not None else None,
+        "pickup_qr_string": (
+            application.pickup_qr_string if application is not None else None
+        ),
+        "application_created_at": _to_iso8601_or_none(
+            application.created_at if application is not None else None
+        ),
+        "applicant_user_id": (
+            int(application.applicant_user_id) if application is not None else None
+        ),
+        "applicant_name_snapshot": (
+            application.applicant_name_snapshot if application is not None else None
+        ),
+        "applicant_department_snapshot": (
+            application.applicant_department_snapshot
+            if application is not None
+            else None
+        ),
+        "applicant_phone_snapshot": (
+            application.applicant_phone_snapshot if application is not None else None
+        ),
+        "applicant_job_title_snapshot": (
+            application.applicant_job_title_snapshot
+            if application is not None
+            else None
+        ),
+        "carrier": (
+            logistics.carrier
+            if logistics is not None
+            else _record_value(meta_json=meta_json, key="carrier")
+        ),
+        "tracking_no": (
+            logistics.tracking_no
+            if logistics is not None
+            else _record_value(meta_json=meta_json, key="tracking_no")
+        ),
+        "shipped_at": _to_iso8601_or_none(
+            logistics.shipped_at if logistics is not None else None
+        ),
+        "logistics_receiver_name": (
+            logistics.receiver_name if logistics is not None else None
+        ),
+        "logistics_receiver_phone": (
+            logistics.receiver_phone if logistics is not None else None
+        ),
+        "logistics_province": logistics.province if logistics is not None else None,
+        "logistics_city": logistics.city if logistics is not None else None,
+        "logistics_district": logistics.district if logistics is not None else None,
+        "logistics_detail": logistics.detail if logistics is not None else None,
+        "sku_id": int(sku.id),
+        "category_id": int(category.id) if category is not None else None,
+        "category_name": category.name if category is not None else None,
+        "brand": sku.brand,
+        "model": sku.model,
+        "spec": sku.spec,
+        "stock_mode": sku.stock_mode.value,
+        "reference_price": _format_reference_price(sku),
+        "cover_url": sku.cover_url,
+        "safety_stock_threshold": int(sku.safety_stock_threshold),
+        "asset_id": None,
+        "asset_tag": None,
+        "sn": None,
+        "asset_status": None,
+        "holder_user_id": None,
+        "inbound_at": None,
+        "quantity": quantity,
+        "on_hand_delta": int(flow.on_hand_delta),
+        "reserved_delta": int(flow.reserved_delta),
+        "on_hand_qty_after": int(flow.on_hand_qty_after),
+        "reserved_qty_after": int(flow.reserved_qty_after),
+        "operator_user_id": int(flow.operator_user_id),
+        "operator_name": operator.name,
+    }
+    return record
 
-    return records
 
+def _stream_rows(db: Session, stmt: Select[Any]) -> Iterator[Row[Any]]:
+    if db.get_bind().dialect.name == "mysql":
+        # MySQL cannot interleave two unbuffered result sets on one connection.
+        yield from db.execute(stmt)
+        return
+    yield from db.execute(stmt.execution_options(yield_per=OUTBOUND_RECORD_BATCH_SIZE))
 
-def _build_outbound_records(
-    db: Session,
+
+@dataclass(frozen=True, slots=True)
+class _OutboundRecordSource:
+    kind: int
+    flow_model: type[StockFlow] | type[SkuStockFlow]
+    stmt: Select[Any]
+    serialize: Callable[[Row[Any]], dict[str, Any]]
+
+
+def _outbound_record_sources(
     *,
     action: Literal["OUTBOUND", "SHIP"] | None,
     record_type: Literal["ASSET", "SKU_QUANTITY"] | None,
@@ -1494,53 +2132,215 @@ def _build_outbound_records(
     from_at: datetime | None,
     to_at: datetime | None,
     q: str | None,
-) -> list[dict[str, Any]]:
+) -> list[_OutboundRecordSource]:
     normalized_q = _string_or_none(q)
-    include_asset = record_type in (None, "ASSET")
-    include_quantity = record_type in (None, "SKU_QUANTITY")
-    records: list[dict[str, Any]] = []
-
-    if include_asset:
-        records.extend(
-            _build_asset_outbound_records(
-                db,
-                action=action,
-                delivery_type=delivery_type,
-                application_id=application_id,
-                operator_user_id=operator_user_id,
-                sku_id=sku_id,
-                asset_id=asset_id,
-                from_at=from_at,
-                to_at=to_at,
-                q=normalized_q,
+    sources: list[_OutboundRecordSource] = []
+
+    if record_type in (None, "ASSET"):
+        sources.append(
+            _OutboundRecordSource(
+                kind=OUTBOUND_RECORD_KIND_ASSET,
+                flow_model=StockFlow,
+                stmt=_asset_outbound_records_stmt(
+                    action=action,
+                    delivery_type=delivery_type,
+                    application_id=application_id,
+                    operator_user_id=operator_user_id,
+                    sku_id=sku_id,
+                    asset_id=asset_id,
+                    from_at=from_at,
+                    to_at=to_at,
+                    q=normalized_q,
+                ),
+                serialize=_asset_outbound_record,
             )
         )
 
-    if include_quantity and asset_id is None:
-        records.extend(
-            _build_quantity_outbound_records(
-                db,
-                action=action,
-                delivery_type=delivery_type,
-                application_id=application_id,
-                operator_user_id=operator_user_id,
-                sku_id=sku_id,
-                from_at=from_at,
-                to_at=to_at,
-                q=normalized_q,
+    if record_type in (None, "SKU_QUANTITY") and asset_id is None:
+        sources.append(
+            _OutboundRecordSource(
+                kind=OUTBOUND_RECORD_KIND_SKU_QUANTITY,
+                flow_model=SkuStockFlow,
+                stmt=_quantity_outbound_records_stmt(
+                    action=action,
+                    delivery_type=delivery_type,
+                    application_id=application_id,
+                    operator_user_id=operator_user_id,
+                    sku_id=sku_id,
+                    from_at=from_at,
+                    to_at=to_at,
+                    q=normalized_q,
+                ),
+                serialize=_quantity_outbound_record,
             )
         )
 
-    records.sort(
-        key=lambda item: (
-            item["_occurred_at_dt"],
-            str(item["record_key"]),
-        ),
-        reverse=True,
+    return sources
+
+
+def _iter_outbound_records(
+    db: Session,
+    sources: list[_OutboundRecordSource],
+) -> Iterator[dict[str, Any]]:
+    """Yield outbound records newest first, merging the asset and quantity
+    flow streams lazily. Ties on ``occurred_at`` put quantity records first,
+    then higher flow ids."""
+
+    streams = [
+        map(source.serialize, _stream_rows(db, source.stmt)) for source in sources
+    ]
+    for record in heapq.merge(*streams, key=itemgetter("_sort_key"), reverse=True):
+        record.pop("_sort_key", None)
+        yield record
+
+
+def _encode_outbound_cursor(occurred_at: datetime, kind: int, flow_id: int) -> str:
+    raw = json.dumps([occurred_at.isoformat(), kind, flow_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_outbound_cursor(cursor: str) -> tuple[datetime, int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        occurred_at_raw, kind, flow_id = json.loads(base64.urlsafe_b64decode(padded))
+        occurred_at = datetime.fromisoformat(occurred_at_raw)
+        if not isinstance(kind, int) or not isinstance(flow_id, int):
+            raise ValueError("cursor fields must be integers")
+    except (ValueError, TypeError) as error:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="分页游标无效，请从第一页重新查询。",
+            details={"cursor": cursor},
+        ) from error
+    return occurred_at, kind, flow_id
+
+
+def _outbound_keyset_condition(
+    source: _OutboundRecordSource,
+    cursor: tuple[datetime, int, int],
+) -> Any:
+    """Rows strictly after ``cursor`` in (occurred_at, kind, id) DESC order,
+    folded per source so each branch can use its (action, occurred_at, id) index."""
+
+    occurred_at, kind, flow_id = cursor
+    occurred_col = source.flow_model.occurred_at
+    if source.kind < kind:
+        return occurred_col <= occurred_at
+    if source.kind > kind:
+        return occurred_col < occurred_at
+    return or_(
+        occurred_col < occurred_at,
+        and_(occurred_col == occurred_at, source.flow_model.id < flow_id),
+    )
+
+
+def _outbound_record_keys(source: _OutboundRecordSource) -> Select[Any]:
+    return source.stmt.with_only_columns(
+        source.flow_model.occurred_at.label("occurred_at"),
+        literal_column(str(source.kind)).label("kind"),
+        source.flow_model.id.label("flow_id"),
+        maintain_column_froms=True,
+    ).order_by(None)
+
+
+def _page_outbound_records(
+    db: Session,
+    sources: list[_OutboundRecordSource],
+    *,
+    page: int,
+    page_size: int,
+    cursor: str | None,
+    include_total: bool,
+) -> tuple[list[dict[str, Any]], int | None, str | None]:
+    """Select one page of record keys from a UNION ALL of both flow sources,
+    then load full rows for just that page.
+
+    With ``cursor`` the page starts after the cursor position (keyset);
+    otherwise ``page`` is applied as an offset.
+    """
+
+    if not sources:
+        return [], (0 if include_total else None), None
+
+    decoded_cursor = _decode_outbound_cursor(cursor) if cursor else None
+
+    total: int | None = None
+    if include_total:
+        count_keys = union_all(*(_outbound_record_keys(source) for source in sources))
+        total = int(db.scalar(select(func.count()).select_from(count_keys.subquery())) or 0)
+
+    # Each branch is cut to the rows the page could need, in its own
+    # (occurred_at, id) index order, so the merge below only sorts those.
+    offset = 0 if decoded_cursor is not None else (page - 1) * page_size
+    key_selects = []
+    for source in sources:
+        key_select = _outbound_record_keys(source)
+        if decoded_cursor is not None:
+            key_select = key_select.where(_outbound_keyset_condition(source, decoded_cursor))
+        branch = (
+            key_select.order_by(
+                source.flow_model.occurred_at.desc(), source.flow_model.id.desc()
+            )
+            .limit(offset + page_size + 1)
+            .subquery()
+        )
+        key_selects.append(select(branch.c.occurred_at, branch.c.kind, branch.c.flow_id))
+    keys = union_all(*key_selects).subquery()
+    page_stmt = (
+        select(keys.c.occurred_at, keys.c.kind, keys.c.flow_id)
+        .order_by(keys.c.occurred_at.desc(), keys.c.kind.desc(), keys.c.flow_id.desc())
+        .offset(offset)
+        .limit(page_size + 1)
     )
-    for item in records:
-        item.pop("_occurred_at_dt", None)
-    return records
+    key_rows = [
+        (occurred_at, int(kind), int(flow_id))
+        for occurred_at, kind, flow_id in db.execute(page_stmt).all()
+    ]
+
+    next_cursor = None
+    if len(key_rows) > page_size:
+        key_rows = key_rows[:page_size]
+        next_cursor = _encode_outbound_cursor(*key_rows[-1])
+
+    records_by_key: dict[tuple[int, int], dict[str, Any]] = {}
+    for source in sources:
+        flow_ids = [flow_id for _, kind, flow_id in key_rows if kind == source.kind]
+        if not flow_ids:
+            continue
+        for row in db.execute(source.stmt.where(source.flow_model.id.in_(flow_ids))):
+            record = source.serialize(row)
+            record.pop("_sort_key", None)
+            records_by_key.setdefault((source.kind, int(row[0].id)), record)
+
+    items = [
+        records_by_key[(kind, flow_id)]
+        for _, kind, flow_id in key_rows
+        if (kind, flow_id) in records_by_key
+    ]
+    return items, total, next_cursor
+
+
+def _iter_outbound_csv_chunks(records: Iterator[dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(list(OUTBOUND_RECORD_COLUMNS))
+    yield buffer.getvalue()
+
+    pending_rows = 0
+    for record in records:
+        if pending_rows == 0:
+            buffer.seek(0)
+            buffer.truncate()
+        writer.writerow(
+            [_csv_cell(record.get(column)) for column in OUTBOUND_RECORD_COLUMNS]
+        )
+        pending_rows += 1
+        if pending_rows >= OUTBOUND_RECORD_BATCH_SIZE:
+            yield buffer.getvalue()
+            pending_rows = 0
+    if pending_rows:
+        yield buffer.getvalue()
 
 
 def _csv_cell(value: object | None) -> str:
@@ -1565,12 +2365,13 @@ def list_outbound_records(
     sku_id: int | None = Query(default=None, ge=1),
     asset_id: int | None = Query(default=None, ge=1),
     q: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
     context: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
-) -> ApiResponse:
+) -> Response:
     _require_admin(context, required_permissions={PERMISSION_OUTBOUND_READ})
-    records = _build_outbound_records(
-        db,
+    sources = _outbound_record_sources(
         action=action,
         record_type=record_type,
         delivery_type=delivery_type,
@@ -1582,17 +2383,22 @@ def list_outbound_records(
         to_at=to_at,
         q=q,
     )
-    total = len(records)
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_items = records[start:end]
-    return build_success_response(
+    page_items, total, next_cursor = _page_outbound_records(
+        db,
+        sources,
+        page=page,
+        page_size=page_size,
+        cursor=_string_or_none(cursor),
+        include_total=include_total,
+    )
+    return success_json(
         {
             "items": page_items,
             "meta": {
                 "page": page,
                 "page_size": page_size,
                 "total": total,
+                "next_cursor": next_cursor,
             },
         }
     )
@@ -1614,8 +2420,7 @@ def export_outbound_records_csv(
     db: Session = Depends(get_db_session),
 ) -> StreamingResponse:
     _require_admin(context, required_permissions={PERMISSION_OUTBOUND_READ})
-    rows = _build_outbound_records(
-        db,
+    sources = _outbound_record_sources(
         action=action,
         record_type=record_type,
         delivery_type=delivery_type,
@@ -1627,16 +2432,9 @@ def export_outbound_records_csv(
         to_at=to_at,
         q=q,
     )
-
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(list(OUTBOUND_RECORD_COLUMNS))
-    for row in rows:
-        writer.writerow([_csv_cell(row.get(column)) for column in OUTBOUND_RECORD_COLUMNS])
-
-    content = "\ufeff" + buffer.getvalue()
+    # The request session stays open while the body streams (FastAPI >= 0.118).
     response = StreamingResponse(
-        iter([content]),
+        _iter_outbound_csv_chunks(_iter_outbound_records(db, sources)),
         media_type="text/csv; charset=utf-8",
     )
     response.headers["Content-Disposition"] = 'attachment; filename="outbound_records.csv"'
@@ -5,16 +5,19 @@ from __future__ import annotations
 import re
 import csv
 import io
+from collections.abc import Iterator
+from contextlib import closing
 from datetime import UTC, datetime
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy import delete, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context, get_user_roles
+from ....core.catalog_cache import invalidate_catalog_cache
 from ....core.exceptions import AppException
 from ....db.session import get_db_session
 from ....models.application import ApplicationAsset, ApplicationItem
@@ -25,14 +28,13 @@ from ....models.enums import (
     OcrJobStatus,
     SkuStockFlowAction,
     SkuStockMode,
-    StockFlowAction,
 )
 from ....models.inbound import OcrInboundJob
 from ....models.inventory import Asset, StockFlow
 from ....models.organization import SysUser
 from ....models.rbac import RbacRole, RbacUserRole
 from ....models.sku_stock import SkuStock, SkuStockFlow
-from ....schemas.common import ApiResponse, build_success_response
+from ....schemas.common import ApiResponse, build_success_response, success_json
 from ....schemas.m06 import (
     AdminAssetCreateRequest,
     AdminAssetUpdateRequest,
@@ -47,11 +49,28 @@ from ....schemas.m06 import (
     SkuStockInboundRequest,
     SkuStockOutboundRequest,
 )
+from ....services.asset_inbound_service import (
+    ASSET_INBOUND_BATCH_SIZE,
+    InboundedAsset,
+    InboundSerial,
+    inbound_serialized_assets,
+)
+from ....services.id_allocation_service import allocate_id
+from ....services.import_file_service import (
+    iter_csv_import_rows,
+    iter_xlsx_import_rows,
+    normalize_import_header,
+)
+from ....services.sku_asset_counter_service import (
+    STATUS_COUNTER_COLUMNS,
+    load_asset_counters,
+)
 from ....services.sku_stock_service import apply_stock_delta, get_or_create_stock_for_update
 
 router = APIRouter(tags=["M06"])
 PERMISSION_INVENTORY_READ = "INVENTORY:READ"
 PERMISSION_INVENTORY_WRITE = "INVENTORY:WRITE"
+MAX_ASSET_IMPORT_ROWS = 20000
 
 
 def _to_iso8601(value: datetime) -> str:
@@ -68,11 +87,6 @@ def _to_naive_utc(value: datetime) -> datetime:
     return value.astimezone(UTC).replace(tzinfo=None)
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
 def _require_admin(
     context: AuthContext,
     *,
@@ -207,7 +221,7 @@ def _create_sku(
     _assert_category_exists(db, category_id=category_id)
 
     sku = Sku(
-        id=_next_bigint_id(db, Sku),
+        id=allocate_id(db, Sku),
         category_id=category_id,
         is_visible=is_visible,
         name=name,
@@ -270,7 +284,7 @@ def _resolve_or_create_sku(
         return existing
 
     sku = Sku(
-        id=_next_bigint_id(db, Sku),
+        id=allocate_id(db, Sku),
         category_id=category_id,
         is_visible=bool(payload.is_visible),
         name=name,
@@ -288,14 +302,10 @@ def _resolve_or_create_sku(
 
 
 def _prepare_assets_for_creation(
-    db: Session,
     *,
     assets: list[OcrInboundConfirmAssetPayload],
-) -> list[tuple[str, datetime | None]]:
-    prepared: list[tuple[str, datetime | None]] = []
-    seen: set[str] = set()
-    duplicate_sns: set[str] = set()
-
+) -> list[InboundSerial]:
+    prepared: list[InboundSerial] = []
     for row in assets:
         normalized_sn = row.sn.strip()
         if not normalized_sn:
@@ -303,44 +313,28 @@ def _prepare_assets_for_creation(
                 code="VALIDATION_ERROR",
                 message="资产序列号不能为空。",
             )
-        prepared.append((normalized_sn, row.inbound_at))
-        if normalized_sn in seen:
-            duplicate_sns.add(normalized_sn)
-        seen.add(normalized_sn)
-
-    if duplicate_sns:
-        raise AppException(
-            code="DUPLICATE_SN",
-            message="检测到重复的资产序列号。",
-            details={"sns": sorted(duplicate_sns)},
-        )
-
-    existing_sns = set(
-        db.scalars(
-            select(Asset.sn).where(Asset.sn.in_([item[0] for item in prepared]))
-        ).all()
-    )
-    if existing_sns:
-        raise AppException(
-            code="DUPLICATE_SN",
-            message="资产序列号已存在。",
-            details={"sns": sorted(existing_sns)},
+        prepared.append(
+            InboundSerial(
+                sn=normalized_sn,
+                inbound_at=(
+                    _to_naive_utc(row.inbound_at) if row.inbound_at is not None else None
+                ),
+            )
         )
-
     return prepared
 
 
-def _allocate_asset_tag(db: Session, *, asset_id: int) -> str:
-    sequence = 0
-    while True:
-        suffix = "" if sequence == 0 else f"-{sequence}"
-        candidate = f"AT-{asset_id:06d}{suffix}"
-        exists = db.scalar(
-            select(Asset.id).where(Asset.asset_tag == candidate).limit(1)
+def _require_serialized_sku(db: Session, *, sku_id: int) -> Sku:
+    sku = db.get(Sku, sku_id)
+    if sku is None:
+        raise AppException(code="SKU_NOT_FOUND", message="物料不存在。")
+    if sku.stock_mode != SkuStockMode.SERIALIZED:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="该物料为数量库存模式，不能创建序列号资产。",
+            details={"sku_id": int(sku_id), "stock_mode": sku.stock_mode.value},
         )
-        if exists is None:
-            return candidate
-        sequence += 1
+    return sku
 
 
 def _create_assets_for_sku(
@@ -350,53 +344,86 @@ def _create_assets_for_sku(
     assets: list[OcrInboundConfirmAssetPayload],
     operator_user_id: int,
     flow_meta_base: dict[str, object],
-) -> list[Asset]:
-    sku = db.get(Sku, sku_id)
-    if sku is None:
-        raise AppException(code="SKU_NOT_FOUND", message="物料不存在。")
-    if sku.stock_mode != SkuStockMode.SERIALIZED:
+) -> list[InboundedAsset]:
+    _require_serialized_sku(db, sku_id=sku_id)
+    return inbound_serialized_assets(
+        db,
+        sku_id=sku_id,
+        serials=_prepare_assets_for_creation(assets=assets),
+        operator_user_id=operator_user_id,
+        occurred_at=datetime.now(UTC).replace(tzinfo=None),
+        flow_meta_base=flow_meta_base,
+    )
+
+
+def _parse_import_inbound_at(value: object, *, row_number: int) -> datetime | None:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, datetime):
+        return _to_naive_utc(value)
+    try:
+        return _to_naive_utc(datetime.fromisoformat(str(value).strip()))
+    except ValueError as exc:
         raise AppException(
             code="VALIDATION_ERROR",
-            message="该物料为数量库存模式，不能创建序列号资产。",
-            details={"sku_id": int(sku_id), "stock_mode": sku.stock_mode.value},
-        )
+            message="入库时间格式无效。",
+            details={"row": row_number, "inbound_at": str(value)},
+        ) from exc
 
-    prepared_assets = _prepare_assets_for_creation(db, assets=assets)
-    now = datetime.now(UTC).replace(tzinfo=None)
-    next_asset_id = _next_bigint_id(db, Asset)
-    next_stock_flow_id = _next_bigint_id(db, StockFlow)
-    created_assets: list[Asset] = []
-
-    for serial_number, inbound_at in prepared_assets:
-        asset_id = next_asset_id
-        asset = Asset(
-            id=asset_id,
-            asset_tag=_allocate_asset_tag(db, asset_id=asset_id),
-            sku_id=sku_id,
-            sn=serial_number,
-            status=AssetStatus.IN_STOCK,
-            holder_user_id=None,
-            locked_application_id=None,
-            inbound_at=_to_naive_utc(inbound_at) if inbound_at is not None else now,
-        )
-        db.add(asset)
-        db.add(
-            StockFlow(
-                id=next_stock_flow_id,
-                asset_id=asset_id,
-                action=StockFlowAction.INBOUND,
-                operator_user_id=operator_user_id,
-                related_application_id=None,
-                occurred_at=now,
-                meta_json={**flow_meta_base, "sn": serial_number},
-            )
+
+def _iter_asset_import_serials(file: UploadFile) -> Iterator[InboundSerial]:
+    """Yield serials from an uploaded sheet with an ``sn`` column and an
+    optional ``inbound_at`` column, reading the file row by row."""
+
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        rows = iter_csv_import_rows(file)
+    elif filename.endswith(".xlsx"):
+        rows = iter_xlsx_import_rows(file)
+    else:
+        raise AppException(
+            code="UNSUPPORTED_MEDIA_TYPE",
+            message="资产导入仅支持 csv/xlsx 文件。",
         )
-        created_assets.append(asset)
-        next_asset_id += 1
-        next_stock_flow_id += 1
 
-    db.flush()
-    return created_assets
+    # Close the reader as soon as the caller stops, e.g. on a validation error.
+    with closing(rows):
+        header = next(rows, None)
+        columns = [normalize_import_header(value) for value in header or ()]
+        if "sn" not in columns:
+            raise AppException(
+                code="VALIDATION_ERROR",
+                message="导入文件缺少 sn 列。",
+            )
+        sn_index = columns.index("sn")
+        inbound_at_index = columns.index("inbound_at") if "inbound_at" in columns else None
+
+        for row_number, row in enumerate(rows, start=2):
+            if all(value is None or not str(value).strip() for value in row):
+                continue
+            raw_sn = row[sn_index] if sn_index < len(row) else None
+            sn = str(raw_sn).strip() if raw_sn is not None else ""
+            if not sn:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message="资产序列号不能为空。",
+                    details={"row": row_number},
+                )
+            if len(sn) > 128:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message="资产序列号长度不能超过 128 个字符。",
+                    details={"row": row_number},
+                )
+            raw_inbound_at = (
+                row[inbound_at_index]
+                if inbound_at_index is not None and inbound_at_index < len(row)
+                else None
+            )
+            yield InboundSerial(
+                sn=sn,
+                inbound_at=_parse_import_inbound_at(raw_inbound_at, row_number=row_number),
+            )
 
 
 def _serialize_sku(sku: Sku) -> dict[str, object]:
@@ -438,7 +465,7 @@ def create_ocr_job(
     _require_admin(context, required_permissions={PERMISSION_INVENTORY_WRITE})
 
     safe_name = _sanitize_filename(file.filename or "upload.bin")
-    job_id = _next_bigint_id(db, OcrInboundJob)
+    job_id = allocate_id(db, OcrInboundJob)
     job = OcrInboundJob(
         id=job_id,
         operator_user_id=context.user.id,
@@ -529,7 +556,7 @@ def confirm_ocr_job(
             occurred_at=datetime.now(UTC).replace(tzinfo=None),
             meta_json=inbound_meta,
         )
-        created_assets: list[Asset] = []
+        created_assets: list[InboundedAsset] = []
     else:
         if not payload.assets:
             raise AppException(
@@ -548,6 +575,7 @@ def confirm_ocr_job(
     job.status = OcrJobStatus.CONFIRMED
     job.confirmed_sku_id = sku.id
     db.commit()
+    invalidate_catalog_cache(db)
 
     return build_success_response(
         {
@@ -603,6 +631,7 @@ def create_admin_sku(
 
     record = _create_sku(db, payload=payload)
     db.commit()
+    invalidate_catalog_cache(db)
     db.refresh(record)
     return build_success_response(_serialize_sku(record))
 
@@ -692,6 +721,7 @@ def update_admin_sku(
     record.safety_stock_threshold = safety_stock_threshold
 
     db.commit()
+    invalidate_catalog_cache(db)
     db.refresh(record)
     return build_success_response(_serialize_sku(record))
 
@@ -762,6 +792,7 @@ def delete_admin_sku(
             message="物料已被引用，无法删除。",
         ) from None
 
+    invalidate_catalog_cache(db)
     return build_success_response({"deleted": True, "id": id})
 
 
@@ -812,6 +843,75 @@ def create_admin_assets(
     )
 
 
+@router.post("/admin/assets/import", response_model=ApiResponse)
+def import_admin_assets(
+    sku_id: int = Form(..., ge=1),
+    file: UploadFile = File(...),
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    _require_admin(context, required_permissions={PERMISSION_INVENTORY_WRITE})
+    _require_serialized_sku(db, sku_id=sku_id)
+
+    occurred_at = datetime.now(UTC).replace(tzinfo=None)
+    flow_meta_base = {
+        "event": "admin_assets_import",
+        "file_name": _sanitize_filename(file.filename or "upload.bin"),
+    }
+    created_assets: list[InboundedAsset] = []
+    pending: list[InboundSerial] = []
+    row_count = 0
+    with closing(_iter_asset_import_serials(file)) as serials:
+        for serial in serials:
+            row_count += 1
+            if row_count > MAX_ASSET_IMPORT_ROWS:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message=f"单次最多导入 {MAX_ASSET_IMPORT_ROWS} 条资产。",
+                )
+            pending.append(serial)
+            if len(pending) >= ASSET_INBOUND_BATCH_SIZE:
+                created_assets.extend(
+                    inbound_serialized_assets(
+                        db,
+                        sku_id=sku_id,
+                        serials=pending,
+                        operator_user_id=context.user.id,
+                        occurred_at=occurred_at,
+                        flow_meta_base=flow_meta_base,
+                    )
+                )
+                pending = []
+    if pending:
+        created_assets.extend(
+            inbound_serialized_assets(
+                db,
+                sku_id=sku_id,
+                serials=pending,
+                operator_user_id=context.user.id,
+                occurred_at=occurred_at,
+                flow_meta_base=flow_meta_base,
+            )
+        )
+    if not created_assets:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="导入文件中没有资产数据。",
+        )
+    db.commit()
+
+    return build_success_response(
+        {
+            "sku_id": sku_id,
+            "created_count": len(created_assets),
+            "created_assets": [
+                {"asset_id": item.id, "asset_tag": item.asset_tag, "sn": item.sn}
+                for item in created_assets
+            ],
+        }
+    )
+
+
 @router.put("/admin/assets/{id}", response_model=ApiResponse)
 def update_admin_asset(
     id: int,
@@ -955,7 +1055,7 @@ def get_inventory_summary(
     below_threshold: bool = Query(default=False),
     context: AuthContext = Depends(get_auth_context),
     db: Session = Depends(get_db_session),
-) -> ApiResponse:
+) -> Response:
     _require_admin(context, required_permissions={PERMISSION_INVENTORY_READ})
 
     sku_stmt = select(Sku)
@@ -978,20 +1078,14 @@ def get_inventory_summary(
 
     skus = db.scalars(sku_stmt.order_by(Sku.id.asc())).all()
     if not skus:
-        return build_success_response([])
+        return success_json([])
 
     sku_ids = [int(item.id) for item in skus]
     stock_rows = db.scalars(
         select(SkuStock).where(SkuStock.sku_id.in_(sku_ids)).order_by(SkuStock.sku_id.asc())
     ).all()
     stock_by_sku_id = {int(row.sku_id): row for row in stock_rows}
-    asset_stmt = (
-        select(Asset.sku_id, Asset.status, func.count(Asset.id))
-        .where(Asset.sku_id.in_(sku_ids))
-        .group_by(Asset.sku_id, Asset.status)
-        .order_by(Asset.sku_id.asc())
-    )
-    rows = db.execute(asset_stmt).all()
+    counter_by_sku_id = load_asset_counters(db, sku_ids=sku_ids)
 
     summary_by_sku: dict[int, dict[str, object]] = {}
     for sku in skus:
@@ -1017,24 +1111,18 @@ def get_inventory_summary(
             "available_qty": 0,
         }
 
-    for current_sku_id, current_status, count in rows:
-        record = summary_by_sku.get(int(current_sku_id))
+    for current_sku_id, counter in counter_by_sku_id.items():
+        record = summary_by_sku.get(current_sku_id)
         if record is None:
             continue
-
-        count_value = int(count)
-        record["total_count"] = int(record["total_count"]) + count_value
-
-        if current_status == AssetStatus.IN_STOCK:
-            record["in_stock_count"] = int(record["in_stock_count"]) + count_value
-        elif current_status == AssetStatus.LOCKED:
-            record["locked_count"] = int(record["locked_count"]) + count_value
-        elif current_status in {AssetStatus.IN_USE, AssetStatus.BORROWED}:
-            record["in_use_count"] = int(record["in_use_count"]) + count_value
-        elif current_status == AssetStatus.REPAIRING:
-            record["repairing_count"] = int(record["repairing_count"]) + count_value
-        elif current_status == AssetStatus.SCRAPPED:
-            record["scrapped_count"] = int(record["scrapped_count"]) + count_value
+        record["total_count"] = sum(
+            int(getattr(counter, column)) for column in STATUS_COUNTER_COLUMNS.values()
+        )
+        record["in_stock_count"] = int(counter.in_stock_count)
+        record["locked_count"] = int(counter.locked_count)
+        record["in_use_count"] = int(counter.in_use_count) + int(counter.borrowed_count)
+        record["repairing_count"] = int(counter.repairing_count)
+        record["scrapped_count"] = int(counter.scrapped_count)
 
     result: list[dict[str, object]] = []
     for record_key in sorted(summary_by_sku):
@@ -1068,7 +1156,7 @@ def get_inventory_summary(
             continue
         result.append(record)
 
-    return build_success_response(result)
+    return success_json(result)
 
 
 def _serialize_category(
@@ -1318,7 +1406,7 @@ def create_admin_category(
         )
 
     record = Category(
-        id=_next_bigint_id(db, Category),
+        id=allocate_id(db, Category),
         name=name,
         parent_id=parent_id,
         leader_approver_user_id=leader_approver_user_id,
@@ -1326,6 +1414,7 @@ def create_admin_category(
     )
     db.add(record)
     db.commit()
+    invalidate_catalog_cache(db)
     db.refresh(record)
     user_name_by_id = _load_user_names(
         db,
@@ -1376,6 +1465,7 @@ def update_admin_category(
     record.leader_approver_user_id = leader_approver_user_id
     record.admin_reviewer_user_id = admin_reviewer_user_id
     db.commit()
+    invalidate_catalog_cache(db)
     db.refresh(record)
     user_name_by_id = _load_user_names(
         db,
@@ -1427,6 +1517,7 @@ def delete_admin_category(
             details={"category_id": int(id)},
         ) from None
 
+    invalidate_catalog_cache(db)
     return build_success_response({"deleted": True, "id": id})
 
 
@@ -9,7 +9,7 @@ from decimal import Decimal
 from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import String, cast, false, func, select
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
@@ -17,8 +17,9 @@ from ....core.exceptions import AppException
 from ....db.session import get_db_session
 from ....models.application import Application, ApplicationItem
 from ....models.catalog import Category, Sku
-from ....models.inventory import Asset
+from ....models.inventory import Asset, SkuAssetCounter
 from ....models.organization import Department, SysUser
+from ....models.report import ReportApplicationDaily, ReportApplicationItemDaily
 from ....schemas.common import ApiResponse, build_success_response
 from ....schemas.m07 import (
     CopilotDimension,
@@ -29,6 +30,7 @@ from ....schemas.m07 import (
     CopilotQueryRequest,
     ReportGranularity,
 )
+from ....services.sku_asset_counter_service import STATUS_COUNTER_COLUMNS
 
 from urllib import error as urllib_error
 from urllib import request as urllib_request
@@ -47,10 +49,7 @@ def _require_admin(context: AuthContext) -> None:
     )
 
 
-def _resolve_datetime_window(
-    start_date: date | None,
-    end_date: date | None,
-) -> tuple[datetime | None, datetime | None]:
+def _validate_date_window(start_date: date | None, end_date: date | None) -> None:
     if start_date and end_date and start_date > end_date:
         raise AppException(
             code="VALIDATION_ERROR",
@@ -61,6 +60,13 @@ def _resolve_datetime_window(
             },
         )
 
+
+def _resolve_datetime_window(
+    start_date: date | None,
+    end_date: date | None,
+) -> tuple[datetime | None, datetime | None]:
+    _validate_date_window(start_date, end_date)
+
     start_at = datetime.combine(start_date, time.min) if start_date else None
     end_at = (
         datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
@@ -68,8 +74,21 @@ def _resolve_datetime_window(
     return start_at, end_at
 
 
-def _bucket_from_datetime(value: datetime, granularity: ReportGranularity) -> str:
-    day_value = value.date()
+def _rollup_day_filters(
+    day_column: Any,
+    start_date: date | None,
+    end_date: date | None,
+) -> list[Any]:
+    _validate_date_window(start_date, end_date)
+    filters: list[Any] = []
+    if start_date is not None:
+        filters.append(day_column >= start_date)
+    if end_date is not None:
+        filters.append(day_column <= end_date)
+    return filters
+
+
+def _bucket_from_date(day_value: date, granularity: ReportGranularity) -> str:
     if granularity == "DAY":
         return day_value.isoformat()
     if granularity == "WEEK":
@@ -98,19 +117,21 @@ def get_applications_trend(
     db: Session = Depends(get_db_session),
 ) -> ApiResponse:
     _require_admin(context)
-    start_at, end_at = _resolve_datetime_window(start_date, end_date)
+    day_filters = _rollup_day_filters(ReportApplicationDaily.day, start_date, end_date)
 
-    stmt = select(Application.created_at)
-    if start_at is not None:
-        stmt = stmt.where(Application.created_at >= start_at)
-    if end_at is not None:
-        stmt = stmt.where(Application.created_at < end_at)
-
-    rows = db.scalars(stmt.order_by(Application.created_at.asc())).all()
+    rows = db.execute(
+        select(
+            ReportApplicationDaily.day,
+            func.sum(ReportApplicationDaily.application_count),
+        )
+        .where(*day_filters)
+        .group_by(ReportApplicationDaily.day)
+        .order_by(ReportApplicationDaily.day.asc())
+    ).all()
     bucket_counts: dict[str, int] = {}
-    for item in rows:
-        bucket = _bucket_from_datetime(item, granularity)
-        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
+    for day_value, count in rows:
+        bucket = _bucket_from_date(day_value, granularity)
+        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + int(count or 0)
 
     data = [
         {"bucket": bucket, "count": bucket_counts[bucket]}
@@ -129,38 +150,41 @@ def get_applications_trend_by_department(
 ) -> ApiResponse:
     """按部门统计申请趋势"""
     _require_admin(context)
-    start_at, end_at = _resolve_datetime_window(start_date, end_date)
+    day_filters = _rollup_day_filters(ReportApplicationDaily.day, start_date, end_date)
 
-    stmt = (
+    rows = db.execute(
         select(
-            Application.created_at,
-            Department.id,
-            Department.name,
+            ReportApplicationDaily.day,
+            ReportApplicationDaily.department_id,
+            func.sum(ReportApplicationDaily.application_count),
         )
-        .join(SysUser, Application.applicant_user_id == SysUser.id)
-        .join(Department, SysUser.department_id == Department.id, isouter=True)
+        .where(*day_filters)
+        .group_by(ReportApplicationDaily.day, ReportApplicationDaily.department_id)
+        .order_by(
+            ReportApplicationDaily.day.asc(),
+            ReportApplicationDaily.department_id.asc(),
+        )
+    ).all()
+    known_dept_names = dict(
+        db.execute(
+            select(Department.id, Department.name).where(
+                Department.id.in_({int(row[1]) for row in rows})
+            )
+        ).all()
     )
-    if start_at is not None:
-        stmt = stmt.where(Application.created_at >= start_at)
-    if end_at is not None:
-        stmt = stmt.where(Application.created_at < end_at)
-
-    rows = db.execute(stmt.order_by(Application.created_at.asc())).all()
 
     # 按时间和部门聚合
     data_dict: dict[str, dict[str, int]] = {}
     dept_names: dict[int, str] = {}
-    for row in rows:
-        created_at = row[0]
-        dept_id = row[1]
-        dept_name = row[2] or "未知部门"
-        bucket = _bucket_from_datetime(created_at, granularity)
+    for day_value, dept_id, count in rows:
+        dept_name = known_dept_names.get(dept_id) or "未知部门"
+        bucket = _bucket_from_date(day_value, granularity)
 
         if bucket not in data_dict:
             data_dict[bucket] = {}
         if dept_id not in data_dict[bucket]:
             data_dict[bucket][dept_id] = 0
-        data_dict[bucket][dept_id] += 1
+        data_dict[bucket][dept_id] += int(count or 0)
         dept_names[dept_id] = dept_name
 
     # 转换为前端需要的格式
@@ -194,39 +218,41 @@ def get_applications_trend_by_category(
 ) -> ApiResponse:
     """按物料分类统计申请趋势"""
     _require_admin(context)
-    start_at, end_at = _resolve_datetime_window(start_date, end_date)
+    day_filters = _rollup_day_filters(ReportApplicationItemDaily.day, start_date, end_date)
 
-    stmt = (
+    rows = db.execute(
         select(
-            Application.created_at,
-            Category.id,
-            Category.name,
+            ReportApplicationItemDaily.day,
+            ReportApplicationItemDaily.category_id,
+            func.sum(ReportApplicationItemDaily.item_count),
         )
-        .join(ApplicationItem, ApplicationItem.application_id == Application.id)
-        .join(Sku, Sku.id == ApplicationItem.sku_id)
-        .join(Category, Category.id == Sku.category_id, isouter=True)
+        .where(*day_filters)
+        .group_by(ReportApplicationItemDaily.day, ReportApplicationItemDaily.category_id)
+        .order_by(
+            ReportApplicationItemDaily.day.asc(),
+            ReportApplicationItemDaily.category_id.asc(),
+        )
+    ).all()
+    known_cat_names = dict(
+        db.execute(
+            select(Category.id, Category.name).where(
+                Category.id.in_({int(row[1]) for row in rows})
+            )
+        ).all()
     )
-    if start_at is not None:
-        stmt = stmt.where(Application.created_at >= start_at)
-    if end_at is not None:
-        stmt = stmt.where(Application.created_at < end_at)
-
-    rows = db.execute(stmt.order_by(Application.created_at.asc())).all()
 
     # 按时间和分类聚合
     data_dict: dict[str, dict[int, int]] = {}
     cat_names: dict[int, str] = {}
-    for row in rows:
-        created_at = row[0]
-        cat_id = row[1]
-        cat_name = row[2] or "未知分类"
-        bucket = _bucket_from_datetime(created_at, granularity)
+    for day_value, cat_id, count in rows:
+        cat_name = known_cat_names.get(cat_id) or "未知分类"
+        bucket = _bucket_from_date(day_value, granularity)
 
         if bucket not in data_dict:
             data_dict[bucket] = {}
         if cat_id not in data_dict[bucket]:
             data_dict[bucket][cat_id] = 0
-        data_dict[bucket][cat_id] += 1
+        data_dict[bucket][cat_id] += int(count or 0)
         cat_names[cat_id] = cat_name
 
     buckets = sorted(data_dict.keys())
@@ -259,37 +285,38 @@ def get_applications_trend_by_sku(
 ) -> ApiResponse:
     """按物料统计申请趋势（显示数量）"""
     _require_admin(context)
-    start_at, end_at = _resolve_datetime_window(start_date, end_date)
+    day_filters = _rollup_day_filters(ReportApplicationItemDaily.day, start_date, end_date)
 
-    stmt = (
+    rows = db.execute(
         select(
-            Application.created_at,
-            Sku.id,
-            Sku.brand,
-            Sku.model,
-            ApplicationItem.quantity,
+            ReportApplicationItemDaily.day,
+            ReportApplicationItemDaily.sku_id,
+            func.sum(ReportApplicationItemDaily.quantity),
         )
-        .join(ApplicationItem, ApplicationItem.application_id == Application.id)
-        .join(Sku, Sku.id == ApplicationItem.sku_id)
-    )
-    if start_at is not None:
-        stmt = stmt.where(Application.created_at >= start_at)
-    if end_at is not None:
-        stmt = stmt.where(Application.created_at < end_at)
-
-    rows = db.execute(stmt.order_by(Application.created_at.asc())).all()
+        .where(*day_filters)
+        .group_by(ReportApplicationItemDaily.day, ReportApplicationItemDaily.sku_id)
+        .order_by(
+            ReportApplicationItemDaily.day.asc(),
+            ReportApplicationItemDaily.sku_id.asc(),
+        )
+    ).all()
+    sku_brand_models = {
+        int(sku_id): (brand, model)
+        for sku_id, brand, model in db.execute(
+            select(Sku.id, Sku.brand, Sku.model).where(
+                Sku.id.in_({int(row[1]) for row in rows})
+            )
+        ).all()
+    }
 
     # 按时间和物料聚合（数量求和）
     data_dict: dict[str, dict[int, int]] = {}
     sku_names: dict[int, str] = {}
-    for row in rows:
-        created_at = row[0]
-        sku_id = row[1]
-        brand = row[2] or ""
-        model = row[3] or ""
-        quantity = int(row[4] or 0)
-        bucket = _bucket_from_datetime(created_at, granularity)
-        sku_label = f"{brand} {model}".strip() or f"物料{sku_id}"
+    for day_value, sku_id, quantity_sum in rows:
+        brand, model = sku_brand_models.get(sku_id, (None, None))
+        quantity = int(quantity_sum or 0)
+        bucket = _bucket_from_date(day_value, granularity)
+        sku_label = f"{brand or ''} {model or ''}".strip() or f"物料{sku_id}"
 
         if bucket not in data_dict:
             data_dict[bucket] = {}
@@ -380,13 +407,21 @@ def get_asset_status_distribution(
 ) -> ApiResponse:
     _require_admin(context)
 
-    stmt = (
-        select(Asset.status, func.count(Asset.id))
-        .group_by(Asset.status)
-        .order_by(Asset.status.asc())
-    )
-    rows = db.execute(stmt).all()
-    data = [{"status": status.value, "count": int(count)} for status, count in rows]
+    totals = db.execute(
+        select(
+            *(
+                func.coalesce(func.sum(getattr(SkuAssetCounter, column)), 0)
+                for column in STATUS_COUNTER_COLUMNS.values()
+            )
+        )
+    ).one()
+    data = [
+        {"status": status.value, "count": int(count)}
+        for status, count in sorted(
+            zip(STATUS_COUNTER_COLUMNS, totals), key=lambda pair: pair[0].value
+        )
+        if int(count) > 0
+    ]
     return build_success_response(data)
 
 
@@ -990,10 +1025,219 @@ def _serialize_metric_value(metric: CopilotMetric, value: Any) -> Any:
     return int(value)
 
 
+def _copilot_month_expr(db: Session, column: Any) -> Any:
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return func.to_char(column, "YYYY-MM-01")
+    if dialect_name == "mysql":
+        return func.date_format(column, "%Y-%m-01")
+    return func.strftime("%Y-%m-01", column)
+
+
+def _copilot_sku_label(brand: str | None, model: str | None, spec: str | None) -> str:
+    return " ".join(
+        part.strip() for part in (brand or "", model or "", spec or "") if part and part.strip()
+    )
+
+
+def _copilot_match_values(field: str, column: Any, values: list[Any]) -> Any:
+    """Equality/IN with the same typing rules as ``_matches_filter``."""
+
+    if field == "CREATED_DATE":
+        matched: list[Any] = [value for value in values if isinstance(value, str)]
+    elif field == "STATUS":
+        enum_class = column.type.enum_class
+        allowed = {member.value for member in enum_class}
+        matched = [
+            enum_class(value)
+            for value in values
+            if isinstance(value, str) and value in allowed
+        ]
+    else:
+        matched = [value for value in values if isinstance(value, int)]
+    if not matched:
+        return false()
+    return column.in_(matched)
+
+
+def _copilot_filter_condition(
+    item: CopilotFilter,
+    columns: dict[str, Any],
+    day_text: Any,
+) -> Any:
+    column = day_text if item.field == "CREATED_DATE" else columns[item.field]
+    text_column = day_text if item.field == "CREATED_DATE" else cast(column, String)
+
+    if item.op == "EQ":
+        return _copilot_match_values(item.field, column, [item.value])
+    if item.op == "IN":
+        values = item.value if isinstance(item.value, list) else [item.value]
+        return _copilot_match_values(item.field, column, values)
+    if item.op == "GTE":
+        return text_column >= str(item.value)
+    if item.op == "LTE":
+        return text_column <= str(item.value)
+    if item.op == "BETWEEN":
+        if not isinstance(item.value, list) or len(item.value) != 2:
+            return false()
+        return text_column.between(str(item.value[0]), str(item.value[1]))
+    if item.op == "CONTAINS":
+        return func.lower(text_column).contains(str(item.value).lower(), autoescape=True)
+    return false()
+
+
 def _execute_copilot_plan(
     db: Session,
     plan: CopilotQueryPlan,
 ) -> tuple[list[str], list[list[Any]]]:
+    """Compile the plan into one GROUP BY statement.
+
+    Produces the same columns and rows as ``_execute_copilot_plan_reference``;
+    metric ties are ordered by the group's first application/asset id.
+    """
+
+    source: Literal["application", "asset"] = (
+        "asset" if plan.metric == "COUNT_ASSETS" else "application"
+    )
+    start_date, end_date = _extract_filter_date_window(plan.filters)
+    start_at, end_at = _resolve_datetime_window(start_date, end_date)
+
+    if source == "asset":
+        created_at_column: Any = Asset.inbound_at
+        columns: dict[str, Any] = {
+            "DEPARTMENT_ID": Department.id,
+            "USER_ID": SysUser.id,
+            "SKU_ID": Sku.id,
+            "CATEGORY_ID": Category.id,
+            "STATUS": Asset.status,
+        }
+        metric_expr: Any = func.count(Asset.id)
+        tie_breakers: list[Any] = [func.min(Asset.id)]
+        stmt = (
+            select()
+            .select_from(Asset)
+            .join(Sku, Asset.sku_id == Sku.id)
+            .join(Category, Category.id == Sku.category_id, isouter=True)
+            .join(SysUser, Asset.holder_user_id == SysUser.id, isouter=True)
+            .join(Department, SysUser.department_id == Department.id, isouter=True)
+        )
+    else:
+        created_at_column = Application.created_at
+        columns = {
+            "DEPARTMENT_ID": Department.id,
+            "USER_ID": SysUser.id,
+            "SKU_ID": ApplicationItem.sku_id,
+            "CATEGORY_ID": Category.id,
+            "STATUS": Application.status,
+        }
+        row_cost = func.coalesce(ApplicationItem.quantity, 0) * func.coalesce(
+            Sku.reference_price, 0
+        )
+        if plan.metric == "TOTAL_COST":
+            metric_expr = func.coalesce(func.sum(row_cost), 0)
+        elif plan.metric == "MAX_COST":
+            metric_expr = func.coalesce(func.max(row_cost), 0)
+        else:
+            metric_expr = func.count(func.distinct(Application.id))
+        tie_breakers = [func.min(Application.id), func.min(ApplicationItem.id)]
+        stmt = (
+            select()
+            .select_from(Application)
+            .join(SysUser, Application.applicant_user_id == SysUser.id)
+            .join(Department, SysUser.department_id == Department.id, isouter=True)
+            .join(
+                ApplicationItem,
+                ApplicationItem.application_id == Application.id,
+                isouter=True,
+            )
+            .join(Sku, Sku.id == ApplicationItem.sku_id, isouter=True)
+            .join(Category, Category.id == Sku.category_id, isouter=True)
+        )
+
+    group_columns: list[Any] = []
+    for dimension in plan.dimensions:
+        if dimension == "USER":
+            group_columns.extend([SysUser.id, SysUser.name])
+        elif dimension == "DEPARTMENT":
+            group_columns.extend([Department.id, Department.name])
+        elif dimension == "SKU":
+            group_columns.extend([columns["SKU_ID"], Sku.brand, Sku.model, Sku.spec])
+        elif dimension == "CATEGORY":
+            group_columns.extend([Category.id, Category.name])
+        elif dimension == "STATUS":
+            group_columns.append(columns["STATUS"])
+        else:
+            group_columns.append(_copilot_month_expr(db, created_at_column))
+
+    day_text = cast(func.date(created_at_column), String)
+    conditions = [
+        _copilot_filter_condition(condition, columns, day_text)
+        for condition in plan.filters
+    ]
+    if start_at is not None:
+        conditions.append(created_at_column >= start_at)
+    if end_at is not None:
+        conditions.append(created_at_column < end_at)
+
+    order_by: list[Any] = []
+    if plan.order_by:
+        order_by.append(
+            metric_expr.desc() if plan.order_by[0].direction == "DESC" else metric_expr.asc()
+        )
+    order_by.extend(tie_breaker.asc() for tie_breaker in tie_breakers)
+
+    stmt = (
+        stmt.add_columns(*group_columns, metric_expr)
+        .where(*conditions)
+        .order_by(*order_by)
+        .limit(plan.limit)
+    )
+    if group_columns:
+        stmt = stmt.group_by(*group_columns)
+    else:
+        # A bare aggregate yields one row even without facts; the reference yields none.
+        stmt = stmt.having(func.count() > 0)
+
+    result_rows: list[list[Any]] = []
+    for row in db.execute(stmt).all():
+        values = list(row)
+        dimension_values: list[Any] = []
+        position = 0
+        for dimension in plan.dimensions:
+            if dimension == "SKU":
+                sku_id, brand, model, spec = values[position : position + 4]
+                dimension_values.extend([sku_id, _copilot_sku_label(brand, model, spec)])
+                position += 4
+            elif dimension == "STATUS":
+                status = values[position]
+                dimension_values.append(status.value if status is not None else None)
+                position += 1
+            elif dimension == "MONTH":
+                dimension_values.append(values[position])
+                position += 1
+            else:
+                dimension_values.extend(values[position : position + 2])
+                position += 2
+        result_rows.append(
+            dimension_values + [_serialize_metric_value(plan.metric, values[position])]
+        )
+
+    result_columns: list[str] = []
+    for dimension in plan.dimensions:
+        result_columns.extend(_dimension_columns(dimension))
+    result_columns.append("metric_value")
+    return result_columns, result_rows
+
+
+def _execute_copilot_plan_reference(
+    db: Session,
+    plan: CopilotQueryPlan,
+) -> tuple[list[str], list[list[Any]]]:
+    """Evaluate the plan in Python over every fact row.
+
+    Kept as the reference semantics for ``_execute_copilot_plan``.
+    """
+
     source: Literal["application", "asset"] = (
         "asset" if plan.metric == "COUNT_ASSETS" else "application"
     )
@@ -5,16 +5,21 @@ from __future__ import annotations
 from collections.abc import Iterable
 from datetime import UTC, datetime
 from decimal import Decimal, InvalidOperation
-from random import randint
 from typing import cast
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Query, UploadFile
 from sqlalchemy import delete, func, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ....core.auth import hash_password
-from ....core.auth import AuthContext, get_auth_context
+from ....core.auth import hash_password_offloaded
+from ....core.auth import (
+    AuthContext,
+    get_auth_context,
+    invalidate_all_grants,
+    invalidate_user_grants,
+)
+from ....core.catalog_cache import invalidate_catalog_cache
 from ....core.exceptions import AppException
 from ....db.session import get_db_session
 from ....models.application import Application
@@ -26,9 +31,10 @@ from ....models.enums import (
     AssetStatus,
     DeliveryType,
     SkuStockMode,
+    UserImportJobStatus,
 )
 from ....models.inventory import Asset
-from ....models.organization import Department, SysUser
+from ....models.organization import Department, SysUser, UserImportJob
 from ....models.portal import Announcement
 from ....models.rbac import (
     RbacPermission,
@@ -45,6 +51,10 @@ from ....schemas.m08 import (
     RbacRoleCreateRequest,
     RbacUiGuardsReplaceRequest,
 )
+from ....services.id_allocation_service import allocate_id, allocate_ids
+from ....services.pickup_code_service import allocate_pickup_code
+from ....services.report_rollup_service import record_application_created
+from ....services.user_import_service import read_user_import_rows, run_user_import_job
 
 router = APIRouter(tags=["M08"])
 PERMISSION_RBAC_UPDATE = "RBAC_ADMIN:UPDATE"
@@ -52,6 +62,8 @@ PERMISSION_INVENTORY_READ = "INVENTORY:READ"
 PERMISSION_INVENTORY_WRITE = "INVENTORY:WRITE"
 PERMISSION_REPORTS_READ = "REPORTS:READ"
 PERMISSION_OUTBOUND_READ = "OUTBOUND:READ"
+# Resources whose writes change the portal category tree or SKU catalog.
+CATALOG_CACHE_RESOURCES = frozenset({"categories", "skus"})
 
 UI_GUARD_TYPE_ROUTE = "ROUTE"
 UI_GUARD_TYPE_ACTION = "ACTION"
@@ -109,11 +121,6 @@ def _to_iso8601(value: datetime | None) -> str | None:
     return normalized.isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
 def _normalize_required_permissions(
     required_permissions: set[str] | None,
 ) -> set[str]:
@@ -333,7 +340,13 @@ def _sync_builtin_permissions(db: Session) -> None:
     }
 
     has_changes = False
-    next_permission_id = _next_bigint_id(db, RbacPermission)
+    permission_ids = iter(
+        allocate_ids(
+            db,
+            RbacPermission,
+            sum(1 for pair in permission_pairs if pair not in permission_by_pair),
+        )
+    )
     for item in BUILTIN_PERMISSION_DEFS:
         resource = str(item["resource"])
         action = str(item["action"])
@@ -343,14 +356,13 @@ def _sync_builtin_permissions(db: Session) -> None:
         if permission is None:
             db.add(
                 RbacPermission(
-                    id=next_permission_id,
+                    id=next(permission_ids),
                     resource=resource,
                     action=action,
                     name=code,
                     description=zh_description,
                 )
             )
-            next_permission_id += 1
             has_changes = True
             continue
 
@@ -496,12 +508,18 @@ def _resolve_permissions(
         (item.resource, item.action): item for item in existing_permissions
     }
 
-    next_permission_id = _next_bigint_id(db, RbacPermission)
+    permission_ids = iter(
+        allocate_ids(
+            db,
+            RbacPermission,
+            sum(1 for pair in permission_pairs if pair not in permission_by_pair),
+        )
+    )
     for resource, action in permission_pairs:
         if (resource, action) in permission_by_pair:
             continue
         permission = RbacPermission(
-            id=next_permission_id,
+            id=next(permission_ids),
             resource=resource,
             action=action,
             name=_permission_name(resource, action),
@@ -510,7 +528,6 @@ def _resolve_permissions(
         db.add(permission)
         db.flush()
         permission_by_pair[(resource, action)] = permission
-        next_permission_id += 1
 
     return [permission_by_pair[pair] for pair in permission_pairs]
 
@@ -774,20 +791,6 @@ def _resolve_sku_stock_mode(value: str, *, field_name: str) -> SkuStockMode:
         ) from error
 
 
-def _generate_pickup_code(db: Session) -> str:
-    for _ in range(20):
-        candidate = f"{randint(0, 999999):06d}"
-        exists = db.scalar(
-            select(Application.id).where(Application.pickup_code == candidate).limit(1)
-        )
-        if exists is None:
-            return candidate
-    raise AppException(
-        code="INTERNAL_SERVER_ERROR",
-        message="无法生成取件码，请稍后重试。",
-    )
-
-
 def _commit_or_raise_validation_error(db: Session) -> None:
     try:
         db.commit()
@@ -1131,7 +1134,7 @@ def _create_user(db: Session, payload: dict[str, object]) -> dict[str, object]:
     _require_existing_department(db, department_id)
     password = _optional_text(payload, "password", max_length=128) or "User12345"
     user = SysUser(
-        id=_next_bigint_id(db, SysUser),
+        id=allocate_id(db, SysUser),
         employee_no=employee_no,
         name=name,
         department_id=department_id,
@@ -1140,7 +1143,7 @@ def _create_user(db: Session, payload: dict[str, object]) -> dict[str, object]:
         section_name=_optional_text(payload, "section_name", max_length=64),
         mobile_phone=_optional_text(payload, "mobile_phone", max_length=32),
         job_title=_optional_text(payload, "job_title", max_length=128),
-        password_hash=hash_password(password),
+        password_hash=hash_password_offloaded(password),
     )
     db.add(user)
     _commit_or_raise_validation_error(db)
@@ -1148,6 +1151,21 @@ def _create_user(db: Session, payload: dict[str, object]) -> dict[str, object]:
     return _serialize_user(user)
 
 
+def _serialize_user_import_job(job: UserImportJob) -> dict[str, object]:
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "file_name": job.file_name,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "created_count": job.created_count,
+        "error_message": job.error_message,
+        "started_at": _to_iso8601(job.started_at),
+        "finished_at": _to_iso8601(job.finished_at),
+        "created_at": _to_iso8601(job.created_at),
+    }
+
+
 def _update_user(
     db: Session, record_id: int, payload: dict[str, object]
 ) -> dict[str, object]:
@@ -1181,7 +1199,7 @@ def _update_user(
                 message="密码不能为空。",
                 details={"field": "password"},
             )
-        user.password_hash = hash_password(password)
+        user.password_hash = hash_password_offloaded(password)
 
     _commit_or_raise_validation_error(db)
     db.refresh(user)
@@ -1197,7 +1215,7 @@ def _create_category(db: Session, payload: dict[str, object]) -> dict[str, objec
             details={"parent_id": parent_id},
         )
     category = Category(
-        id=_next_bigint_id(db, Category),
+        id=allocate_id(db, Category),
         name=_required_text(payload, "name", max_length=64),
         parent_id=parent_id,
     )
@@ -1257,7 +1275,7 @@ def _create_sku(db: Session, payload: dict[str, object]) -> dict[str, object]:
         )
 
     sku = Sku(
-        id=_next_bigint_id(db, Sku),
+        id=allocate_id(db, Sku),
         category_id=category_id,
         name=name,
         brand=brand,
@@ -1338,7 +1356,7 @@ def _create_asset(db: Session, payload: dict[str, object]) -> dict[str, object]:
         )
 
     asset = Asset(
-        id=_next_bigint_id(db, Asset),
+        id=allocate_id(db, Asset),
         asset_tag=_required_text(payload, "asset_tag", max_length=64),
         sku_id=sku_id,
         sn=_required_text(payload, "sn", max_length=128),
@@ -1404,7 +1422,7 @@ def _update_asset(
 
 def _create_application(db: Session, payload: dict[str, object]) -> dict[str, object]:
     applicant_user_id = _required_int(payload, "applicant_user_id")
-    _require_existing_user(db, applicant_user_id)
+    applicant = _require_existing_user(db, applicant_user_id)
     application_type = _resolve_application_type(
         _required_text(payload, "type"), field_name="type"
     )
@@ -1428,14 +1446,14 @@ def _create_application(db: Session, payload: dict[str, object]) -> dict[str, ob
         )
 
     application = Application(
-        id=_next_bigint_id(db, Application),
+        id=allocate_id(db, Application),
         title=_optional_text(payload, "title", max_length=255),
         applicant_user_id=applicant_user_id,
         type=application_type,
         status=status,
         delivery_type=delivery_type,
         pickup_code=_optional_text(payload, "pickup_code", max_length=6)
-        or _generate_pickup_code(db),
+        or allocate_pickup_code(db),
         pickup_qr_string=_optional_text(payload, "pickup_qr_string", max_length=512),
         applicant_name_snapshot=_optional_text(payload, "applicant_name_snapshot", max_length=64),
         applicant_department_snapshot=_optional_text(
@@ -1448,8 +1466,15 @@ def _create_application(db: Session, payload: dict[str, object]) -> dict[str, ob
         express_address_snapshot=cast(dict[str, object] | None, express_address_snapshot),
         leader_approver_user_id=_optional_int(payload, "leader_approver_user_id"),
         admin_reviewer_user_id=_optional_int(payload, "admin_reviewer_user_id"),
+        created_at=datetime.now(UTC).replace(tzinfo=None),
     )
     db.add(application)
+    record_application_created(
+        db,
+        created_at=application.created_at,
+        department_id=applicant.department_id,
+        items=[],
+    )
     _commit_or_raise_validation_error(db)
     db.refresh(application)
     return _serialize_application(application)
@@ -1547,7 +1572,7 @@ def _create_announcement(
         else AnnouncementStatus.DRAFT
     )
     announcement = Announcement(
-        id=_next_bigint_id(db, Announcement),
+        id=allocate_id(db, Announcement),
         title=_required_text(payload, "title", max_length=128),
         content=_required_text(payload, "content"),
         author_user_id=author_user_id,
@@ -1750,7 +1775,7 @@ def create_role(
         )
 
     role = RbacRole(
-        id=_next_bigint_id(db, RbacRole),
+        id=allocate_id(db, RbacRole),
         role_key=role_key,
         role_name=role_name,
         description=description,
@@ -1823,11 +1848,15 @@ def replace_ui_guards(
 
     db.execute(delete(RbacUiGuard))
 
-    next_guard_id = _next_bigint_id(db, RbacUiGuard)
+    guard_ids = iter(
+        allocate_ids(
+            db, RbacUiGuard, len(normalized_routes) + len(normalized_actions)
+        )
+    )
     for route_item in normalized_routes:
         db.add(
             RbacUiGuard(
-                id=next_guard_id,
+                id=next(guard_ids),
                 guard_type=UI_GUARD_TYPE_ROUTE,
                 guard_key=str(route_item["key"]),
                 required_permissions=_serialize_permissions_for_storage(
@@ -1835,12 +1864,11 @@ def replace_ui_guards(
                 ),
             )
         )
-        next_guard_id += 1
 
     for action_item in normalized_actions:
         db.add(
             RbacUiGuard(
-                id=next_guard_id,
+                id=next(guard_ids),
                 guard_type=UI_GUARD_TYPE_ACTION,
                 guard_key=str(action_item["key"]),
                 required_permissions=_serialize_permissions_for_storage(
@@ -1848,7 +1876,6 @@ def replace_ui_guards(
                 ),
             )
         )
-        next_guard_id += 1
 
     db.commit()
     return build_success_response(
@@ -1881,18 +1908,20 @@ def bind_role_permissions(
 
     db.execute(delete(RbacRolePermission).where(RbacRolePermission.role_id == role.id))
 
-    next_binding_id = _next_bigint_id(db, RbacRolePermission)
+    binding_ids = iter(
+        allocate_ids(db, RbacRolePermission, len(resolved_permissions))
+    )
     for permission in resolved_permissions:
         db.add(
             RbacRolePermission(
-                id=next_binding_id,
+                id=next(binding_ids),
                 role_id=role.id,
                 permission_id=permission.id,
             )
         )
-        next_binding_id += 1
 
     db.commit()
+    invalidate_all_grants(db)
     return build_success_response(
         {
             "role_key": role.role_key,
@@ -1949,18 +1978,18 @@ def replace_user_roles(
             )
 
     db.execute(delete(RbacUserRole).where(RbacUserRole.user_id == user.id))
-    next_user_role_id = _next_bigint_id(db, RbacUserRole)
+    user_role_ids = iter(allocate_ids(db, RbacUserRole, len(normalized_role_keys)))
     for role_key in normalized_role_keys:
         db.add(
             RbacUserRole(
-                id=next_user_role_id,
+                id=next(user_role_ids),
                 user_id=user.id,
                 role_id=role_key_to_id[role_key],
             )
         )
-        next_user_role_id += 1
 
     db.commit()
+    invalidate_user_grants(db, user.id)
     return build_success_response(
         {
             "user_id": user.id,
@@ -1969,6 +1998,47 @@ def replace_user_roles(
     )
 
 
+@router.post("/admin/users/import", response_model=ApiResponse)
+def import_admin_users(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    _require_super_admin(context, required_permissions={PERMISSION_RBAC_UPDATE})
+
+    rows = read_user_import_rows(db, file)
+    job = UserImportJob(
+        id=allocate_id(db, UserImportJob),
+        operator_user_id=context.user.id,
+        file_name=(file.filename or "upload.bin")[:255],
+        status=UserImportJobStatus.PENDING,
+        total_rows=len(rows),
+        processed_rows=0,
+        created_count=0,
+    )
+    db.add(job)
+    db.commit()
+
+    # Hashing runs after the response; poll the job endpoint for progress.
+    background_tasks.add_task(run_user_import_job, db.get_bind(), job.id, rows)
+    return build_success_response(_serialize_user_import_job(job))
+
+
+@router.get("/admin/users/import-jobs/{id}", response_model=ApiResponse)
+def get_admin_user_import_job(
+    id: int,
+    context: AuthContext = Depends(get_auth_context),
+    db: Session = Depends(get_db_session),
+) -> ApiResponse:
+    _require_super_admin(context, required_permissions={PERMISSION_RBAC_UPDATE})
+
+    job = db.get(UserImportJob, id)
+    if job is None:
+        raise AppException(code="RESOURCE_NOT_FOUND", message="导入任务不存在。")
+    return build_success_response(_serialize_user_import_job(job))
+
+
 @router.get("/admin/users/{id}/roles", response_model=ApiResponse)
 def get_user_roles(
     id: int,
@@ -2082,6 +2152,8 @@ def create_crud_resource(
 ) -> ApiResponse:
     _require_super_admin(context, required_permissions={PERMISSION_RBAC_UPDATE})
     data = _create_crud_resource_item(db, resource, payload)
+    if resource in CATALOG_CACHE_RESOURCES:
+        invalidate_catalog_cache(db)
     return build_success_response(
         {
             "resource": resource,
@@ -2100,6 +2172,8 @@ def update_crud_resource(
 ) -> ApiResponse:
     _require_super_admin(context, required_permissions={PERMISSION_RBAC_UPDATE})
     data = _update_crud_resource_item(db, resource, id, payload)
+    if resource in CATALOG_CACHE_RESOURCES:
+        invalidate_catalog_cache(db)
     return build_success_response(
         {
             "resource": resource,
@@ -2117,6 +2191,8 @@ def delete_crud_resource(
 ) -> ApiResponse:
     _require_super_admin(context, required_permissions={PERMISSION_RBAC_UPDATE})
     result = _delete_crud_resource_item(db, resource, id)
+    if resource in CATALOG_CACHE_RESOURCES:
+        invalidate_catalog_cache(db)
     return build_success_response(
         {
             "resource": resource,
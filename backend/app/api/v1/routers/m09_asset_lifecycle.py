@@ -3,10 +3,9 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from random import randint
 
 from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ....core.auth import AuthContext, get_auth_context
@@ -30,31 +29,12 @@ from ....schemas.m09 import (
     AssetScrapRequest,
     AssetTransferRequest,
 )
+from ....services.id_allocation_service import allocate_id
+from ....services.pickup_code_service import allocate_pickup_code
 
 router = APIRouter(tags=["M09"])
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
-
-
-def _pickup_code_exists(db: Session, pickup_code: str) -> bool:
-    stmt = select(Application.id).where(Application.pickup_code == pickup_code).limit(1)
-    return db.scalar(stmt) is not None
-
-
-def _create_pickup_code(db: Session) -> str:
-    for _ in range(10):
-        candidate = f"{randint(0, 999999):06d}"
-        if not _pickup_code_exists(db, candidate):
-            return candidate
-    raise AppException(
-        code="INTERNAL_SERVER_ERROR",
-        message="无法分配取件码，请稍后重试。",
-    )
-
-
 def _require_admin(context: AuthContext) -> None:
     if context.roles.intersection({"ADMIN", "SUPER_ADMIN"}):
         return
@@ -126,7 +106,7 @@ def _write_stock_flow(
 ) -> None:
     db.add(
         StockFlow(
-            id=_next_bigint_id(db, StockFlow),
+            id=allocate_id(db, StockFlow),
             asset_id=asset_id,
             action=action,
             operator_user_id=operator_user_id,
@@ -149,12 +129,12 @@ def create_asset_return_application(
 
     reason = payload.reason.strip()
     application = Application(
-        id=_next_bigint_id(db, Application),
+        id=allocate_id(db, Application),
         applicant_user_id=context.user.id,
         type=ApplicationType.RETURN,
         status=ApplicationStatus.SUBMITTED,
         delivery_type=DeliveryType.PICKUP,
-        pickup_code=_create_pickup_code(db),
+        pickup_code=allocate_pickup_code(db),
         pickup_qr_string=None,
     )
     db.add(application)
@@ -162,7 +142,7 @@ def create_asset_return_application(
 
     db.add(
         ApplicationItem(
-            id=_next_bigint_id(db, ApplicationItem),
+            id=allocate_id(db, ApplicationItem),
             application_id=application.id,
             sku_id=asset.sku_id,
             quantity=1,
@@ -171,7 +151,7 @@ def create_asset_return_application(
     )
     db.add(
         ApplicationAsset(
-            id=_next_bigint_id(db, ApplicationAsset),
+            id=allocate_id(db, ApplicationAsset),
             application_id=application.id,
             asset_id=asset.id,
         )
@@ -296,12 +276,12 @@ def create_asset_repair_application(
 
     fault_description = payload.fault_description.strip()
     application = Application(
-        id=_next_bigint_id(db, Application),
+        id=allocate_id(db, Application),
         applicant_user_id=context.user.id,
         type=ApplicationType.REPAIR,
         status=ApplicationStatus.SUBMITTED,
         delivery_type=DeliveryType.PICKUP,
-        pickup_code=_create_pickup_code(db),
+        pickup_code=allocate_pickup_code(db),
         pickup_qr_string=None,
     )
     db.add(application)
@@ -309,7 +289,7 @@ def create_asset_repair_application(
 
     db.add(
         ApplicationItem(
-            id=_next_bigint_id(db, ApplicationItem),
+            id=allocate_id(db, ApplicationItem),
             application_id=application.id,
             sku_id=asset.sku_id,
             quantity=1,
@@ -318,7 +298,7 @@ def create_asset_repair_application(
     )
     db.add(
         ApplicationAsset(
-            id=_next_bigint_id(db, ApplicationAsset),
+            id=allocate_id(db, ApplicationAsset),
             application_id=application.id,
             asset_id=asset.id,
         )
@@ -9,7 +9,7 @@ import json
 import re
 import secrets
 from dataclasses import dataclass
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from time import time
 from typing import Any, Literal, cast
 
@@ -22,8 +22,10 @@ from ..models.enums import TokenBlacklistReason
 from ..models.organization import SysUser
 from ..models.rbac import RbacPermission, RbacRole, RbacRolePermission, RbacUserRole
 from ..models.security import TokenBlacklist
+from .auth_cache import AuthCache, get_auth_cache
 from .config import Settings, get_settings
 from .exceptions import AppException
+from .password_hashing import get_password_hash_executor
 
 PASSWORD_POLICY = re.compile(r"^(?=.*[A-Za-z])(?=.*\d).{8,}$")
 
@@ -89,6 +91,29 @@ def verify_password(password: str, password_hash: str) -> bool:
     return hmac.compare_digest(candidate_digest, expected_digest)
 
 
+def password_needs_rehash(password_hash: str, settings: Settings | None = None) -> bool:
+    """Whether a verified hash was made with other than the configured cost."""
+
+    resolved_settings = settings or get_settings()
+    algorithm, _, remainder = password_hash.partition("$")
+    iterations = remainder.partition("$")[0]
+    return algorithm != "pbkdf2_sha256" or iterations != str(
+        resolved_settings.password_hash_iterations
+    )
+
+
+def hash_password_offloaded(password: str) -> str:
+    """``hash_password`` on the bounded hashing executor (request handlers)."""
+
+    return get_password_hash_executor().run(hash_password, password)
+
+
+def verify_password_offloaded(password: str, password_hash: str) -> bool:
+    """``verify_password`` on the bounded hashing executor (request handlers)."""
+
+    return get_password_hash_executor().run(verify_password, password, password_hash)
+
+
 def _base64url_encode(raw: bytes) -> str:
     return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
 
@@ -249,6 +274,7 @@ def blacklist_token(
     ):
         raise AppException(code="TOKEN_INVALID", message="令牌声明不正确。")
 
+    get_auth_cache(session).mark_revoked(jti, token_expires_at=expires_at)
     if session.get(TokenBlacklist, jti) is not None:
         return
 
@@ -289,16 +315,75 @@ def get_user_permissions(session: Session, user_id: int) -> set[str]:
     }
 
 
+# Each sync re-reads rows revoked shortly before the previous one, covering
+# clock skew between workers and revocations committed late. This assumes
+# revoked_at, stamped by blacklist_token() in the app, is committed within
+# the overlap (logout and password change commit right away); a row committed
+# later is missed by other workers until the token expires or their cache is
+# cleared.
+REVOCATION_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _sync_revocations(session: Session, cache: AuthCache) -> None:
+    if not cache.revocations_due():
+        return
+    now = datetime.now(UTC).replace(tzinfo=None)
+    stmt = select(TokenBlacklist.jti, TokenBlacklist.expires_at).where(
+        TokenBlacklist.expires_at > now
+    )
+    watermark = cache.revocation_watermark
+    if watermark is not None:
+        stmt = stmt.where(TokenBlacklist.revoked_at >= watermark - REVOCATION_SYNC_OVERLAP)
+    cache.load_revocations(
+        (
+            (jti, expires_at.replace(tzinfo=UTC).timestamp())
+            for jti, expires_at in session.execute(stmt).all()
+        ),
+        watermark=now,
+    )
+
+
 def _ensure_token_not_blacklisted(session: Session, claims: dict[str, Any]) -> None:
     jti = claims.get("jti")
     if not isinstance(jti, str):
         raise AppException(code="TOKEN_INVALID", message="令牌标识不正确。")
 
-    blacklisted = session.get(TokenBlacklist, jti)
-    if blacklisted is not None:
+    cache = get_auth_cache(session)
+    _sync_revocations(session, cache)
+    revoked = cache.is_revoked(jti)
+    if revoked is None:
+        revoked = session.get(TokenBlacklist, jti) is not None
+    if revoked:
         raise AppException(code="TOKEN_BLACKLISTED", message="令牌已被吊销。")
 
 
+def resolve_user_grants(session: Session, user_id: int) -> tuple[set[str], set[str]]:
+    """Return ``(roles, permissions)`` for a user, served from the auth cache."""
+
+    cache = get_auth_cache(session)
+    cached = cache.get_grants(user_id)
+    if cached is not None:
+        return set(cached.roles), set(cached.permissions)
+
+    version = cache.version
+    roles = get_user_roles(session, user_id)
+    permissions = get_user_permissions(session, user_id)
+    cache.put_grants(user_id, roles=roles, permissions=permissions, version=version)
+    return roles, permissions
+
+
+def invalidate_user_grants(session: Session, user_id: int) -> None:
+    """Drop cached grants after a user's role assignments changed."""
+
+    get_auth_cache(session).invalidate_user(user_id)
+
+
+def invalidate_all_grants(session: Session) -> None:
+    """Drop every cached grant after role/permission bindings changed."""
+
+    get_auth_cache(session).invalidate_all()
+
+
 def _resolve_user_id(claims: dict[str, Any]) -> int:
     subject = claims.get("sub")
     if not isinstance(subject, str):
@@ -334,8 +419,7 @@ def get_auth_context(
     if user is None:
         raise AppException(code="UNAUTHORIZED", message="用户不存在。")
 
-    roles = get_user_roles(db, user.id)
-    permissions = get_user_permissions(db, user.id)
+    roles, permissions = resolve_user_grants(db, user.id)
     return AuthContext(
         user=user,
         roles=roles,
@@ -0,0 +1,201 @@
+"""Per-process caches for resolved RBAC grants and token revocation checks."""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from time import time
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedGrants:
+    roles: frozenset[str]
+    permissions: frozenset[str]
+    expires_at: float
+
+
+class AuthCache:
+    """TTL cache of role/permission grants plus the set of revoked tokens.
+
+    Grants are keyed by user id. Every invalidation bumps a version counter
+    and stamps it on the user (or on all users); loaders snapshot the version
+    before reading, and ``put_grants`` drops a load that started before a
+    matching invalidation, so it cannot re-cache grants the invalidation was
+    meant to discard. The revocation set is warm-loaded from the blacklist
+    table and re-synced once per TTL, so the TTL bounds how long another
+    worker process can serve stale grants or a revoked token.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version = 0
+        self._all_invalidated_at = 0
+        self._user_invalidated_at: dict[int, int] = {}
+        self._grants: OrderedDict[int, CachedGrants] = OrderedDict()
+        self._revoked: dict[str, float] = {}
+        # Naive UTC time of the last blacklist sync; None until warm-loaded.
+        self._revocation_watermark: datetime | None = None
+        self._next_revocation_sync = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    @property
+    def version(self) -> int:
+        """Snapshot to pass to ``put_grants``; take it before loading."""
+
+        return self._version
+
+    def get_grants(self, user_id: int) -> CachedGrants | None:
+        if not self.enabled:
+            return None
+        now = time()
+        with self._lock:
+            entry = self._grants.get(user_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._grants[user_id]
+                return None
+            self._grants.move_to_end(user_id)
+            return entry
+
+    def put_grants(
+        self,
+        user_id: int,
+        *,
+        roles: set[str],
+        permissions: set[str],
+        version: int,
+    ) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            # The user (or everyone) was invalidated while the grants were loaded.
+            invalidated_at = max(
+                self._all_invalidated_at, self._user_invalidated_at.get(user_id, 0)
+            )
+            if version < invalidated_at:
+                return
+            self._grants[user_id] = CachedGrants(
+                roles=frozenset(roles),
+                permissions=frozenset(permissions),
+                expires_at=time() + self.ttl_seconds,
+            )
+            self._grants.move_to_end(user_id)
+            while len(self._grants) > self.max_entries:
+                self._grants.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            self._grants.pop(user_id, None)
+            if len(self._user_invalidated_at) >= self.max_entries:
+                # Keep the stamps bounded; one global stamp covers them all.
+                self._invalidate_all_locked()
+            else:
+                self._user_invalidated_at[user_id] = self._version
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._invalidate_all_locked()
+
+    def _invalidate_all_locked(self) -> None:
+        self._all_invalidated_at = self._version
+        self._user_invalidated_at.clear()
+        self._grants.clear()
+
+    @property
+    def revocation_watermark(self) -> datetime | None:
+        return self._revocation_watermark
+
+    def revocations_due(self) -> bool:
+        return self.enabled and time() >= self._next_revocation_sync
+
+    def load_revocations(
+        self, entries: Iterable[tuple[str, float]], *, watermark: datetime
+    ) -> None:
+        """Merge ``(jti, token_expires_at)`` pairs read from the blacklist."""
+
+        now = time()
+        with self._lock:
+            for jti, token_expires_at in entries:
+                self._revoked[jti] = token_expires_at
+            self._revoked = {
+                key: value for key, value in self._revoked.items() if value > now
+            }
+            self._revocation_watermark = watermark
+            self._next_revocation_sync = now + self.ttl_seconds
+
+    def is_revoked(self, jti: str) -> bool | None:
+        """Return revocation state, or ``None`` before the set is loaded."""
+
+        if not self.enabled or self._revocation_watermark is None:
+            return None
+        with self._lock:
+            return jti in self._revoked
+
+    def mark_revoked(self, jti: str, *, token_expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = token_expires_at
+            if len(self._revoked) > self.max_entries:
+                now = time()
+                self._revoked = {
+                    key: value for key, value in self._revoked.items() if value > now
+                }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._invalidate_all_locked()
+            self._revoked.clear()
+            self._revocation_watermark = None
+            self._next_revocation_sync = 0.0
+
+
+_CACHES: weakref.WeakKeyDictionary[Engine, AuthCache] = weakref.WeakKeyDictionary()
+_CACHES_LOCK = threading.Lock()
+
+
+def _resolve_engine(session: Session) -> Engine:
+    bind = session.get_bind()
+    if isinstance(bind, Connection):
+        return bind.engine
+    return bind
+
+
+def get_auth_cache(session: Session) -> AuthCache:
+    """Return the cache bound to the session's engine.
+
+    Caches are kept per engine so that separate databases served by the same
+    process (tests, scripts) never see each other's grants.
+    """
+
+    engine = _resolve_engine(session)
+    cache = _CACHES.get(engine)
+    if cache is not None:
+        return cache
+
+    settings = get_settings()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(engine)
+        if cache is None:
+            cache = AuthCache(
+                ttl_seconds=settings.auth_cache_ttl_seconds,
+                max_entries=settings.auth_cache_max_entries,
+            )
+            _CACHES[engine] = cache
+        return cache
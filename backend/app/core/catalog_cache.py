@@ -0,0 +1,156 @@
+"""Per-process read-through cache for the category tree and SKU catalog."""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import time
+from typing import Any, TypeVar
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+REDIS_VERSION_KEY = "catalog-cache:version"
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedValue:
+    value: Any
+    version: tuple[int, int]
+    expires_at: float
+
+
+class CatalogCache:
+    """Versioned cache of catalog projections that only change through admin CRUD.
+
+    Every entry is stamped with ``(local generation, shared version)``.
+    ``invalidate`` bumps both, so this process drops its entries at once and,
+    when a Redis client is configured, other worker processes drop theirs on
+    their next read. Without Redis the TTL bounds how long another worker can
+    serve a stale catalog.
+    """
+
+    def __init__(self, *, ttl_seconds: float, redis_client: Any | None = None) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._redis = redis_client
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._entries: dict[str, _CachedValue] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _shared_version(self) -> int | None:
+        if self._redis is None:
+            return 0
+        try:
+            return int(self._redis.get(REDIS_VERSION_KEY) or 0)
+        except Exception:
+            logger.warning("catalog cache version lookup failed", exc_info=True)
+            return None
+
+    def get_or_load(self, key: str, loader: Callable[[], T]) -> T:
+        if not self.enabled:
+            return loader()
+        shared_version = self._shared_version()
+        if shared_version is None:
+            return loader()
+
+        now = time()
+        with self._lock:
+            version = (self._generation, shared_version)
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version and entry.expires_at > now:
+                return entry.value
+
+        value = loader()
+        with self._lock:
+            # Skip the store when an invalidation happened while loading.
+            if self._generation == version[0]:
+                self._entries[key] = _CachedValue(
+                    value=value,
+                    version=version,
+                    expires_at=time() + self.ttl_seconds,
+                )
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+        if self._redis is None:
+            return
+        try:
+            self._redis.incr(REDIS_VERSION_KEY)
+        except Exception:
+            logger.warning("catalog cache version bump failed", exc_info=True)
+
+
+_CACHES: weakref.WeakKeyDictionary[Engine, CatalogCache] = weakref.WeakKeyDictionary()
+_CACHES_LOCK = threading.Lock()
+_REDIS_CLIENTS: dict[str, Any | None] = {}
+
+
+def _resolve_engine(session: Session) -> Engine:
+    bind = session.get_bind()
+    if isinstance(bind, Connection):
+        return bind.engine
+    return bind
+
+
+def _get_redis_client(redis_url: str) -> Any | None:
+    if not redis_url:
+        return None
+    if redis_url in _REDIS_CLIENTS:
+        return _REDIS_CLIENTS[redis_url]
+    try:
+        import redis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed")
+        client = None
+    else:
+        client = redis.Redis.from_url(
+            redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+    _REDIS_CLIENTS[redis_url] = client
+    return client
+
+
+def get_catalog_cache(session: Session) -> CatalogCache:
+    """Return the catalog cache bound to the session's engine."""
+
+    engine = _resolve_engine(session)
+    cache = _CACHES.get(engine)
+    if cache is not None:
+        return cache
+
+    settings = get_settings()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(engine)
+        if cache is None:
+            cache = CatalogCache(
+                ttl_seconds=settings.catalog_cache_ttl_seconds,
+                redis_client=_get_redis_client(settings.redis_url),
+            )
+            _CACHES[engine] = cache
+        return cache
+
+
+def invalidate_catalog_cache(session: Session) -> None:
+    """Drop cached catalog projections after categories or SKUs changed.
+
+    Call after the change is committed so a concurrent reader cannot cache
+    the old rows under the new version.
+    """
+
+    get_catalog_cache(session).invalidate()
@@ -0,0 +1,176 @@
+"""Response compression middleware (brotli or gzip), streaming-safe."""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Iterable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/csv",
+    "text/plain",
+)
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted: set[str] = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class _Encoder:
+    """Incremental encoder; ``compress`` output is flushed so every chunk of a
+    streamed body reaches the client without waiting for the next one."""
+
+    def __init__(self, encoding: str, *, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16+ writes the gzip header and trailer.
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Compress eligible responses with brotli (if installed) or gzip.
+
+    A response is eligible when the client accepts one of the encodings, its
+    content type is in ``content_types``, it has no ``Content-Encoding`` yet
+    and it is at least ``minimum_size`` bytes. A body sent in one message is
+    compressed in one go; a streamed body (CSV exports) is compressed chunk
+    by chunk with a flush after each, so nothing is buffered and the size
+    threshold only applies to the first chunk.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(value.strip().lower() for value in content_types if value)
+
+    def _choose_encoding(self, scope: Scope) -> str | None:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return content_type in self.content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] in (204, 304) or not self._is_compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Held back until the first body chunk decides the encoding.
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+            if encoder is None:
+                assert start_message is not None
+                headers = MutableHeaders(scope=start_message)
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _Encoder(
+                    encoding,
+                    gzip_level=self.gzip_level,
+                    brotli_quality=self.brotli_quality,
+                )
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": encoder.compress(body),
+                            "more_body": True,
+                        }
+                    )
+                    return
+                compressed = encoder.finish(body)
+                headers["Content-Length"] = str(len(compressed))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": encoder.compress(body) if more_body else encoder.finish(body),
+                    "more_body": more_body,
+                }
+            )
+
+        await self.app(scope, receive, send_compressed)
@@ -21,6 +21,16 @@ class Settings:
     app_name: str
     environment: str
     log_level: str
+    log_queue_size: int
+    log_queue_block: bool
+    log_routine_sample_every: int
+    sql_n_plus_one_threshold: int
+    metrics_refresh_interval_seconds: int
+    compression_enabled: bool
+    compression_min_size: int
+    compression_gzip_level: int
+    compression_brotli_quality: int
+    compression_content_types: tuple[str, ...]
     request_id_header: str
     expose_error_details: bool
     upload_dir: str
@@ -32,6 +42,15 @@ class Settings:
     refresh_cookie_secure: bool
     refresh_cookie_samesite: str
     password_hash_iterations: int
+    password_hash_max_workers: int
+    password_hash_max_queue: int
+    user_import_hash_workers: int
+    auth_cache_ttl_seconds: int
+    auth_cache_max_entries: int
+    token_blacklist_prune_interval_seconds: int
+    id_allocator_block_size: int
+    catalog_cache_ttl_seconds: int
+    redis_url: str
 
 
 @lru_cache(maxsize=1)
@@ -43,6 +62,30 @@ def get_settings() -> Settings:
         # Accept both APP_ENV (preferred) and ENVIRONMENT (legacy/doc-friendly).
         environment=(os.getenv("APP_ENV") or os.getenv("ENVIRONMENT") or "development"),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
+        log_queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        # Off: drop records when the queue is full instead of stalling requests.
+        log_queue_block=_get_bool_env("LOG_QUEUE_BLOCK", False),
+        # 1 logs every successful health-check, /metrics and static-file request.
+        log_routine_sample_every=int(os.getenv("LOG_ROUTINE_SAMPLE_EVERY", "100")),
+        # Same SQL run this many times in one request is logged as a likely
+        # N+1 pattern; 0 disables the check.
+        sql_n_plus_one_threshold=int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10")),
+        # 0 stops refreshing the business gauges on /metrics.
+        metrics_refresh_interval_seconds=int(
+            os.getenv("METRICS_REFRESH_INTERVAL_SECONDS", "30")
+        ),
+        compression_enabled=_get_bool_env("COMPRESSION_ENABLED", True),
+        compression_min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        compression_gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        # Brotli is used only when the optional brotli package is installed.
+        compression_brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+        compression_content_types=tuple(
+            value.strip()
+            for value in os.getenv(
+                "COMPRESSION_CONTENT_TYPES", "application/json,text/csv,text/plain"
+            ).split(",")
+            if value.strip()
+        ),
         request_id_header=os.getenv("REQUEST_ID_HEADER", "X-Request-ID"),
         expose_error_details=_get_bool_env("EXPOSE_ERROR_DETAILS", False),
         upload_dir=os.getenv("UPLOAD_DIR", "uploads"),
@@ -54,4 +97,17 @@ def get_settings() -> Settings:
         refresh_cookie_secure=_get_bool_env("REFRESH_COOKIE_SECURE", False),
         refresh_cookie_samesite=os.getenv("REFRESH_COOKIE_SAMESITE", "strict"),
         password_hash_iterations=int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000")),
+        password_hash_max_workers=int(os.getenv("PASSWORD_HASH_MAX_WORKERS", "4")),
+        password_hash_max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16")),
+        # 0 uses every core.
+        user_import_hash_workers=int(os.getenv("USER_IMPORT_HASH_WORKERS", "0")),
+        auth_cache_ttl_seconds=int(os.getenv("AUTH_CACHE_TTL_SECONDS", "30")),
+        auth_cache_max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000")),
+        # 0 disables the in-process pruner (e.g. when a cron job runs it).
+        token_blacklist_prune_interval_seconds=int(
+            os.getenv("TOKEN_BLACKLIST_PRUNE_INTERVAL_SECONDS", "3600")
+        ),
+        id_allocator_block_size=int(os.getenv("ID_ALLOCATOR_BLOCK_SIZE", "100")),
+        catalog_cache_ttl_seconds=int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300")),
+        redis_url=os.getenv("REDIS_URL", ""),
     )
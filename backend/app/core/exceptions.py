@@ -44,6 +44,7 @@ ERROR_CODE_TO_STATUS: dict[str, int] = {
     "INTERNAL_SERVER_ERROR": HTTPStatus.INTERNAL_SERVER_ERROR,
     "DATABASE_ERROR": HTTPStatus.INTERNAL_SERVER_ERROR,
     "EXTERNAL_SERVICE_ERROR": HTTPStatus.INTERNAL_SERVER_ERROR,
+    "SERVICE_UNAVAILABLE": HTTPStatus.SERVICE_UNAVAILABLE,
 }
 
 ERROR_CODE_TO_MESSAGE: dict[str, str] = {
@@ -53,6 +54,7 @@ ERROR_CODE_TO_MESSAGE: dict[str, str] = {
     "RESOURCE_NOT_FOUND": "资源不存在。",
     "RATE_LIMIT_EXCEEDED": "请求过于频繁，请稍后再试。",
     "INTERNAL_SERVER_ERROR": "系统繁忙，请稍后再试。",
+    "SERVICE_UNAVAILABLE": "服务繁忙，请稍后再试。",
 }
 
 HTTP_STATUS_TO_ERROR_CODE: dict[int, str] = {
@@ -61,6 +63,7 @@ HTTP_STATUS_TO_ERROR_CODE: dict[int, str] = {
     HTTPStatus.FORBIDDEN: "PERMISSION_DENIED",
     HTTPStatus.NOT_FOUND: "RESOURCE_NOT_FOUND",
     HTTPStatus.TOO_MANY_REQUESTS: "RATE_LIMIT_EXCEEDED",
+    HTTPStatus.SERVICE_UNAVAILABLE: "SERVICE_UNAVAILABLE",
 }
 
 
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import atexit
+import itertools
 import json
 import logging
+import queue
 from contextvars import ContextVar, Token
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 _REQUEST_CONTEXT: ContextVar[dict[str, Any] | None] = ContextVar(
@@ -13,6 +17,12 @@ _REQUEST_CONTEXT: ContextVar[dict[str, Any] | None] = ContextVar(
     default=None,
 )
 _LOGGING_INITIALIZED = False
+_LOG_LISTENER: QueueListener | None = None
+_LOG_HANDLER: BoundedQueueHandler | None = None
+
+# Successful requests to these paths are logged one in N.
+ROUTINE_REQUEST_PATHS = ("/healthz", "/metrics")
+ROUTINE_REQUEST_PATH_PREFIXES = ("/api/v1/uploads/",)
 
 
 def get_request_context() -> dict[str, Any]:
@@ -53,19 +63,68 @@ class RequestContextFilter(logging.Filter):
     """Inject request context attributes into each log record."""
 
     def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003
-        context = get_request_context()
+        context = _REQUEST_CONTEXT.get() or {}
         record.request_id = context.get("request_id")
         record.method = context.get("method")
         record.path = context.get("path")
         return True
 
 
+class RoutineRequestSampler(logging.Filter):
+    """Keep one in ``every`` successful ``request.completed`` records for
+    health checks, scrapes and static uploads; everything else passes through."""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = max(1, every)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:  # noqa: A003
+        if self.every == 1 or getattr(record, "event", None) != "request.completed":
+            return True
+        status_code = getattr(record, "status_code", None)
+        if status_code is None or status_code >= 400:
+            return True
+        path = getattr(record, "path", None) or ""
+        if path not in ROUTINE_REQUEST_PATHS and not path.startswith(
+            ROUTINE_REQUEST_PATH_PREFIXES
+        ):
+            return True
+        return next(self._counter) % self.every == 0
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hand records to the listener thread without formatting them.
+
+    Records stay in-process, so the stock ``prepare`` step (which formats
+    the message and exception text for pickling) is skipped. When the queue
+    is full the record is dropped and counted, unless ``block`` is set.
+    """
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord], *, block: bool) -> None:
+        super().__init__(log_queue)
+        self.block = block
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
 class JsonFormatter(logging.Formatter):
     """Serialize log records into newline-delimited JSON."""
 
     def format(self, record: logging.LogRecord) -> str:
         payload: dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc)
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
             .isoformat(timespec="seconds")
             .replace("+00:00", "Z"),
             "level": record.levelname,
@@ -80,6 +139,10 @@ class JsonFormatter(logging.Formatter):
             "path",
             "status_code",
             "duration_ms",
+            "db_queries",
+            "db_time_ms",
+            "sql_statement",
+            "sql_repeat_count",
             "client_ip",
             "error_code",
             "environment",
@@ -94,18 +157,34 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(payload, ensure_ascii=False)
 
 
-def setup_logging(level: str = "INFO") -> None:
-    """Configure process-wide structured logging exactly once."""
+def setup_logging(
+    level: str = "INFO",
+    *,
+    queue_size: int = 10000,
+    block_when_full: bool = False,
+    routine_sample_every: int = 100,
+) -> None:
+    """Configure process-wide structured logging exactly once.
+
+    Request threads only filter records and put them on a bounded queue; a
+    ``QueueListener`` thread formats them as JSON and writes to the stream.
+    """
 
-    global _LOGGING_INITIALIZED
+    global _LOGGING_INITIALIZED, _LOG_LISTENER, _LOG_HANDLER
     if _LOGGING_INITIALIZED:
         return
 
     normalized_level = getattr(logging, level.upper(), logging.INFO)
 
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=max(1, queue_size))
+    handler = BoundedQueueHandler(log_queue, block=block_when_full)
+    # Context variables are only visible on the calling thread, so the
+    # context filter has to run before the record is queued.
     handler.addFilter(RequestContextFilter())
+    handler.addFilter(RoutineRequestSampler(routine_sample_every))
 
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
@@ -118,9 +197,34 @@ def setup_logging(level: str = "INFO") -> None:
         logger.propagate = True
         logger.setLevel(normalized_level)
 
+    _LOG_LISTENER = QueueListener(log_queue, stream_handler)
+    _LOG_LISTENER.start()
+    _LOG_HANDLER = handler
     _LOGGING_INITIALIZED = True
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+
+    global _LOGGING_INITIALIZED, _LOG_LISTENER, _LOG_HANDLER
+    listener, _LOG_LISTENER = _LOG_LISTENER, None
+    if listener is not None:
+        listener.stop()
+    if _LOG_HANDLER is not None:
+        logging.getLogger().removeHandler(_LOG_HANDLER)
+        _LOG_HANDLER = None
+    _LOGGING_INITIALIZED = False
+
+
+def get_dropped_log_count() -> int:
+    """Return how many records were dropped because the queue was full."""
+
+    return _LOG_HANDLER.dropped if _LOG_HANDLER is not None else 0
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Return module-level logger."""
 
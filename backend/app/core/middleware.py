@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import time
-from typing import Awaitable, Callable
 from uuid import uuid4
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .logging import (
     bind_request_context,
@@ -16,8 +15,12 @@ from .logging import (
     get_request_id,
     reset_request_context,
 )
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from .request_timing import reset_request_timing, start_request_timing
 
 DEFAULT_REQUEST_ID_HEADER = "X-Request-ID"
+# Route label for requests no route matched, so 404 scans stay one series.
+UNMATCHED_ROUTE = "<unmatched>"
 logger = get_logger(__name__)
 
 
@@ -47,18 +50,54 @@ def extract_request_id(request: Request) -> str | None:
     return get_request_id()
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    """Inject request id header and bind per-request log context."""
+def _route_template(scope: Scope) -> str:
+    """Return the matched route's path template, e.g. ``/api/v1/skus/{sku_id}``.
 
-    def __init__(self, app, header_name: str = DEFAULT_REQUEST_ID_HEADER) -> None:
-        super().__init__(app)
-        self.header_name = header_name
+    ``scope["route"]`` holds the route as declared on its router, without the
+    include prefix; the prefix is recovered from the request path.
+    """
+
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not isinstance(template, str):
+        return UNMATCHED_ROUTE
+    path_format = getattr(route, "path_format", template)
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+class RequestContextMiddleware:
+    """Inject request id header and bind per-request log context.
+
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the response
+    body is passed through untouched and streamed exports keep streaming. A
+    ``Server-Timing`` header reports total and DB time up to the moment the
+    response headers are sent; the ``request.completed`` log line covers the
+    whole body.
+    """
 
-    async def dispatch(
+    def __init__(
         self,
-        request: Request,
-        call_next: Callable[[Request], Awaitable[Response]],
-    ) -> Response:
+        app: ASGIApp,
+        header_name: str = DEFAULT_REQUEST_ID_HEADER,
+        n_plus_one_threshold: int = 0,
+    ) -> None:
+        self.app = app
+        self.header_name = header_name
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         request_id = resolve_request_id(request, self.header_name)
         token = bind_request_context(
             request_id=request_id,
@@ -67,31 +106,57 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
             client_ip=request.client.host if request.client else None,
         )
         request.state.request_id = request_id
+        timing, timing_token = start_request_timing(f"{request.method} {request.url.path}")
+        status_code: int | None = None
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers[self.header_name] = request_id
+                headers.append("Server-Timing", timing.server_timing())
+            await send(message)
 
-        started_at = time.perf_counter()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers)
         except Exception:
-            duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
             logger.exception(
                 "request_unhandled_exception",
                 extra={
                     "event": "request.unhandled_exception",
-                    "duration_ms": duration_ms,
+                    "duration_ms": timing.elapsed_ms(),
                 },
             )
             raise
         else:
-            duration_ms = round((time.perf_counter() - started_at) * 1000, 2)
-            response.headers[self.header_name] = request_id
             logger.info(
                 "request_completed",
                 extra={
                     "event": "request.completed",
-                    "status_code": response.status_code,
-                    "duration_ms": duration_ms,
+                    "status_code": status_code,
+                    "duration_ms": timing.elapsed_ms(),
+                    "db_queries": timing.db_queries,
+                    "db_time_ms": timing.db_time_ms(),
                 },
             )
-            return response
+            for statement, count in timing.repeated_statements(self.n_plus_one_threshold):
+                logger.warning(
+                    "sql_suspected_n_plus_one",
+                    extra={
+                        "event": "sql.suspected_n_plus_one",
+                        "sql_statement": statement,
+                        "sql_repeat_count": count,
+                    },
+                )
         finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - timing.started_at,
+                request.method,
+                _route_template(scope),
+                f"{(status_code or 500) // 100}xx",
+            )
+            reset_request_timing(timing_token)
             reset_request_context(token)
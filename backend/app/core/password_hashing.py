@@ -0,0 +1,81 @@
+"""Bounded, dedicated executor for PBKDF2 password hashing."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from .config import get_settings
+from .exceptions import AppException
+
+T = TypeVar("T")
+
+
+class PasswordHashExecutor:
+    """Run password hashing on its own small thread pool.
+
+    PBKDF2 keeps a core busy for a large fraction of a second and releases the
+    GIL while doing so. Running it here caps a login burst at ``max_workers``
+    cores, and admission control caps callers waiting for a worker at
+    ``max_queue``: anyone past that gets ``SERVICE_UNAVAILABLE`` immediately
+    instead of holding one of the request threads every sync endpoint shares.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="password-hash",
+        )
+
+    def _release_slot(self, _: Future[Any]) -> None:
+        self._slots.release()
+
+    def run(self, fn: Callable[..., T], /, *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise AppException(
+                code="SERVICE_UNAVAILABLE",
+                message="登录请求过多，请稍后再试。",
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        return future.result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTOR: PasswordHashExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_password_hash_executor() -> PasswordHashExecutor:
+    global _EXECUTOR
+    executor = _EXECUTOR
+    if executor is not None:
+        return executor
+
+    settings = get_settings()
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = PasswordHashExecutor(
+                max_workers=settings.password_hash_max_workers,
+                max_queue=settings.password_hash_max_queue,
+            )
+        return _EXECUTOR
+
+
+def shutdown_password_hash_executor() -> None:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,149 @@
+"""Per-request timing counters fed by SQLAlchemy cursor events."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+
+_QUERY_STARTS_KEY = "request_timing_query_starts"
+
+
+@dataclass(slots=True)
+class RequestTiming:
+    """Mutable counters for one request.
+
+    The object itself is stored in a context variable, so sync endpoints
+    running in the threadpool (which see a copy of the context) still add to
+    the same counters.
+    """
+
+    name: str = ""
+    started_at: float = field(default_factory=time.perf_counter)
+    db_time: float = 0.0
+    db_queries: int = 0
+    # Keyed by SQL text; bound values are sent separately, so this is the
+    # statement shape.
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 2)
+
+    def db_time_ms(self) -> float:
+        return round(self.db_time * 1000, 2)
+
+    def server_timing(self) -> str:
+        """Render the counters as a ``Server-Timing`` header value."""
+
+        return (
+            f"total;dur={self.elapsed_ms()}, "
+            f'db;dur={self.db_time_ms()};desc="{self.db_queries} queries"'
+        )
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most frequent first."""
+
+        if threshold <= 0:
+            return []
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_REQUEST_TIMING: ContextVar[RequestTiming | None] = ContextVar(
+    "request_timing",
+    default=None,
+)
+
+
+_OBSERVERS: list[list[RequestTiming]] = []
+_OBSERVERS_LOCK = threading.Lock()
+
+
+def start_request_timing(name: str = "") -> tuple[RequestTiming, Token[RequestTiming | None]]:
+    timing = RequestTiming(name=name)
+    return timing, _REQUEST_TIMING.set(timing)
+
+
+def reset_request_timing(token: Token[RequestTiming | None]) -> None:
+    timing = _REQUEST_TIMING.get()
+    _REQUEST_TIMING.reset(token)
+    if timing is not None and _OBSERVERS:
+        with _OBSERVERS_LOCK:
+            for observer in _OBSERVERS:
+                observer.append(timing)
+
+
+def get_request_timing() -> RequestTiming | None:
+    return _REQUEST_TIMING.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Connection, *_args: object) -> None:
+    if _REQUEST_TIMING.get() is None:
+        return
+    conn.info.setdefault(_QUERY_STARTS_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Connection, _cursor: object, statement: str, *_args: object
+) -> None:
+    timing = _REQUEST_TIMING.get()
+    starts = conn.info.get(_QUERY_STARTS_KEY)
+    if timing is None or not starts:
+        return
+    timing.db_time += time.perf_counter() - starts.pop()
+    timing.db_queries += 1
+    timing.statements[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_failed_query(context: ExceptionContext) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start.
+    conn = context.connection
+    if conn is not None and conn.info.get(_QUERY_STARTS_KEY):
+        conn.info[_QUERY_STARTS_KEY].pop()
+
+
+@contextmanager
+def track_request_timings() -> Iterator[list[RequestTiming]]:
+    """Collect the timing of every request that finishes inside the block.
+
+    Meant for tests: the list is shared across threads because the test
+    client serves requests on its own event-loop thread.
+    """
+
+    timings: list[RequestTiming] = []
+    with _OBSERVERS_LOCK:
+        _OBSERVERS.append(timings)
+    try:
+        yield timings
+    finally:
+        with _OBSERVERS_LOCK:
+            _OBSERVERS.remove(timings)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int) -> Iterator[list[RequestTiming]]:
+    """Fail if any request finished inside the block ran more than
+    ``max_queries`` statements."""
+
+    with track_request_timings() as timings:
+        yield timings
+    for timing in timings:
+        if timing.db_queries > max_queries:
+            statement, count = timing.statements.most_common(1)[0]
+            raise AssertionError(
+                f"{timing.name} ran {timing.db_queries} queries, budget is {max_queries}; "
+                f"most repeated ({count}x): {statement}"
+            )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Table, and_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def increment_rows(
+    executor: Session | Connection,
+    table: Table,
+    rows: Sequence[dict[str, Any]],
+    *,
+    counters: Sequence[str],
+) -> None:
+    """Add ``counters`` of each row onto the stored row with the same key.
+
+    Uses a native upsert so concurrent writers add to the same row atomically.
+    ``rows`` must not repeat a primary key.
+    """
+
+    if not rows:
+        return
+
+    key_columns = [column.name for column in table.primary_key.columns]
+    dialect_name = (
+        executor.dialect.name
+        if isinstance(executor, Connection)
+        else executor.get_bind().dialect.name
+    )
+    if dialect_name in {"postgresql", "sqlite"}:
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(table).values(list(rows))
+        executor.execute(
+            stmt.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+            )
+        )
+        return
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table).values(list(rows))
+        executor.execute(
+            stmt.on_duplicate_key_update(
+                {name: table.c[name] + stmt.inserted[name] for name in counters}
+            )
+        )
+        return
+
+    for row in rows:
+        key_clause = and_(*(table.c[name] == row[name] for name in key_columns))
+        existing = executor.execute(select(table).where(key_clause).with_for_update()).first()
+        if existing is None:
+            executor.execute(table.insert().values(**row))
+            continue
+        executor.execute(
+            update(table)
+            .where(key_clause)
+            .values({name: table.c[name] + row[name] for name in counters})
+        )
+
+
+def insert_missing_rows(
+    executor: Session | Connection,
+    table: Table,
+    rows: Sequence[dict[str, Any]],
+) -> None:
+    """Insert ``rows``, skipping any whose primary key is already stored."""
+
+    if not rows:
+        return
+
+    key_columns = [column.name for column in table.primary_key.columns]
+    dialect_name = (
+        executor.dialect.name
+        if isinstance(executor, Connection)
+        else executor.get_bind().dialect.name
+    )
+    if dialect_name in {"postgresql", "sqlite"}:
+        dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+        executor.execute(
+            dialect_insert(table)
+            .values(list(rows))
+            .on_conflict_do_nothing(index_elements=key_columns)
+        )
+        return
+    if dialect_name == "mysql":
+        executor.execute(mysql.insert(table).values(list(rows)).prefix_with("IGNORE"))
+        return
+
+    for row in rows:
+        key_clause = and_(*(table.c[name] == row[name] for name in key_columns))
+        if executor.execute(select(table).where(key_clause)).first() is None:
+            executor.execute(table.insert().values(**row))
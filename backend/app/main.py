@@ -1,24 +1,43 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from .api.v1.api import api_router
+from .core.compression import CompressionMiddleware
 from .core.config import get_settings
 from .core.exceptions import register_exception_handlers
-from .core.logging import get_logger, setup_logging
+from .core.logging import get_logger, setup_logging, shutdown_logging
+from .core.metrics import REGISTRY
 from .core.middleware import RequestContextMiddleware
+from .core.password_hashing import shutdown_password_hash_executor
+from .db.session import SessionLocal, engine
+from .services.metrics_service import (
+    collect_threadpool_metrics,
+    register_engine_pool_metrics,
+    run_business_metrics_refresher,
+)
+from .services.token_blacklist_service import run_blacklist_pruner
+from .services.user_import_service import shutdown_password_hash_process_pool
 
 settings = get_settings()
 logger = get_logger(__name__)
 upload_root = Path(settings.upload_dir)
 upload_root.mkdir(parents=True, exist_ok=True)
+register_engine_pool_metrics(engine)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    setup_logging(settings.log_level)
+    setup_logging(
+        settings.log_level,
+        queue_size=settings.log_queue_size,
+        block_when_full=settings.log_queue_block,
+        routine_sample_every=settings.log_routine_sample_every,
+    )
     logger.info(
         "application_startup",
         extra={
@@ -26,12 +45,54 @@ async def lifespan(_: FastAPI):
             "environment": settings.environment,
         },
     )
+    blacklist_pruner = (
+        asyncio.create_task(
+            run_blacklist_pruner(
+                SessionLocal,
+                interval_seconds=settings.token_blacklist_prune_interval_seconds,
+            )
+        )
+        if settings.token_blacklist_prune_interval_seconds > 0
+        else None
+    )
+    metrics_refresher = (
+        asyncio.create_task(
+            run_business_metrics_refresher(
+                SessionLocal,
+                interval_seconds=settings.metrics_refresh_interval_seconds,
+            )
+        )
+        if settings.metrics_refresh_interval_seconds > 0
+        else None
+    )
     yield
+    for task in (blacklist_pruner, metrics_refresher):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    shutdown_password_hash_executor()
+    shutdown_password_hash_process_pool()
     logger.info("application_shutdown", extra={"event": "application.shutdown"})
+    shutdown_logging()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
-app.add_middleware(RequestContextMiddleware, header_name=settings.request_id_header)
+if settings.compression_enabled:
+    # Added first so it sits inside RequestContextMiddleware, whose timing
+    # and headers then cover the compressed response.
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        content_types=settings.compression_content_types,
+    )
+app.add_middleware(
+    RequestContextMiddleware,
+    header_name=settings.request_id_header,
+    n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+)
 register_exception_handlers(app)
 app.include_router(api_router, prefix="/api/v1")
 app.mount("/api/v1/uploads", StaticFiles(directory=str(upload_root)), name="uploads")
@@ -40,3 +101,13 @@ app.mount("/api/v1/uploads", StaticFiles(directory=str(upload_root)), name="uplo
 @app.get("/healthz", tags=["system"])
 def healthz() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    # Runs on the event loop so the threadpool limiter can be read.
+    collect_threadpool_metrics()
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -4,14 +4,17 @@ from app.models.application import (
     ApplicationItem,
     ApprovalHistory,
     Logistics,
+    PickupCodePool,
 )
 from app.models.catalog import Category, Sku
+from app.models.id_allocator import IdAllocator
 from app.models.inbound import OcrInboundJob
-from app.models.inventory import Asset, StockFlow
+from app.models.inventory import Asset, SkuAssetCounter, StockFlow
 from app.models.sku_stock import SkuStock, SkuStockFlow
 from app.models.notification import NotificationOutbox, UserAddress
-from app.models.organization import Department, SysUser
+from app.models.organization import Department, SysUser, UserImportJob
 from app.models.portal import Announcement, HeroBanner
+from app.models.report import ReportApplicationDaily, ReportApplicationItemDaily
 from app.models.rbac import (
     RbacPermission,
     RbacRole,
@@ -27,10 +30,13 @@ __all__ = [
     "ApplicationItem",
     "ApprovalHistory",
     "Logistics",
+    "PickupCodePool",
     "Category",
     "Sku",
+    "IdAllocator",
     "OcrInboundJob",
     "Asset",
+    "SkuAssetCounter",
     "StockFlow",
     "SkuStock",
     "SkuStockFlow",
@@ -38,6 +44,7 @@ __all__ = [
     "UserAddress",
     "Department",
     "SysUser",
+    "UserImportJob",
     "Announcement",
     "HeroBanner",
     "RbacPermission",
@@ -45,6 +52,8 @@ __all__ = [
     "RbacRolePermission",
     "RbacUiGuard",
     "RbacUserRole",
+    "ReportApplicationDaily",
+    "ReportApplicationItemDaily",
     "AuditLog",
     "TokenBlacklist",
 ]
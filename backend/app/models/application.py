@@ -9,6 +9,7 @@ from sqlalchemy import (
     Integer,
     String,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -23,14 +24,60 @@ from app.models.enums import (
 )
 from app.models.mixins import TimestampMixin
 
+# Statuses after which an application no longer needs its pickup code.
+PICKUP_CODE_RELEASED_STATUSES = frozenset(
+    {
+        ApplicationStatus.LEADER_REJECTED,
+        ApplicationStatus.ADMIN_REJECTED,
+        ApplicationStatus.OUTBOUNDED,
+        ApplicationStatus.SHIPPED,
+        ApplicationStatus.DONE,
+        ApplicationStatus.CANCELLED,
+    }
+)
+ACTIVE_PICKUP_CODE_CONDITION = "status NOT IN ({})".format(
+    ", ".join(f"'{status.value}'" for status in sorted(PICKUP_CODE_RELEASED_STATUSES))
+)
+# Statuses in which the applicant can be served at the pickup counter.
+PICKUP_READY_STATUSES = frozenset(
+    {ApplicationStatus.ADMIN_APPROVED, ApplicationStatus.READY_OUTBOUND}
+)
+PICKUP_READY_CONDITION = "status IN ({})".format(
+    ", ".join(f"'{status.value}'" for status in sorted(PICKUP_READY_STATUSES))
+)
+
 
 class Application(TimestampMixin, Base):
     __tablename__ = "application"
     __table_args__ = (
         Index("idx_application_applicant_time", "applicant_user_id", "created_at"),
         Index("idx_application_status", "status"),
+        Index("idx_application_status_time", "status", "created_at", "id"),
         Index("idx_application_delivery_type", "delivery_type"),
-        UniqueConstraint("pickup_code", name="uk_application_pickup_code"),
+        Index("idx_application_pickup_code", "pickup_code", "id"),
+        # Codes are unique among open applications only; closed applications
+        # hand theirs back to ``pickup_code_pool`` for reuse. MySQL has no
+        # partial indexes, so there the pool alone keeps open codes distinct.
+        Index(
+            "uk_application_active_pickup_code",
+            "pickup_code",
+            unique=True,
+            postgresql_where=text(ACTIVE_PICKUP_CODE_CONDITION),
+            sqlite_where=text(ACTIVE_PICKUP_CODE_CONDITION),
+        ).ddl_if(dialect=("postgresql", "sqlite")),
+        # Counter scans only need applications that can still be picked up.
+        Index(
+            "idx_application_pickup_ready_code",
+            "pickup_code",
+            postgresql_where=text(PICKUP_READY_CONDITION),
+            sqlite_where=text(PICKUP_READY_CONDITION),
+        ).ddl_if(dialect=("postgresql", "sqlite")),
+        Index(
+            "idx_application_pickup_ready_qr",
+            "pickup_qr_string",
+            postgresql_where=text(PICKUP_READY_CONDITION),
+            sqlite_where=text(PICKUP_READY_CONDITION),
+        ),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -46,6 +93,7 @@ class Application(TimestampMixin, Base):
     status: Mapped[ApplicationStatus] = mapped_column(
         enum_column(ApplicationStatus, "application_status"),
         nullable=False,
+        active_history=True,
     )
     delivery_type: Mapped[DeliveryType] = mapped_column(
         enum_column(DeliveryType, "delivery_type"),
@@ -170,3 +218,11 @@ class Logistics(TimestampMixin, Base):
     shipped_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=False), nullable=True
     )
+
+
+class PickupCodePool(Base):
+    """Free pickup codes, refilled in batches and fed by closed applications."""
+
+    __tablename__ = "pickup_code_pool"
+
+    code: Mapped[str] = mapped_column(String(6), primary_key=True)
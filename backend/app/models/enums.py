@@ -88,6 +88,13 @@ class OcrJobStatus(StrEnum):
     FAILED = "FAILED"
 
 
+class UserImportJobStatus(StrEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
 class SkuStockMode(StrEnum):
     SERIALIZED = "SERIALIZED"
     QUANTITY = "QUANTITY"
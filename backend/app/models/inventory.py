@@ -5,6 +5,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Index,
+    Integer,
     JSON,
     String,
     UniqueConstraint,
@@ -28,22 +29,28 @@ class Asset(TimestampMixin, Base):
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     asset_tag: Mapped[str] = mapped_column(String(64), nullable=False)
+    # sku_id, status and locked_application_id feed sku_asset_counter; active
+    # history keeps their previous values available to the flush hook.
     sku_id: Mapped[int] = mapped_column(
         BigInteger,
         ForeignKey("sku.id", name="fk_asset_sku", ondelete="RESTRICT"),
         nullable=False,
+        active_history=True,
     )
     sn: Mapped[str] = mapped_column(String(128), nullable=False)
     status: Mapped[AssetStatus] = mapped_column(
         enum_column(AssetStatus, "asset_status"),
         nullable=False,
+        active_history=True,
     )
     holder_user_id: Mapped[int | None] = mapped_column(
         BigInteger,
         ForeignKey("sys_user.id", name="fk_asset_holder", ondelete="SET NULL"),
         nullable=True,
     )
-    locked_application_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    locked_application_id: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True, active_history=True
+    )
     inbound_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=False), nullable=False
     )
@@ -54,6 +61,7 @@ class StockFlow(TimestampMixin, Base):
     __table_args__ = (
         Index("idx_stock_flow_asset_time", "asset_id", "occurred_at"),
         Index("idx_stock_flow_app_time", "related_application_id", "occurred_at"),
+        Index("idx_stock_flow_action_time", "action", "occurred_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -78,3 +86,24 @@ class StockFlow(TimestampMixin, Base):
         DateTime(timezone=False), nullable=False
     )
     meta_json: Mapped[dict[str, object] | None] = mapped_column(JSON, nullable=True)
+
+
+class SkuAssetCounter(Base):
+    """Serialized asset counts per SKU and status, kept in step with ``asset``.
+
+    ``available_count`` counts ``IN_STOCK`` assets not locked by an application.
+    """
+
+    __tablename__ = "sku_asset_counter"
+
+    sku_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    in_stock_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    locked_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    in_use_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pending_inspection_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    borrowed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    repairing_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    scrapped_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,7 +1,18 @@
-from sqlalchemy import BigInteger, ForeignKey, Index, String, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
+from app.models.enums import UserImportJobStatus, enum_column
 from app.models.mixins import TimestampMixin
 
 
@@ -47,3 +58,34 @@ class SysUser(TimestampMixin, Base):
     mobile_phone: Mapped[str | None] = mapped_column(String(32), nullable=True)
     job_title: Mapped[str | None] = mapped_column(String(128), nullable=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
+
+
+class UserImportJob(TimestampMixin, Base):
+    """Progress of a bulk user import running in the background."""
+
+    __tablename__ = "user_import_job"
+    __table_args__ = (
+        Index("idx_user_import_job_operator_time", "operator_user_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    operator_user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("sys_user.id", name="fk_user_import_job_operator", ondelete="RESTRICT"),
+        nullable=False,
+    )
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[UserImportJobStatus] = mapped_column(
+        enum_column(UserImportJobStatus, "user_import_job_status"),
+        nullable=False,
+    )
+    total_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error_message: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=False), nullable=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=False), nullable=True
+    )
@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, Index, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ReportApplicationDaily(Base):
+    """Applications created per day and applicant department."""
+
+    __tablename__ = "report_application_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    department_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    application_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ReportApplicationItemDaily(Base):
+    """Application items per day, applicant department, category and SKU."""
+
+    __tablename__ = "report_application_item_daily"
+    __table_args__ = (
+        Index("idx_report_application_item_daily_sku", "sku_id", "day"),
+        Index("idx_report_application_item_daily_category", "category_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    department_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    category_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    sku_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_cost: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2), nullable=False, default=Decimal("0")
+    )
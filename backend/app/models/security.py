@@ -12,6 +12,7 @@ class TokenBlacklist(Base):
     __table_args__ = (
         Index("idx_token_blacklist_expires", "expires_at"),
         Index("idx_token_blacklist_user", "user_id"),
+        Index("idx_token_blacklist_revoked", "revoked_at"),
     )
 
     jti: Mapped[str] = mapped_column(String(64), primary_key=True)
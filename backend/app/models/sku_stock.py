@@ -34,6 +34,7 @@ class SkuStockFlow(TimestampMixin, Base):
     __table_args__ = (
         Index("idx_sku_stock_flow_sku_time", "sku_id", "occurred_at"),
         Index("idx_sku_stock_flow_app_time", "related_application_id", "occurred_at"),
+        Index("idx_sku_stock_flow_action_time", "action", "occurred_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -7,6 +7,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.core.responses import FastJSONResponse
+
 
 def utc_timestamp() -> str:
     """Return UTC timestamp string with stable ISO8601 format."""
@@ -40,6 +42,18 @@ def build_success_response(data: Any | None = None) -> ApiResponse:
     return ApiResponse(success=True, data=data)
 
 
+def success_json(data: Any | None = None) -> FastJSONResponse:
+    """Write the success envelope directly, skipping ``ApiResponse``.
+
+    For routes whose payload is already plain JSON-ready data (large lists
+    of dicts): FastAPI does not re-validate a returned ``Response``, so the
+    route keeps ``response_model=ApiResponse`` for the OpenAPI schema while
+    the body is encoded in one pass.
+    """
+
+    return FastJSONResponse({"success": True, "data": data, "error": None})
+
+
 def build_error_response(
     *,
     code: str,
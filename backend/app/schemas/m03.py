@@ -13,6 +13,13 @@ class ApplicationApproveRequest(BaseModel):
     comment: str | None = Field(default=None, max_length=500)
 
 
+class ApprovalBatchRequest(BaseModel):
+    node: ApprovalNode
+    action: ApprovalAction
+    comment: str | None = Field(default=None, max_length=500)
+    application_ids: list[int] = Field(min_length=1, max_length=500)
+
+
 class AssignAssetsEntry(BaseModel):
     sku_id: int = Field(ge=1)
     asset_ids: list[int] = Field(min_length=1)
@@ -24,3 +24,14 @@ class OutboundShipRequest(BaseModel):
     city: str | None = Field(default=None, min_length=1, max_length=64)
     district: str | None = Field(default=None, min_length=1, max_length=64)
     detail: str | None = Field(default=None, min_length=1, max_length=255)
+
+
+class OutboundShipBatchEntry(BaseModel):
+    application_id: int = Field(ge=1)
+    carrier: str = Field(min_length=1, max_length=64)
+    tracking_no: str = Field(min_length=1, max_length=64)
+
+
+class OutboundShipBatchRequest(BaseModel):
+    items: list[OutboundShipBatchEntry] = Field(min_length=1, max_length=2000)
+    shipped_at: datetime | None = None
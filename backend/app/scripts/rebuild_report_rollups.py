@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.services.report_rollup_service import rebuild_report_rollups
+
+
+def _connect_args(database_url: str) -> dict[str, object]:
+    if database_url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the daily report rollup tables from application data."
+    )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        default=None,
+        help="First day to rebuild (YYYY-MM-DD, default: earliest).",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=None,
+        help="Last day to rebuild (YYYY-MM-DD, default: latest).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    database_url = (os.getenv("DATABASE_URL") or "").strip()
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+    if args.start_date and args.end_date and args.start_date > args.end_date:
+        raise SystemExit("--start-date must not be later than --end-date")
+
+    engine = create_engine(
+        database_url,
+        pool_pre_ping=True,
+        connect_args=_connect_args(database_url),
+    )
+    with Session(engine) as session:
+        application_rows, item_rows = rebuild_report_rollups(
+            session,
+            start_date=args.start_date,
+            end_date=args.end_date,
+        )
+        session.commit()
+
+    print(
+        "Rebuilt %d application rollup rows and %d item rollup rows."
+        % (application_rows, item_rows)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.services.sku_asset_counter_service import reconcile_sku_asset_counters
+
+
+def _connect_args(database_url: str) -> dict[str, object]:
+    if database_url.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare sku_asset_counter with the asset table and repair drift."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report drift and exit with status 1 when any is found.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    database_url = (os.getenv("DATABASE_URL") or "").strip()
+    if not database_url:
+        raise SystemExit("DATABASE_URL is required")
+
+    engine = create_engine(
+        database_url,
+        pool_pre_ping=True,
+        connect_args=_connect_args(database_url),
+    )
+    with Session(engine) as session:
+        drifts = reconcile_sku_asset_counters(session, repair=not args.check)
+        if args.check:
+            session.rollback()
+        else:
+            session.commit()
+
+    for drift in drifts:
+        print(
+            "sku_id=%d %s: stored=%d actual=%d"
+            % (drift.sku_id, drift.column, drift.stored, drift.actual)
+        )
+    if args.check:
+        print("Found %d drifted counters." % len(drifts))
+        return 1 if drifts else 0
+    print("Repaired %d drifted counters." % len(drifts))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -44,6 +44,9 @@ from app.models.organization import Department, SysUser
 from app.models.portal import Announcement, HeroBanner
 from app.models.rbac import RbacPermission, RbacRole, RbacRolePermission, RbacUserRole
 from app.models.security import AuditLog, TokenBlacklist
+from app.services.id_allocation_service import resync_id_allocators
+from app.services.report_rollup_service import rebuild_report_rollups
+from app.services.sku_asset_counter_service import reconcile_sku_asset_counters
 
 
 SEED_TAG = "demo_seed_v1"
@@ -885,6 +888,9 @@ def main(argv: list[str] | None = None) -> int:
 
     with Session(engine) as session:
         seed_demo_data(session, seed_password=args.password)
+        resync_id_allocators(session)
+        rebuild_report_rollups(session)
+        reconcile_sku_asset_counters(session)
         session.commit()
 
     print("Seed complete.")
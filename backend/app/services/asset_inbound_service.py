@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Table, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import AppException
+from app.models.enums import AssetStatus, StockFlowAction
+from app.models.inventory import Asset, StockFlow
+from app.services.id_allocation_service import allocate_ids
+from app.services.sku_asset_counter_service import record_assets_inserted
+
+ASSET_INBOUND_BATCH_SIZE = 500
+
+_ASSET_TABLE: Table = Asset.__table__
+_STOCK_FLOW_TABLE: Table = StockFlow.__table__
+
+
+@dataclass(frozen=True, slots=True)
+class InboundSerial:
+    sn: str
+    inbound_at: datetime | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class InboundedAsset:
+    id: int
+    asset_tag: str
+    sn: str
+
+
+def _base_asset_tag(asset_id: int) -> str:
+    return f"AT-{asset_id:06d}"
+
+
+def allocate_asset_tags(db: Session, *, asset_ids: Sequence[int]) -> list[str]:
+    """Return one unused asset tag per id, in the order of ``asset_ids``.
+
+    A tag is ``AT-<id>``; when that is already taken (imported or hand-edited
+    tags) the lowest free ``AT-<id>-<n>`` suffix is used. Costs one query, plus
+    one more only when some base tag collides.
+    """
+
+    base_tags = [_base_asset_tag(int(asset_id)) for asset_id in asset_ids]
+    if not base_tags:
+        return []
+
+    taken_bases = set(
+        db.scalars(select(Asset.asset_tag).where(Asset.asset_tag.in_(base_tags))).all()
+    )
+    if not taken_bases:
+        return base_tags
+
+    taken_suffixed = set(
+        db.scalars(
+            select(Asset.asset_tag).where(
+                or_(*(Asset.asset_tag.like(f"{tag}-%") for tag in sorted(taken_bases)))
+            )
+        ).all()
+    )
+    tags: list[str] = []
+    for tag in base_tags:
+        if tag not in taken_bases:
+            tags.append(tag)
+            continue
+        sequence = 1
+        while f"{tag}-{sequence}" in taken_suffixed:
+            sequence += 1
+        tags.append(f"{tag}-{sequence}")
+    return tags
+
+
+def _assert_serials_available(db: Session, serials: Sequence[InboundSerial]) -> None:
+    seen: set[str] = set()
+    duplicate_sns: set[str] = set()
+    for serial in serials:
+        if serial.sn in seen:
+            duplicate_sns.add(serial.sn)
+        seen.add(serial.sn)
+    if duplicate_sns:
+        raise AppException(
+            code="DUPLICATE_SN",
+            message="检测到重复的资产序列号。",
+            details={"sns": sorted(duplicate_sns)},
+        )
+
+    existing_sns = set(db.scalars(select(Asset.sn).where(Asset.sn.in_(seen))).all())
+    if existing_sns:
+        raise AppException(
+            code="DUPLICATE_SN",
+            message="资产序列号已存在。",
+            details={"sns": sorted(existing_sns)},
+        )
+
+
+def inbound_serialized_assets(
+    db: Session,
+    *,
+    sku_id: int,
+    serials: Sequence[InboundSerial],
+    operator_user_id: int,
+    occurred_at: datetime,
+    flow_meta_base: dict[str, object],
+) -> list[InboundedAsset]:
+    """Insert ``IN_STOCK`` assets and their ``INBOUND`` flows for one SKU.
+
+    Serial numbers must already be stripped and non-empty; ``inbound_at``
+    defaults to ``occurred_at``. Work is done in batches of
+    ``ASSET_INBOUND_BATCH_SIZE``: one id reservation per table, one tag
+    collision check, two executemany inserts and one counter upsert per batch.
+    Rows are written with Core inserts, so they are not loaded into the session.
+    """
+
+    _assert_serials_available(db, serials)
+
+    # Core inserts bypass the unit of work; write pending ORM state (e.g. a
+    # SKU created in the same request) first so foreign keys resolve.
+    db.flush()
+
+    created: list[InboundedAsset] = []
+    for start in range(0, len(serials), ASSET_INBOUND_BATCH_SIZE):
+        batch = serials[start : start + ASSET_INBOUND_BATCH_SIZE]
+        asset_ids = allocate_ids(db, Asset, len(batch))
+        stock_flow_ids = allocate_ids(db, StockFlow, len(batch))
+        asset_tags = allocate_asset_tags(db, asset_ids=asset_ids)
+
+        asset_rows: list[dict[str, object]] = []
+        flow_rows: list[dict[str, object]] = []
+        for serial, asset_id, stock_flow_id, asset_tag in zip(
+            batch, asset_ids, stock_flow_ids, asset_tags
+        ):
+            asset_rows.append(
+                {
+                    "id": asset_id,
+                    "asset_tag": asset_tag,
+                    "sku_id": int(sku_id),
+                    "sn": serial.sn,
+                    "status": AssetStatus.IN_STOCK,
+                    "holder_user_id": None,
+                    "locked_application_id": None,
+                    "inbound_at": serial.inbound_at or occurred_at,
+                }
+            )
+            flow_rows.append(
+                {
+                    "id": stock_flow_id,
+                    "asset_id": asset_id,
+                    "action": StockFlowAction.INBOUND,
+                    "operator_user_id": int(operator_user_id),
+                    "related_application_id": None,
+                    "occurred_at": occurred_at,
+                    "meta_json": {**flow_meta_base, "sn": serial.sn},
+                }
+            )
+            created.append(InboundedAsset(id=asset_id, asset_tag=asset_tag, sn=serial.sn))
+
+        db.execute(insert(_ASSET_TABLE), asset_rows)
+        db.execute(insert(_STOCK_FLOW_TABLE), flow_rows)
+        record_assets_inserted(
+            db, [(int(sku_id), AssetStatus.IN_STOCK, None)] * len(asset_rows)
+        )
+
+    return created
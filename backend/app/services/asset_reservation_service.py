@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import Table, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.application import ApplicationAsset
+from app.models.enums import AssetStatus, StockFlowAction
+from app.models.inventory import Asset, StockFlow
+from app.services.id_allocation_service import allocate_ids
+from app.services.sku_asset_counter_service import (
+    AssetCounterDeltas,
+    add_asset_to_deltas,
+    apply_asset_counter_deltas,
+)
+
+# Candidates taken by a concurrent writer between our select and update are
+# replaced by a fresh select; a few rounds cover any realistic contention.
+MAX_CLAIM_ROUNDS = 3
+
+_STOCK_FLOW_TABLE: Table = StockFlow.__table__
+_APPLICATION_ASSET_TABLE: Table = ApplicationAsset.__table__
+
+
+@dataclass(slots=True)
+class AssetReservation:
+    asset_ids_by_sku: dict[int, list[int]] = field(default_factory=dict)
+    # sku_id -> assets actually claimed, for SKUs that fell short.
+    shortfall_by_sku: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def asset_ids(self) -> list[int]:
+        return sorted(
+            asset_id for asset_ids in self.asset_ids_by_sku.values() for asset_id in asset_ids
+        )
+
+
+def _supports_skip_locked(db: Session) -> bool:
+    return db.get_bind().dialect.name in {"postgresql", "mysql"}
+
+
+def _select_candidates(db: Session, *, sku_id: int, limit: int) -> list[int]:
+    stmt = (
+        select(Asset.id)
+        .where(
+            Asset.sku_id == sku_id,
+            Asset.status == AssetStatus.IN_STOCK,
+            Asset.locked_application_id.is_(None),
+        )
+        .order_by(Asset.id.asc())
+        .limit(limit)
+    )
+    if _supports_skip_locked(db):
+        # Rows another transaction is claiming are skipped instead of waited on.
+        stmt = stmt.with_for_update(skip_locked=True)
+    return [int(asset_id) for asset_id in db.scalars(stmt).all()]
+
+
+def _mark_locked(db: Session, *, application_id: int, asset_ids: Sequence[int]) -> list[int]:
+    """Lock the assets that are still available; return the ids that were."""
+
+    if not asset_ids:
+        return []
+    stmt = (
+        update(Asset)
+        .where(
+            Asset.id.in_(list(asset_ids)),
+            Asset.status == AssetStatus.IN_STOCK,
+            Asset.locked_application_id.is_(None),
+        )
+        .values(status=AssetStatus.LOCKED, locked_application_id=application_id)
+        .execution_options(synchronize_session="fetch")
+    )
+    if db.get_bind().dialect.update_returning:
+        return sorted(int(asset_id) for asset_id in db.scalars(stmt.returning(Asset.id)).all())
+
+    db.execute(stmt)
+    return sorted(
+        int(asset_id)
+        for asset_id in db.scalars(
+            select(Asset.id).where(
+                Asset.id.in_(list(asset_ids)),
+                Asset.locked_application_id == application_id,
+            )
+        ).all()
+    )
+
+
+def _write_lock_records(
+    db: Session,
+    *,
+    application_id: int,
+    asset_ids_by_sku: dict[int, list[int]],
+    operator_user_id: int,
+    occurred_at: datetime,
+    flow_meta: dict[str, object],
+    link_to_application: bool,
+) -> None:
+    claimed = [
+        (sku_id, asset_id)
+        for sku_id, asset_ids in sorted(asset_ids_by_sku.items())
+        for asset_id in asset_ids
+    ]
+    if not claimed:
+        return
+
+    flow_ids = allocate_ids(db, StockFlow, len(claimed))
+    db.execute(
+        insert(_STOCK_FLOW_TABLE),
+        [
+            {
+                "id": flow_id,
+                "asset_id": asset_id,
+                "action": StockFlowAction.LOCK,
+                "operator_user_id": int(operator_user_id),
+                "related_application_id": int(application_id),
+                "occurred_at": occurred_at,
+                "meta_json": {**flow_meta, "sku_id": sku_id},
+            }
+            for flow_id, (sku_id, asset_id) in zip(flow_ids, claimed)
+        ],
+    )
+    if link_to_application:
+        relation_ids = allocate_ids(db, ApplicationAsset, len(claimed))
+        db.execute(
+            insert(_APPLICATION_ASSET_TABLE),
+            [
+                {
+                    "id": relation_id,
+                    "application_id": int(application_id),
+                    "asset_id": asset_id,
+                }
+                for relation_id, (_, asset_id) in zip(relation_ids, claimed)
+            ],
+        )
+
+    # Bulk UPDATEs bypass the flush hook, so move the counters here.
+    deltas: AssetCounterDeltas = {}
+    for sku_id, _ in claimed:
+        add_asset_to_deltas(
+            deltas,
+            sku_id=sku_id,
+            status=AssetStatus.IN_STOCK,
+            locked_application_id=None,
+            sign=-1,
+        )
+        add_asset_to_deltas(
+            deltas,
+            sku_id=sku_id,
+            status=AssetStatus.LOCKED,
+            locked_application_id=application_id,
+            sign=1,
+        )
+    apply_asset_counter_deltas(db, deltas)
+
+
+def reserve_assets(
+    db: Session,
+    *,
+    application_id: int,
+    quantities: Sequence[tuple[int, int]],
+    operator_user_id: int,
+    occurred_at: datetime,
+    flow_meta: dict[str, object],
+    link_to_application: bool = True,
+) -> AssetReservation:
+    """Lock ``quantity`` available assets of each ``(sku_id, quantity)`` pair.
+
+    Each SKU costs one ``SELECT ... LIMIT n`` (``FOR UPDATE SKIP LOCKED`` on
+    PostgreSQL and MySQL) plus one conditional ``UPDATE``, so the work is
+    bounded by the requested quantity and concurrent submitters claim
+    different rows instead of queueing on the same ones. ``LOCK`` flows and,
+    with ``link_to_application``, ``application_asset`` rows are inserted in
+    bulk.
+
+    SKUs that cannot be filled are reported in ``shortfall_by_sku``; the
+    caller must then raise so the transaction, including partial claims,
+    rolls back.
+    """
+
+    requested: dict[int, int] = {}
+    for sku_id, quantity in quantities:
+        requested[int(sku_id)] = requested.get(int(sku_id), 0) + int(quantity)
+
+    # Core statements below bypass the unit of work; write pending rows first.
+    db.flush()
+
+    reservation = AssetReservation()
+    for sku_id in sorted(requested):
+        quantity = requested[sku_id]
+        claimed: list[int] = []
+        for _ in range(MAX_CLAIM_ROUNDS):
+            missing = quantity - len(claimed)
+            if missing <= 0:
+                break
+            candidates = _select_candidates(db, sku_id=sku_id, limit=missing)
+            if not candidates:
+                break
+            claimed.extend(
+                _mark_locked(db, application_id=application_id, asset_ids=candidates)
+            )
+        reservation.asset_ids_by_sku[sku_id] = claimed
+        if len(claimed) < quantity:
+            reservation.shortfall_by_sku[sku_id] = len(claimed)
+
+    if reservation.shortfall_by_sku:
+        return reservation
+
+    _write_lock_records(
+        db,
+        application_id=application_id,
+        asset_ids_by_sku=reservation.asset_ids_by_sku,
+        operator_user_id=operator_user_id,
+        occurred_at=occurred_at,
+        flow_meta=flow_meta,
+        link_to_application=link_to_application,
+    )
+    return reservation
+
+
+def claim_assets(
+    db: Session,
+    *,
+    application_id: int,
+    assets: Sequence[Asset],
+    operator_user_id: int,
+    occurred_at: datetime,
+    flow_meta: dict[str, object],
+) -> list[int]:
+    """Lock specific assets chosen by an operator.
+
+    Returns the ids that were still available. Only those get ``LOCK`` flows;
+    the caller decides how to report the rest.
+    """
+
+    sku_id_by_asset_id = {int(asset.id): int(asset.sku_id) for asset in assets}
+    db.flush()
+    claimed_ids = _mark_locked(
+        db, application_id=application_id, asset_ids=sorted(sku_id_by_asset_id)
+    )
+    if len(claimed_ids) != len(sku_id_by_asset_id):
+        return claimed_ids
+
+    asset_ids_by_sku: dict[int, list[int]] = {}
+    for asset_id in claimed_ids:
+        asset_ids_by_sku.setdefault(sku_id_by_asset_id[asset_id], []).append(asset_id)
+    _write_lock_records(
+        db,
+        application_id=application_id,
+        asset_ids_by_sku=asset_ids_by_sku,
+        operator_user_id=operator_user_id,
+        occurred_at=occurred_at,
+        flow_meta=flow_meta,
+        link_to_application=False,
+    )
+    return claimed_ids
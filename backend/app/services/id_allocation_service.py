@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import deque
+
+from sqlalchemy import BigInteger, Integer, Table, func, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.id_allocator import IdAllocator
+
+_ALLOCATOR_TABLE = IdAllocator.__table__
+
+
+class _BlockPool:
+    """Ids reserved by this process but not yet handed out, per table."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.free_ids: dict[str, deque[int]] = {}
+
+
+_BLOCK_POOLS: weakref.WeakKeyDictionary[Engine, _BlockPool] = (
+    weakref.WeakKeyDictionary()
+)
+_BLOCK_POOLS_LOCK = threading.Lock()
+
+
+def _resolve_engine(db: Session) -> Engine:
+    bind = db.get_bind()
+    if isinstance(bind, Connection):
+        return bind.engine
+    return bind
+
+
+def _model_table(model: type[object]) -> Table:
+    table = getattr(model, "__table__", None)
+    if not isinstance(table, Table) or "id" not in table.c:
+        raise TypeError(f"{model!r} has no integer id column to allocate")
+    return table
+
+
+def _current_max_id(executor: Session | Connection, table: Table) -> int:
+    return int(executor.scalar(select(func.max(table.c.id))) or 0)
+
+
+def _allocate_from_sequence(db: Session, table: Table, count: int) -> list[int]:
+    # BIGSERIAL primary keys own a "<table>_id_seq" sequence; nextval never
+    # blocks concurrent writers and is not rolled back with the transaction.
+    rows = db.execute(
+        text("SELECT nextval(CAST(:sequence AS regclass)) FROM generate_series(1, :count)"),
+        {"sequence": f"{table.name}_id_seq", "count": count},
+    ).scalars()
+    return sorted(int(value) for value in rows)
+
+
+def _reserve_in_transaction(db: Session, table: Table, count: int) -> list[int]:
+    """Advance the allocator row inside the caller's transaction.
+
+    Used for SQLite, which allows a single writer: reserving on a second
+    connection would wait on the caller's own write lock. Rolling back the
+    caller also rolls back the reservation, so no ids are lost or reused.
+    """
+
+    stmt = (
+        update(_ALLOCATOR_TABLE)
+        .where(_ALLOCATOR_TABLE.c.name == table.name)
+        .values(next_value=_ALLOCATOR_TABLE.c.next_value + count)
+    )
+    if db.get_bind().dialect.update_returning:
+        next_value = db.scalar(stmt.returning(_ALLOCATOR_TABLE.c.next_value))
+    else:
+        result = db.execute(stmt)
+        next_value = (
+            db.scalar(
+                select(_ALLOCATOR_TABLE.c.next_value).where(
+                    _ALLOCATOR_TABLE.c.name == table.name
+                )
+            )
+            if result.rowcount
+            else None
+        )
+
+    if next_value is None:
+        start = _current_max_id(db, table) + 1
+        db.execute(
+            insert(_ALLOCATOR_TABLE).values(name=table.name, next_value=start + count)
+        )
+        return list(range(start, start + count))
+
+    start = int(next_value) - count
+    return list(range(start, start + count))
+
+
+def _reserve_block(engine: Engine, table: Table, size: int) -> range:
+    """Reserve ``size`` ids in an independent, immediately committed transaction."""
+
+    for _ in range(2):
+        try:
+            with engine.begin() as connection:
+                current = connection.scalar(
+                    select(_ALLOCATOR_TABLE.c.next_value)
+                    .where(_ALLOCATOR_TABLE.c.name == table.name)
+                    .with_for_update()
+                )
+                if current is None:
+                    start = _current_max_id(connection, table) + 1
+                    connection.execute(
+                        insert(_ALLOCATOR_TABLE).values(
+                            name=table.name, next_value=start + size
+                        )
+                    )
+                    return range(start, start + size)
+
+                connection.execute(
+                    update(_ALLOCATOR_TABLE)
+                    .where(_ALLOCATOR_TABLE.c.name == table.name)
+                    .values(next_value=int(current) + size)
+                )
+                return range(int(current), int(current) + size)
+        except IntegrityError:
+            # Another process seeded the allocator row first; retry the update.
+            continue
+    raise RuntimeError(f"unable to reserve ids for table {table.name}")
+
+
+def _allocate_from_block_pool(db: Session, table: Table, count: int) -> list[int]:
+    engine = _resolve_engine(db)
+    with _BLOCK_POOLS_LOCK:
+        pool = _BLOCK_POOLS.get(engine)
+        if pool is None:
+            pool = _BlockPool()
+            _BLOCK_POOLS[engine] = pool
+
+    with pool.lock:
+        free_ids = pool.free_ids.setdefault(table.name, deque())
+        if len(free_ids) < count:
+            block_size = max(count - len(free_ids), get_settings().id_allocator_block_size)
+            free_ids.extend(_reserve_block(engine, table, block_size))
+        return [free_ids.popleft() for _ in range(count)]
+
+
+def allocate_ids(db: Session, model: type[object], count: int) -> list[int]:
+    """Allocate ``count`` unused primary keys for ``model`` in ascending order.
+
+    - PostgreSQL draws from the table's native id sequence.
+    - MySQL reserves hi/lo blocks from ``id_allocator`` on a separate
+      connection and hands them out from process memory.
+    - SQLite advances ``id_allocator`` within the current transaction.
+
+    Every strategy costs one round-trip per call (plus a one-off seed from
+    ``max(id)`` the first time a table is seen) regardless of table size.
+    """
+
+    if count <= 0:
+        return []
+
+    table = _model_table(model)
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return _allocate_from_sequence(db, table, count)
+    if dialect_name == "mysql":
+        return _allocate_from_block_pool(db, table, count)
+    return _reserve_in_transaction(db, table, count)
+
+
+def allocate_id(db: Session, model: type[object]) -> int:
+    """Allocate a single primary key for ``model``."""
+
+    return allocate_ids(db, model, 1)[0]
+
+
+def _allocated_tables() -> list[Table]:
+    return [
+        table
+        for table in Base.metadata.tables.values()
+        if "id" in table.c
+        and table.c.id.primary_key
+        and isinstance(table.c.id.type, (BigInteger, Integer))
+    ]
+
+
+def resync_id_allocators(db: Session) -> None:
+    """Move every allocator past ``max(id)`` after rows were inserted with
+    explicit ids (demo seeds, imports, manual fixes)."""
+
+    dialect_name = db.get_bind().dialect.name
+    for table in _allocated_tables():
+        max_id = _current_max_id(db, table)
+        if dialect_name == "postgresql":
+            db.execute(
+                text("SELECT setval(CAST(:sequence AS regclass), :value, :is_called)"),
+                {
+                    "sequence": f"{table.name}_id_seq",
+                    "value": max(max_id, 1),
+                    "is_called": max_id > 0,
+                },
+            )
+            continue
+
+        current = db.scalar(
+            select(_ALLOCATOR_TABLE.c.next_value).where(
+                _ALLOCATOR_TABLE.c.name == table.name
+            )
+        )
+        if current is None:
+            db.execute(
+                insert(_ALLOCATOR_TABLE).values(name=table.name, next_value=max_id + 1)
+            )
+        elif int(current) <= max_id:
+            db.execute(
+                update(_ALLOCATOR_TABLE)
+                .where(_ALLOCATOR_TABLE.c.name == table.name)
+                .values(next_value=max_id + 1)
+            )
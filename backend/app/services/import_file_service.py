@@ -0,0 +1,51 @@
+"""Row readers for uploaded CSV/XLSX import sheets."""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+
+from fastapi import UploadFile
+
+from app.core.exceptions import AppException
+
+
+def normalize_import_header(value: object) -> str:
+    return str(value or "").strip().lower()
+
+
+def iter_csv_import_rows(file: UploadFile) -> Iterator[tuple[object, ...]]:
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.reader(stream):
+            yield tuple(row)
+    except UnicodeDecodeError as exc:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="CSV 文件需使用 UTF-8 编码。",
+        ) from exc
+    finally:
+        stream.detach()
+
+
+def iter_xlsx_import_rows(file: UploadFile) -> Iterator[tuple[object, ...]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise AppException(
+            code="UNSUPPORTED_MEDIA_TYPE",
+            message="服务器未安装 openpyxl，暂不支持 XLSX 导入。",
+        ) from exc
+
+    try:
+        workbook = load_workbook(file.file, read_only=True, data_only=True)
+    except Exception as exc:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="XLSX 文件无法解析。",
+        ) from exc
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
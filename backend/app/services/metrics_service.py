@@ -0,0 +1,148 @@
+"""Runtime and business gauges for the ``/metrics`` endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from anyio import to_thread
+from sqlalchemy import case, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.logging import get_logger
+from app.core.metrics import REGISTRY
+from app.models.application import PICKUP_READY_STATUSES, Application
+from app.models.catalog import Sku
+from app.models.enums import ApplicationStatus, ApprovalNode, DeliveryType, SkuStockMode
+from app.models.inventory import SkuAssetCounter
+from app.models.sku_stock import SkuStock
+
+logger = get_logger(__name__)
+
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured connection pool size.")
+DB_POOL_CHECKED_OUT = REGISTRY.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool."
+)
+DB_POOL_OVERFLOW = REGISTRY.gauge(
+    "db_pool_overflow", "Connections open beyond pool_size (negative while below it)."
+)
+THREADPOOL_BUSY = REGISTRY.gauge(
+    "threadpool_busy_threads", "Worker threads running sync endpoints and dependencies."
+)
+THREADPOOL_LIMIT = REGISTRY.gauge(
+    "threadpool_max_threads", "Worker thread limit for sync endpoints and dependencies."
+)
+APPROVAL_BACKLOG = REGISTRY.gauge(
+    "approval_backlog", "Applications waiting at an approval node.", ("node",)
+)
+FULFILLMENT_QUEUE_DEPTH = REGISTRY.gauge(
+    "fulfillment_queue_depth",
+    "Approved applications waiting for pickup or express shipping.",
+    ("delivery_type",),
+)
+SKUS_BELOW_SAFETY_STOCK = REGISTRY.gauge(
+    "skus_below_safety_stock", "SKUs whose available stock is under their safety threshold."
+)
+BUSINESS_METRICS_REFRESHED_AT = REGISTRY.gauge(
+    "business_metrics_refreshed_timestamp_seconds",
+    "Unix time the business gauges were last computed.",
+)
+
+_APPROVAL_NODE_BY_STATUS = {
+    ApplicationStatus.LOCKED: ApprovalNode.LEADER,
+    ApplicationStatus.LEADER_APPROVED: ApprovalNode.ADMIN,
+}
+
+
+def register_engine_pool_metrics(engine: Engine) -> None:
+    """Read pool counters for ``engine`` at every scrape.
+
+    Pools without these counters (SQLite's static and singleton pools) are
+    reported as zero.
+    """
+
+    pool = engine.pool
+
+    def _collect() -> None:
+        for gauge, attribute in (
+            (DB_POOL_SIZE, "size"),
+            (DB_POOL_CHECKED_OUT, "checkedout"),
+            (DB_POOL_OVERFLOW, "overflow"),
+        ):
+            reader = getattr(pool, attribute, None)
+            gauge.set(reader() if callable(reader) else 0)
+
+    REGISTRY.add_collector(_collect)
+
+
+def collect_threadpool_metrics() -> None:
+    """Record threadpool usage; must run on the event loop thread."""
+
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_LIMIT.set(limiter.total_tokens)
+
+
+def refresh_business_metrics(db: Session) -> None:
+    """Recompute the business gauges with three aggregate queries."""
+
+    backlog = {(node.value,): 0.0 for node in ApprovalNode}
+    for status, count in db.execute(
+        select(Application.status, func.count())
+        .where(Application.status.in_(_APPROVAL_NODE_BY_STATUS))
+        .group_by(Application.status)
+    ).all():
+        backlog[(_APPROVAL_NODE_BY_STATUS[status].value,)] = count
+
+    queue_depth = {(delivery_type.value,): 0.0 for delivery_type in DeliveryType}
+    for delivery_type, count in db.execute(
+        select(Application.delivery_type, func.count())
+        .where(Application.status.in_(PICKUP_READY_STATUSES))
+        .group_by(Application.delivery_type)
+    ).all():
+        queue_depth[(delivery_type.value,)] = count
+
+    # Same rule as the inventory summary's below_safety_stock flag.
+    available = case(
+        (
+            Sku.stock_mode == SkuStockMode.QUANTITY,
+            func.coalesce(SkuStock.on_hand_qty, 0) - func.coalesce(SkuStock.reserved_qty, 0),
+        ),
+        else_=func.coalesce(SkuAssetCounter.in_stock_count, 0),
+    )
+    below_safety_stock = db.scalar(
+        select(func.count())
+        .select_from(Sku)
+        .outerjoin(SkuStock, SkuStock.sku_id == Sku.id)
+        .outerjoin(SkuAssetCounter, SkuAssetCounter.sku_id == Sku.id)
+        .where(Sku.safety_stock_threshold > 0, available < Sku.safety_stock_threshold)
+    )
+
+    APPROVAL_BACKLOG.replace(backlog)
+    FULFILLMENT_QUEUE_DEPTH.replace(queue_depth)
+    SKUS_BELOW_SAFETY_STOCK.set(below_safety_stock or 0)
+    BUSINESS_METRICS_REFRESHED_AT.set(round(time.time()))
+
+
+def _refresh_once(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as db:
+        refresh_business_metrics(db)
+
+
+async def run_business_metrics_refresher(
+    session_factory: sessionmaker[Session], *, interval_seconds: float
+) -> None:
+    """Refresh the business gauges every ``interval_seconds`` until cancelled.
+
+    The first refresh waits one interval, like the blacklist pruner, so a
+    short-lived app (tests, one-off scripts) never touches the database;
+    ``business_metrics_refreshed_timestamp_seconds`` stays 0 until then.
+    """
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_refresh_once, session_factory)
+        except Exception:
+            logger.warning("business metrics refresh failed", exc_info=True)
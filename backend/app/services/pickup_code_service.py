@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import secrets
+
+from sqlalchemy import Table, delete, event, inspect, select
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.core.exceptions import AppException
+from app.db.upsert import insert_missing_rows
+from app.models.application import (
+    PICKUP_CODE_RELEASED_STATUSES,
+    Application,
+    PickupCodePool,
+)
+from app.models.enums import ApplicationStatus
+
+PICKUP_CODE_POOL_REFILL_SIZE = 200
+MAX_PICKUP_CODE_ATTEMPTS = 5
+
+_POOL_TABLE: Table = PickupCodePool.__table__
+
+
+def _random_pickup_code() -> str:
+    return f"{secrets.randbelow(1_000_000):06d}"
+
+
+def _pickup_code_in_use(db: Session, code: str) -> bool:
+    stmt = (
+        select(Application.id)
+        .where(
+            Application.pickup_code == code,
+            Application.status.not_in(PICKUP_CODE_RELEASED_STATUSES),
+        )
+        .limit(1)
+    )
+    return db.scalar(stmt) is not None
+
+
+def refill_pickup_code_pool(db: Session, *, size: int = PICKUP_CODE_POOL_REFILL_SIZE) -> int:
+    """Add up to ``size`` random codes that no open application holds.
+
+    Costs one lookup against the active-code index and one insert, whatever
+    the number of live codes. Returns the number of codes offered to the pool.
+    """
+
+    candidates = {_random_pickup_code() for _ in range(size)}
+    in_use = set(
+        db.scalars(
+            select(Application.pickup_code).where(
+                Application.pickup_code.in_(candidates),
+                Application.status.not_in(PICKUP_CODE_RELEASED_STATUSES),
+            )
+        ).all()
+    )
+    rows = [{"code": code} for code in sorted(candidates - in_use)]
+    insert_missing_rows(db, _POOL_TABLE, rows)
+    return len(rows)
+
+
+def allocate_pickup_code(db: Session) -> str:
+    """Take a free pickup code from the pool, refilling it when empty.
+
+    A code is removed from the pool by a conditional ``DELETE`` so concurrent
+    callers never receive the same one; on PostgreSQL/MySQL the candidate read
+    skips rows other transactions are taking. The code is checked against open
+    applications once more because a refill racing an uncommitted allocation
+    can put a taken code back into the pool.
+    """
+
+    skip_locked = db.get_bind().dialect.name in {"postgresql", "mysql"}
+    for _ in range(MAX_PICKUP_CODE_ATTEMPTS):
+        stmt = select(_POOL_TABLE.c.code).limit(1)
+        if skip_locked:
+            stmt = stmt.with_for_update(skip_locked=True)
+        code = db.scalar(stmt)
+        if code is None:
+            refill_pickup_code_pool(db)
+            continue
+        taken = db.execute(delete(_POOL_TABLE).where(_POOL_TABLE.c.code == code))
+        if taken.rowcount != 1:
+            continue
+        if _pickup_code_in_use(db, code):
+            continue
+        return str(code)
+    raise AppException(
+        code="INTERNAL_SERVER_ERROR",
+        message="无法分配取件码，请稍后重试。",
+    )
+
+
+def _committed_status(application: Application) -> ApplicationStatus:
+    history = inspect(application).attrs["status"].history
+    if history.deleted:
+        return ApplicationStatus(history.deleted[0])
+    if history.unchanged:
+        return ApplicationStatus(history.unchanged[0])
+    return ApplicationStatus(application.status)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_pickup_code_pool(session: Session, _flush_context: UOWTransaction) -> None:
+    # Runs inside the flush, so the pool changes commit or roll back with the
+    # status change that caused them.
+    released: set[str] = set()
+    claimed: set[str] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Application) and obj.status not in PICKUP_CODE_RELEASED_STATUSES:
+            # Normally already taken from the pool; covers explicitly set codes.
+            claimed.add(obj.pickup_code)
+    for obj in session.deleted:
+        if (
+            isinstance(obj, Application)
+            and _committed_status(obj) not in PICKUP_CODE_RELEASED_STATUSES
+        ):
+            released.add(obj.pickup_code)
+    for obj in session.dirty:
+        if not isinstance(obj, Application) or obj in session.deleted:
+            continue
+        was_released = _committed_status(obj) in PICKUP_CODE_RELEASED_STATUSES
+        is_released = obj.status in PICKUP_CODE_RELEASED_STATUSES
+        if is_released and not was_released:
+            released.add(obj.pickup_code)
+        elif was_released and not is_released:
+            claimed.add(obj.pickup_code)
+
+    if not released and not claimed:
+        return
+    connection = session.connection()
+    if claimed:
+        connection.execute(delete(_POOL_TABLE).where(_POOL_TABLE.c.code.in_(claimed)))
+    insert_missing_rows(
+        connection, _POOL_TABLE, [{"code": code} for code in sorted(released - claimed)]
+    )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.models.application import PICKUP_READY_STATUSES, Application
+
+PICKUP_LOOKUP_CACHE_SIZE = 4096
+
+_PickupKey = tuple[str, str]
+
+
+def _keys_for(application: Application) -> list[_PickupKey]:
+    keys: list[_PickupKey] = [("CODE", application.pickup_code)]
+    if application.pickup_qr_string:
+        keys.append(("QR", application.pickup_qr_string))
+    return keys
+
+
+class PickupLookupCache:
+    """Maps pickup codes and QR strings of pickup-ready applications to ids.
+
+    Only ids are cached: callers still load (and, when confirming, lock) the
+    row by primary key and check it, so an entry left stale by another worker
+    process costs one miss, never a wrong answer.
+    """
+
+    def __init__(self, *, max_size: int = PICKUP_LOOKUP_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_PickupKey, int] = OrderedDict()
+
+    def get(self, key: _PickupKey) -> int | None:
+        with self._lock:
+            application_id = self._entries.get(key)
+            if application_id is not None:
+                self._entries.move_to_end(key)
+            return application_id
+
+    def put(self, application: Application) -> None:
+        with self._lock:
+            for key in _keys_for(application):
+                self._entries[key] = int(application.id)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: _PickupKey, application_id: int | None = None) -> None:
+        with self._lock:
+            if application_id is None or self._entries.get(key) == application_id:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_CACHES: weakref.WeakKeyDictionary[Engine, PickupLookupCache] = weakref.WeakKeyDictionary()
+_CACHES_LOCK = threading.Lock()
+
+
+def _resolve_engine(bind: Engine | Connection) -> Engine:
+    if isinstance(bind, Connection):
+        return bind.engine
+    return bind
+
+
+def get_pickup_lookup_cache(session: Session) -> PickupLookupCache:
+    engine = _resolve_engine(session.get_bind())
+    cache = _CACHES.get(engine)
+    if cache is not None:
+        return cache
+    with _CACHES_LOCK:
+        cache = _CACHES.get(engine)
+        if cache is None:
+            cache = PickupLookupCache()
+            _CACHES[engine] = cache
+        return cache
+
+
+def _matches(application: Application, key: _PickupKey) -> bool:
+    kind, value = key
+    if kind == "QR":
+        return application.pickup_qr_string == value
+    return application.pickup_code == value
+
+
+def _lookup_statement(key: _PickupKey, *, ready_only: bool, for_update: bool):
+    kind, value = key
+    column = Application.pickup_qr_string if kind == "QR" else Application.pickup_code
+    stmt = select(Application).where(column == value)
+    if ready_only:
+        stmt = stmt.where(Application.status.in_(PICKUP_READY_STATUSES))
+    # Codes are reused once an application closes; the newest holder wins.
+    stmt = stmt.order_by(Application.id.desc()).limit(1)
+    return stmt.with_for_update() if for_update else stmt
+
+
+def find_pickup_application(
+    db: Session, *, by_qr: bool, value: str, for_update: bool = False
+) -> Application | None:
+    """Resolve a pickup code or QR string scanned at the counter.
+
+    Pickup-ready applications are served from the per-process cache plus a
+    primary-key load, or else found through the partial indexes over ready
+    applications. Anything else (closed, not yet approved, unknown) falls
+    back to an unrestricted lookup so callers can report the actual status.
+
+    With ``for_update`` every load locks the row, so two counters confirming
+    the same code are serialized and the second sees the updated status.
+    """
+
+    key: _PickupKey = ("QR" if by_qr else "CODE", value)
+    cache = get_pickup_lookup_cache(db)
+
+    cached_id = cache.get(key)
+    if cached_id is not None:
+        application = db.get(Application, cached_id, with_for_update=for_update)
+        if (
+            application is not None
+            and application.status in PICKUP_READY_STATUSES
+            and _matches(application, key)
+        ):
+            return application
+        cache.discard(key, cached_id)
+
+    application = db.scalar(_lookup_statement(key, ready_only=True, for_update=for_update))
+    if application is not None:
+        cache.put(application)
+        return application
+    return db.scalar(_lookup_statement(key, ready_only=False, for_update=for_update))
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_pickup_lookup_cache(session: Session, _flush_context: UOWTransaction) -> None:
+    # Entries are re-checked on every hit, so updating before commit is safe:
+    # a rolled-back change only costs a later miss.
+    changed = [
+        obj
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Application)
+    ]
+    if not changed:
+        return
+    cache = get_pickup_lookup_cache(session)
+    for application in changed:
+        if application in session.deleted or application.status not in PICKUP_READY_STATUSES:
+            for key in _keys_for(application):
+                cache.discard(key, int(application.id))
+        else:
+            cache.put(application)
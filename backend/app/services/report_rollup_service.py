@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import Date, Table, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import increment_rows
+from app.models.application import Application, ApplicationItem
+from app.models.catalog import Sku
+from app.models.organization import SysUser
+from app.models.report import ReportApplicationDaily, ReportApplicationItemDaily
+
+_APPLICATION_TABLE: Table = ReportApplicationDaily.__table__
+_ITEM_TABLE: Table = ReportApplicationItemDaily.__table__
+
+
+def record_application_created(
+    db: Session,
+    *,
+    created_at: datetime,
+    department_id: int,
+    items: Sequence[tuple[Sku, int]],
+) -> None:
+    """Add a newly created application and its ``(sku, quantity)`` lines to the
+    daily rollups, in the caller's transaction."""
+
+    day = created_at.date()
+    increment_rows(
+        db,
+        _APPLICATION_TABLE,
+        [{"day": day, "department_id": int(department_id), "application_count": 1}],
+        counters=("application_count",),
+    )
+
+    item_rows: dict[tuple[int, int], dict[str, Any]] = {}
+    for sku, quantity in items:
+        row = item_rows.setdefault(
+            (int(sku.category_id), int(sku.id)),
+            {
+                "day": day,
+                "department_id": int(department_id),
+                "category_id": int(sku.category_id),
+                "sku_id": int(sku.id),
+                "item_count": 0,
+                "quantity": 0,
+                "total_cost": Decimal("0"),
+            },
+        )
+        row["item_count"] += 1
+        row["quantity"] += int(quantity)
+        row["total_cost"] += Decimal(sku.reference_price or 0) * int(quantity)
+    increment_rows(
+        db,
+        _ITEM_TABLE,
+        list(item_rows.values()),
+        counters=("item_count", "quantity", "total_cost"),
+    )
+
+
+def rebuild_report_rollups(
+    db: Session,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> tuple[int, int]:
+    """Recompute the rollups from ``application`` rows for an inclusive day range.
+
+    Used to backfill after the tables are introduced and to repair rollups
+    after applications were imported or edited outside the API. Returns the
+    number of application and item rollup rows written.
+    """
+
+    day_expr = func.date(Application.created_at, type_=Date)
+    window = []
+    if start_date is not None:
+        window.append(Application.created_at >= datetime.combine(start_date, time.min))
+    if end_date is not None:
+        window.append(
+            Application.created_at
+            < datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+
+    for table in (_APPLICATION_TABLE, _ITEM_TABLE):
+        stmt = delete(table)
+        if start_date is not None:
+            stmt = stmt.where(table.c.day >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(table.c.day <= end_date)
+        db.execute(stmt)
+
+    application_rows = db.execute(
+        select(
+            day_expr,
+            SysUser.department_id,
+            func.count(Application.id),
+        )
+        .join(SysUser, SysUser.id == Application.applicant_user_id)
+        .where(*window)
+        .group_by(day_expr, SysUser.department_id)
+    ).all()
+    if application_rows:
+        db.execute(
+            _APPLICATION_TABLE.insert(),
+            [
+                {
+                    "day": day,
+                    "department_id": int(department_id),
+                    "application_count": int(application_count),
+                }
+                for day, department_id, application_count in application_rows
+            ],
+        )
+
+    item_rows = db.execute(
+        select(
+            day_expr,
+            SysUser.department_id,
+            Sku.category_id,
+            Sku.id,
+            func.count(ApplicationItem.id),
+            func.coalesce(func.sum(ApplicationItem.quantity), 0),
+            func.coalesce(func.sum(ApplicationItem.quantity * Sku.reference_price), 0),
+        )
+        .join(ApplicationItem, ApplicationItem.application_id == Application.id)
+        .join(Sku, Sku.id == ApplicationItem.sku_id)
+        .join(SysUser, SysUser.id == Application.applicant_user_id)
+        .where(*window)
+        .group_by(day_expr, SysUser.department_id, Sku.category_id, Sku.id)
+    ).all()
+    if item_rows:
+        db.execute(
+            _ITEM_TABLE.insert(),
+            [
+                {
+                    "day": day,
+                    "department_id": int(department_id),
+                    "category_id": int(category_id),
+                    "sku_id": int(sku_id),
+                    "item_count": int(item_count),
+                    "quantity": int(quantity),
+                    "total_cost": Decimal(str(total_cost)),
+                }
+                for day, department_id, category_id, sku_id, item_count, quantity, total_cost in item_rows
+            ],
+        )
+
+    return len(application_rows), len(item_rows)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Table, case, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, UOWTransaction
+
+from app.db.upsert import increment_rows
+from app.models.enums import AssetStatus
+from app.models.inventory import Asset, SkuAssetCounter
+
+_COUNTER_TABLE: Table = SkuAssetCounter.__table__
+
+STATUS_COUNTER_COLUMNS: dict[AssetStatus, str] = {
+    status: f"{status.value.lower()}_count" for status in AssetStatus
+}
+AVAILABLE_COUNTER_COLUMN = "available_count"
+COUNTER_COLUMNS: tuple[str, ...] = (
+    *STATUS_COUNTER_COLUMNS.values(),
+    AVAILABLE_COUNTER_COLUMN,
+)
+
+AssetCounterDeltas = dict[int, dict[str, int]]
+
+
+@dataclass(frozen=True, slots=True)
+class CounterDrift:
+    sku_id: int
+    column: str
+    stored: int
+    actual: int
+
+
+def _counter_columns(
+    status: AssetStatus, locked_application_id: int | None
+) -> tuple[str, ...]:
+    if status == AssetStatus.IN_STOCK and locked_application_id is None:
+        return (STATUS_COUNTER_COLUMNS[status], AVAILABLE_COUNTER_COLUMN)
+    return (STATUS_COUNTER_COLUMNS[status],)
+
+
+def add_asset_to_deltas(
+    deltas: AssetCounterDeltas,
+    *,
+    sku_id: int,
+    status: AssetStatus,
+    locked_application_id: int | None,
+    sign: int,
+) -> None:
+    row = deltas.setdefault(int(sku_id), {})
+    for column in _counter_columns(AssetStatus(status), locked_application_id):
+        row[column] = row.get(column, 0) + sign
+
+
+def apply_asset_counter_deltas(
+    executor: Session | Connection, deltas: AssetCounterDeltas
+) -> None:
+    """Add per-SKU counter deltas in one upsert, skipping SKUs that net to zero."""
+
+    rows = []
+    for sku_id in sorted(deltas):
+        changes = deltas[sku_id]
+        if not any(changes.values()):
+            continue
+        rows.append(
+            {
+                "sku_id": sku_id,
+                **{column: int(changes.get(column, 0)) for column in COUNTER_COLUMNS},
+            }
+        )
+    increment_rows(executor, _COUNTER_TABLE, rows, counters=COUNTER_COLUMNS)
+
+
+def record_assets_inserted(
+    executor: Session | Connection,
+    assets: Iterable[tuple[int, AssetStatus, int | None]],
+) -> None:
+    """Count ``(sku_id, status, locked_application_id)`` rows written with Core
+    inserts, which bypass the session flush hook."""
+
+    deltas: AssetCounterDeltas = {}
+    for sku_id, status, locked_application_id in assets:
+        add_asset_to_deltas(
+            deltas,
+            sku_id=sku_id,
+            status=status,
+            locked_application_id=locked_application_id,
+            sign=1,
+        )
+    apply_asset_counter_deltas(executor, deltas)
+
+
+def _committed_value(asset: Asset, key: str) -> Any:
+    history = inspect(asset).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(asset, key)
+
+
+def _committed_counter_key(asset: Asset) -> tuple[int, AssetStatus, int | None]:
+    return (
+        int(_committed_value(asset, "sku_id")),
+        AssetStatus(_committed_value(asset, "status")),
+        _committed_value(asset, "locked_application_id"),
+    )
+
+
+def _current_counter_key(asset: Asset) -> tuple[int, AssetStatus, int | None]:
+    return (int(asset.sku_id), AssetStatus(asset.status), asset.locked_application_id)
+
+
+def _collect_flush_deltas(session: Session) -> AssetCounterDeltas:
+    deltas: AssetCounterDeltas = {}
+
+    def _add(key: tuple[int, AssetStatus, int | None], sign: int) -> None:
+        sku_id, status, locked_application_id = key
+        add_asset_to_deltas(
+            deltas,
+            sku_id=sku_id,
+            status=status,
+            locked_application_id=locked_application_id,
+            sign=sign,
+        )
+
+    for obj in session.new:
+        if isinstance(obj, Asset):
+            _add(_current_counter_key(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Asset):
+            _add(_committed_counter_key(obj), -1)
+    for obj in session.dirty:
+        if not isinstance(obj, Asset) or obj in session.deleted:
+            continue
+        before = _committed_counter_key(obj)
+        after = _current_counter_key(obj)
+        if before != after:
+            _add(before, -1)
+            _add(after, 1)
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _track_asset_counter_changes(session: Session, _flush_context: UOWTransaction) -> None:
+    # Runs inside the flush, so counters commit or roll back with the assets.
+    deltas = _collect_flush_deltas(session)
+    if deltas:
+        apply_asset_counter_deltas(session.connection(), deltas)
+
+
+def load_asset_counters(
+    db: Session, *, sku_ids: Sequence[int]
+) -> dict[int, SkuAssetCounter]:
+    if not sku_ids:
+        return {}
+    rows = db.scalars(
+        select(SkuAssetCounter).where(SkuAssetCounter.sku_id.in_(list(sku_ids)))
+    ).all()
+    return {int(row.sku_id): row for row in rows}
+
+
+def load_available_asset_counts(db: Session, *, sku_ids: Sequence[int]) -> dict[int, int]:
+    if not sku_ids:
+        return {}
+    return {
+        int(sku_id): int(available_count)
+        for sku_id, available_count in db.execute(
+            select(SkuAssetCounter.sku_id, SkuAssetCounter.available_count).where(
+                SkuAssetCounter.sku_id.in_(list(sku_ids))
+            )
+        ).all()
+    }
+
+
+def _actual_counter_rows(db: Session) -> dict[int, dict[str, int]]:
+    columns = [
+        func.coalesce(func.sum(case((Asset.status == status, 1), else_=0)), 0).label(column)
+        for status, column in STATUS_COUNTER_COLUMNS.items()
+    ]
+    columns.append(
+        func.coalesce(
+            func.sum(
+                case(
+                    (
+                        (Asset.status == AssetStatus.IN_STOCK)
+                        & Asset.locked_application_id.is_(None),
+                        1,
+                    ),
+                    else_=0,
+                )
+            ),
+            0,
+        ).label(AVAILABLE_COUNTER_COLUMN)
+    )
+    rows = db.execute(select(Asset.sku_id, *columns).group_by(Asset.sku_id)).all()
+    return {
+        int(row.sku_id): {column: int(getattr(row, column)) for column in COUNTER_COLUMNS}
+        for row in rows
+    }
+
+
+def reconcile_sku_asset_counters(db: Session, *, repair: bool = True) -> list[CounterDrift]:
+    """Compare stored counters against a full ``asset`` scan.
+
+    Returns every mismatching ``(sku_id, column)``. With ``repair`` the stored
+    rows are overwritten with the actual counts in the caller's transaction.
+    The scan is O(#assets); run it from the reconcile script, not per request.
+    """
+
+    actual_by_sku = _actual_counter_rows(db)
+    stored_by_sku = {
+        int(row.sku_id): row
+        for row in db.scalars(select(SkuAssetCounter).with_for_update()).all()
+    }
+
+    drifts: list[CounterDrift] = []
+    for sku_id in sorted(set(actual_by_sku) | set(stored_by_sku)):
+        actual = actual_by_sku.get(sku_id, {})
+        stored = stored_by_sku.get(sku_id)
+        for column in COUNTER_COLUMNS:
+            stored_value = int(getattr(stored, column)) if stored is not None else 0
+            actual_value = actual.get(column, 0)
+            if stored_value != actual_value:
+                drifts.append(
+                    CounterDrift(
+                        sku_id=sku_id,
+                        column=column,
+                        stored=stored_value,
+                        actual=actual_value,
+                    )
+                )
+
+        if not repair:
+            continue
+        if stored is None:
+            if actual:
+                db.add(SkuAssetCounter(sku_id=sku_id, **actual))
+            continue
+        for column in COUNTER_COLUMNS:
+            setattr(stored, column, actual.get(column, 0))
+
+    if repair:
+        db.flush()
+    return drifts
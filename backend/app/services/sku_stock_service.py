@@ -1,65 +1,81 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import UTC, datetime
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import AppException
 from app.models.enums import SkuStockFlowAction
 from app.models.sku_stock import SkuStock, SkuStockFlow
+from app.services.id_allocation_service import allocate_ids
 
 
-def _next_bigint_id(db: Session, model: type[object]) -> int:
-    value = db.scalar(select(func.max(getattr(model, "id"))))
-    return int(value or 0) + 1
+@dataclass(frozen=True, slots=True)
+class StockDelta:
+    sku_id: int
+    action: SkuStockFlowAction
+    on_hand_delta: int
+    reserved_delta: int
+    meta_json: dict[str, object] | None = None
+    # Overrides the call-level related_application_id (batch operations).
+    related_application_id: int | None = None
 
 
 def get_or_create_stock_for_update(db: Session, *, sku_id: int) -> SkuStock:
-    record = db.scalar(
-        select(SkuStock).where(SkuStock.sku_id == sku_id).with_for_update()
-    )
-    if record is not None:
-        return record
+    return lock_stocks_for_update(db, sku_ids=[sku_id])[int(sku_id)]
 
-    record = SkuStock(sku_id=sku_id, on_hand_qty=0, reserved_qty=0)
-    db.add(record)
-    db.flush()
-    return record
 
+def lock_stocks_for_update(db: Session, *, sku_ids: Sequence[int]) -> dict[int, SkuStock]:
+    """Lock the stock rows of ``sku_ids`` in one statement, creating missing rows.
 
-def apply_stock_delta(
-    db: Session,
+    Rows are locked in ascending sku_id order so that concurrent callers always
+    acquire them in the same order and cannot deadlock each other.
+    """
+
+    unique_sku_ids = sorted({int(sku_id) for sku_id in sku_ids})
+    if not unique_sku_ids:
+        return {}
+
+    records = db.scalars(
+        select(SkuStock)
+        .where(SkuStock.sku_id.in_(unique_sku_ids))
+        .order_by(SkuStock.sku_id.asc())
+        .with_for_update()
+    ).all()
+    stock_by_sku_id = {int(record.sku_id): record for record in records}
+
+    missing_sku_ids = [sku_id for sku_id in unique_sku_ids if sku_id not in stock_by_sku_id]
+    if missing_sku_ids:
+        for sku_id in missing_sku_ids:
+            record = SkuStock(sku_id=sku_id, on_hand_qty=0, reserved_qty=0)
+            db.add(record)
+            stock_by_sku_id[sku_id] = record
+        db.flush()
+    return stock_by_sku_id
+
+
+def _validate_stock_delta(
     *,
     sku_id: int,
-    action: SkuStockFlowAction,
+    on_hand_qty: int,
+    reserved_qty: int,
     on_hand_delta: int,
     reserved_delta: int,
-    operator_user_id: int,
-    related_application_id: int | None,
-    occurred_at: datetime | None = None,
-    meta_json: dict[str, object] | None = None,
-) -> SkuStock:
-    """Apply stock delta with row-level lock + audit flow.
-
-    Invariants:
-    - on_hand_qty >= 0
-    - reserved_qty >= 0
-    - reserved_qty <= on_hand_qty
-    """
-
-    stock = get_or_create_stock_for_update(db, sku_id=sku_id)
-    next_on_hand = int(stock.on_hand_qty) + int(on_hand_delta)
-    next_reserved = int(stock.reserved_qty) + int(reserved_delta)
+) -> tuple[int, int]:
+    next_on_hand = on_hand_qty + on_hand_delta
+    next_reserved = reserved_qty + reserved_delta
 
     if next_on_hand < 0:
         raise AppException(
             code="STOCK_INSUFFICIENT",
             message="现存库存不足，无法扣减。",
             details={
-                "sku_id": int(sku_id),
-                "on_hand_qty": int(stock.on_hand_qty),
-                "on_hand_delta": int(on_hand_delta),
+                "sku_id": sku_id,
+                "on_hand_qty": on_hand_qty,
+                "on_hand_delta": on_hand_delta,
             },
         )
     if next_reserved < 0:
@@ -67,9 +83,9 @@ def apply_stock_delta(
             code="VALIDATION_ERROR",
             message="预占库存不足，无法释放。",
             details={
-                "sku_id": int(sku_id),
-                "reserved_qty": int(stock.reserved_qty),
-                "reserved_delta": int(reserved_delta),
+                "sku_id": sku_id,
+                "reserved_qty": reserved_qty,
+                "reserved_delta": reserved_delta,
             },
         )
     if next_reserved > next_on_hand:
@@ -77,33 +93,120 @@ def apply_stock_delta(
             code="STOCK_INSUFFICIENT",
             message="可用库存不足，无法预占或扣减。",
             details={
-                "sku_id": int(sku_id),
-                "on_hand_qty": int(stock.on_hand_qty),
-                "reserved_qty": int(stock.reserved_qty),
-                "on_hand_delta": int(on_hand_delta),
-                "reserved_delta": int(reserved_delta),
+                "sku_id": sku_id,
+                "on_hand_qty": on_hand_qty,
+                "reserved_qty": reserved_qty,
+                "on_hand_delta": on_hand_delta,
+                "reserved_delta": reserved_delta,
             },
         )
+    return next_on_hand, next_reserved
 
-    stock.on_hand_qty = next_on_hand
-    stock.reserved_qty = next_reserved
 
-    now = occurred_at or datetime.now(UTC).replace(tzinfo=None)
-    db.add(
-        SkuStockFlow(
-            id=_next_bigint_id(db, SkuStockFlow),
+def apply_stock_deltas(
+    db: Session,
+    *,
+    deltas: Sequence[StockDelta],
+    operator_user_id: int,
+    related_application_id: int | None,
+    occurred_at: datetime | None = None,
+) -> dict[int, SkuStock]:
+    """Apply several stock deltas with one locking read and one flush.
+
+    Deltas are applied in the given order (several may target the same SKU),
+    each producing one audit flow. Every invariant is checked before any row
+    is modified, so a failing delta leaves all stock rows untouched.
+
+    Invariants:
+    - on_hand_qty >= 0
+    - reserved_qty >= 0
+    - reserved_qty <= on_hand_qty
+    """
+
+    if not deltas:
+        return {}
+
+    stock_by_sku_id = lock_stocks_for_update(db, sku_ids=[delta.sku_id for delta in deltas])
+
+    quantities = {
+        sku_id: (int(stock.on_hand_qty), int(stock.reserved_qty))
+        for sku_id, stock in stock_by_sku_id.items()
+    }
+    quantities_after: list[tuple[int, int]] = []
+    for delta in deltas:
+        sku_id = int(delta.sku_id)
+        on_hand_qty, reserved_qty = quantities[sku_id]
+        quantities[sku_id] = _validate_stock_delta(
             sku_id=sku_id,
-            action=action,
-            on_hand_delta=int(on_hand_delta),
-            reserved_delta=int(reserved_delta),
-            on_hand_qty_after=int(next_on_hand),
-            reserved_qty_after=int(next_reserved),
-            operator_user_id=operator_user_id,
-            related_application_id=related_application_id,
-            occurred_at=now,
-            meta_json=meta_json,
+            on_hand_qty=on_hand_qty,
+            reserved_qty=reserved_qty,
+            on_hand_delta=int(delta.on_hand_delta),
+            reserved_delta=int(delta.reserved_delta),
         )
+        quantities_after.append(quantities[sku_id])
+
+    for sku_id, (on_hand_qty, reserved_qty) in quantities.items():
+        stock = stock_by_sku_id[sku_id]
+        stock.on_hand_qty = on_hand_qty
+        stock.reserved_qty = reserved_qty
+
+    now = occurred_at or datetime.now(UTC).replace(tzinfo=None)
+    flow_ids = allocate_ids(db, SkuStockFlow, len(deltas))
+    db.add_all(
+        [
+            SkuStockFlow(
+                id=flow_id,
+                sku_id=int(delta.sku_id),
+                action=delta.action,
+                on_hand_delta=int(delta.on_hand_delta),
+                reserved_delta=int(delta.reserved_delta),
+                on_hand_qty_after=on_hand_after,
+                reserved_qty_after=reserved_after,
+                operator_user_id=operator_user_id,
+                related_application_id=(
+                    delta.related_application_id
+                    if delta.related_application_id is not None
+                    else related_application_id
+                ),
+                occurred_at=now,
+                meta_json=delta.meta_json,
+            )
+            for flow_id, delta, (on_hand_after, reserved_after) in zip(
+                flow_ids, deltas, quantities_after, strict=True
+            )
+        ]
     )
     db.flush()
-    return stock
+    return stock_by_sku_id
+
 
+def apply_stock_delta(
+    db: Session,
+    *,
+    sku_id: int,
+    action: SkuStockFlowAction,
+    on_hand_delta: int,
+    reserved_delta: int,
+    operator_user_id: int,
+    related_application_id: int | None,
+    occurred_at: datetime | None = None,
+    meta_json: dict[str, object] | None = None,
+) -> SkuStock:
+    """Apply a single stock delta with row-level lock + audit flow."""
+
+    stock_by_sku_id = apply_stock_deltas(
+        db,
+        deltas=[
+            StockDelta(
+                sku_id=sku_id,
+                action=action,
+                on_hand_delta=on_hand_delta,
+                reserved_delta=reserved_delta,
+                meta_json=meta_json,
+            )
+        ],
+        operator_user_id=operator_user_id,
+        related_application_id=related_application_id,
+        occurred_at=occurred_at,
+    )
+    return stock_by_sku_id[int(sku_id)]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.logging import get_logger
+from app.models.security import TokenBlacklist
+
+logger = get_logger(__name__)
+
+TOKEN_BLACKLIST_PRUNE_BATCH_SIZE = 1000
+
+
+def prune_expired_blacklist(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int = TOKEN_BLACKLIST_PRUNE_BATCH_SIZE,
+) -> int:
+    """Delete blacklist rows whose token has expired; return the count.
+
+    An expired token fails signature-time validation anyway, so its row is
+    dead weight. Rows go in batches over ``idx_token_blacklist_expires``,
+    committing after each, to keep locks short on a large backlog.
+    """
+
+    cutoff = now or datetime.now(UTC).replace(tzinfo=None)
+    removed = 0
+    while True:
+        jtis = db.scalars(
+            select(TokenBlacklist.jti)
+            .where(TokenBlacklist.expires_at <= cutoff)
+            .order_by(TokenBlacklist.expires_at.asc())
+            .limit(batch_size)
+        ).all()
+        if not jtis:
+            return removed
+        db.execute(delete(TokenBlacklist).where(TokenBlacklist.jti.in_(jtis)))
+        db.commit()
+        removed += len(jtis)
+        if len(jtis) < batch_size:
+            return removed
+
+
+def _prune_once(session_factory: sessionmaker[Session]) -> int:
+    with session_factory() as db:
+        return prune_expired_blacklist(db)
+
+
+async def run_blacklist_pruner(
+    session_factory: sessionmaker[Session], *, interval_seconds: float
+) -> None:
+    """Prune the blacklist every ``interval_seconds`` until cancelled."""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(_prune_once, session_factory)
+        except Exception:
+            logger.warning("token blacklist pruning failed", exc_info=True)
+            continue
+        if removed:
+            logger.info(
+                "token_blacklist_pruned removed=%d",
+                removed,
+                extra={"event": "token_blacklist.pruned"},
+            )
@@ -0,0 +1,369 @@
+"""Bulk user import: streaming validation, process-pool hashing, chunked inserts."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import islice, repeat
+
+from fastapi import UploadFile
+from sqlalchemy import Table, insert, or_, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.auth import hash_password
+from app.core.config import get_settings
+from app.core.exceptions import AppException
+from app.core.logging import get_logger
+from app.models.enums import UserImportJobStatus
+from app.models.organization import Department, SysUser, UserImportJob
+from app.services.id_allocation_service import allocate_ids
+from app.services.import_file_service import (
+    iter_csv_import_rows,
+    iter_xlsx_import_rows,
+    normalize_import_header,
+)
+
+logger = get_logger(__name__)
+
+USER_IMPORT_CHUNK_SIZE = 500
+MAX_USER_IMPORT_ROWS = 20000
+MAX_REPORTED_ROW_ERRORS = 100
+# Same default as single-user creation in the admin CRUD endpoint.
+DEFAULT_IMPORT_PASSWORD = "User12345"
+# Employee numbers checked against existing users per query.
+EXISTING_LOOKUP_BATCH_SIZE = 1000
+
+_USER_TABLE: Table = SysUser.__table__
+
+_TEXT_COLUMNS: dict[str, int] = {
+    "employee_no": 32,
+    "name": 64,
+    "email": 128,
+    "department_name": 64,
+    "section_name": 64,
+    "mobile_phone": 32,
+    "job_title": 128,
+    "password": 128,
+}
+_REQUIRED_COLUMNS = ("employee_no", "name")
+
+
+@dataclass(frozen=True, slots=True)
+class UserImportRow:
+    row: int
+    employee_no: str
+    name: str
+    department_id: int
+    email: str | None
+    department_name: str | None
+    section_name: str | None
+    mobile_phone: str | None
+    job_title: str | None
+    password: str
+
+
+@dataclass(slots=True)
+class _PendingRow:
+    row: int
+    values: dict[str, str | None]
+    department_id: int | None
+    department: str | None
+
+
+def _iter_sheet_rows(file: UploadFile) -> Iterator[tuple[object, ...]]:
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        return iter_csv_import_rows(file)
+    if filename.endswith(".xlsx"):
+        return iter_xlsx_import_rows(file)
+    raise AppException(
+        code="UNSUPPORTED_MEDIA_TYPE",
+        message="用户导入仅支持 csv/xlsx 文件。",
+    )
+
+
+def _cell_text(row: tuple[object, ...], index: int | None) -> str | None:
+    if index is None or index >= len(row) or row[index] is None:
+        return None
+    text = str(row[index]).strip()
+    return text or None
+
+
+def _read_pending_rows(
+    file: UploadFile, errors: list[dict[str, object]]
+) -> list[_PendingRow]:
+    pending: list[_PendingRow] = []
+    with closing(_iter_sheet_rows(file)) as rows:
+        header = next(rows, None)
+        columns = [normalize_import_header(value) for value in header or ()]
+        missing = [column for column in _REQUIRED_COLUMNS if column not in columns]
+        if "department_id" not in columns and "department" not in columns:
+            missing.append("department")
+        if missing:
+            raise AppException(
+                code="VALIDATION_ERROR",
+                message="导入文件缺少必要列。",
+                details={"missing_columns": missing},
+            )
+
+        def _index(column: str) -> int | None:
+            return columns.index(column) if column in columns else None
+
+        text_indexes = {column: _index(column) for column in _TEXT_COLUMNS}
+        department_id_index = _index("department_id")
+        department_index = _index("department")
+        seen_employee_nos: set[str] = set()
+
+        for row_number, row in enumerate(rows, start=2):
+            if all(value is None or not str(value).strip() for value in row):
+                continue
+            if len(pending) + len(errors) >= MAX_USER_IMPORT_ROWS:
+                raise AppException(
+                    code="VALIDATION_ERROR",
+                    message=f"单次最多导入 {MAX_USER_IMPORT_ROWS} 个用户。",
+                )
+
+            values = {column: _cell_text(row, index) for column, index in text_indexes.items()}
+            row_errors = [
+                {"row": row_number, "field": column, "message": "必填项不能为空。"}
+                for column in _REQUIRED_COLUMNS
+                if not values[column]
+            ]
+            row_errors.extend(
+                {
+                    "row": row_number,
+                    "field": column,
+                    "message": f"长度不能超过 {max_length} 个字符。",
+                }
+                for column, max_length in _TEXT_COLUMNS.items()
+                if values[column] is not None and len(values[column]) > max_length
+            )
+
+            department_id: int | None = None
+            raw_department_id = _cell_text(row, department_id_index)
+            department = _cell_text(row, department_index)
+            if raw_department_id is not None:
+                try:
+                    department_id = int(raw_department_id)
+                except ValueError:
+                    row_errors.append(
+                        {"row": row_number, "field": "department_id", "message": "必须为整数。"}
+                    )
+            elif department is None:
+                row_errors.append(
+                    {"row": row_number, "field": "department", "message": "必填项不能为空。"}
+                )
+
+            employee_no = values["employee_no"]
+            if employee_no is not None:
+                if employee_no in seen_employee_nos:
+                    row_errors.append(
+                        {"row": row_number, "field": "employee_no", "message": "工号在文件中重复。"}
+                    )
+                seen_employee_nos.add(employee_no)
+
+            if row_errors:
+                errors.extend(row_errors)
+                continue
+            pending.append(
+                _PendingRow(
+                    row=row_number,
+                    values=values,
+                    department_id=department_id,
+                    department=department if department_id is None else None,
+                )
+            )
+    return pending
+
+
+def read_user_import_rows(db: Session, file: UploadFile) -> list[UserImportRow]:
+    """Validate an uploaded user sheet and resolve it into insertable rows.
+
+    Columns are ``employee_no``, ``name`` and ``department_id`` or
+    ``department`` (a name), plus optional ``email``, ``department_name``,
+    ``section_name``, ``mobile_phone``, ``job_title`` and ``password``. The
+    sheet is read row by row; departments are then resolved with one query
+    and employee numbers checked in batches. Every problem found is reported
+    in a single ``VALIDATION_ERROR``.
+    """
+
+    errors: list[dict[str, object]] = []
+    pending = _read_pending_rows(file, errors)
+
+    department_ids = {row.department_id for row in pending if row.department_id is not None}
+    department_names = {row.department for row in pending if row.department is not None}
+    department_id_by_name: dict[str, int] = {}
+    known_department_ids: set[int] = set()
+    if department_ids or department_names:
+        for department_id, name in db.execute(
+            select(Department.id, Department.name).where(
+                or_(Department.id.in_(department_ids), Department.name.in_(department_names))
+            )
+        ).all():
+            known_department_ids.add(int(department_id))
+            department_id_by_name[name] = int(department_id)
+
+    employee_nos = [str(row.values["employee_no"]) for row in pending]
+    existing_employee_nos: set[str] = set()
+    for start in range(0, len(employee_nos), EXISTING_LOOKUP_BATCH_SIZE):
+        existing_employee_nos.update(
+            db.scalars(
+                select(SysUser.employee_no).where(
+                    SysUser.employee_no.in_(
+                        employee_nos[start : start + EXISTING_LOOKUP_BATCH_SIZE]
+                    )
+                )
+            ).all()
+        )
+
+    rows: list[UserImportRow] = []
+    for row in pending:
+        if row.department_id is not None:
+            department_id = row.department_id if row.department_id in known_department_ids else None
+        else:
+            department_id = department_id_by_name.get(str(row.department))
+        if department_id is None:
+            errors.append({"row": row.row, "field": "department", "message": "部门不存在。"})
+            continue
+        if row.values["employee_no"] in existing_employee_nos:
+            errors.append({"row": row.row, "field": "employee_no", "message": "工号已存在。"})
+            continue
+        rows.append(
+            UserImportRow(
+                row=row.row,
+                employee_no=str(row.values["employee_no"]),
+                name=str(row.values["name"]),
+                department_id=department_id,
+                email=row.values["email"],
+                department_name=row.values["department_name"],
+                section_name=row.values["section_name"],
+                mobile_phone=row.values["mobile_phone"],
+                job_title=row.values["job_title"],
+                password=row.values["password"] or DEFAULT_IMPORT_PASSWORD,
+            )
+        )
+
+    if errors:
+        errors.sort(key=lambda item: int(item["row"]))
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="导入文件存在无效数据。",
+            details={"error_count": len(errors), "errors": errors[:MAX_REPORTED_ROW_ERRORS]},
+        )
+    if not rows:
+        raise AppException(
+            code="VALIDATION_ERROR",
+            message="导入文件中没有用户数据。",
+        )
+    return rows
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 1
+_POOL_LOCK = threading.Lock()
+
+
+def get_password_hash_process_pool() -> tuple[ProcessPoolExecutor, int]:
+    """Return the shared hashing process pool and its worker count.
+
+    Worker processes are spawned rather than forked: the server process runs
+    threads whose locks a fork would copy in a held state.
+    """
+
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL_WORKERS = get_settings().user_import_hash_workers or os.cpu_count() or 1
+            _POOL = ProcessPoolExecutor(
+                max_workers=_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL, _POOL_WORKERS
+
+
+def shutdown_password_hash_process_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _insert_users(db: Session, rows: list[UserImportRow], password_hashes: list[str]) -> None:
+    user_ids = allocate_ids(db, SysUser, len(rows))
+    db.execute(
+        insert(_USER_TABLE),
+        [
+            {
+                "id": user_id,
+                "employee_no": row.employee_no,
+                "name": row.name,
+                "department_id": row.department_id,
+                "email": row.email,
+                "department_name": row.department_name,
+                "section_name": row.section_name,
+                "mobile_phone": row.mobile_phone,
+                "job_title": row.job_title,
+                "password_hash": password_hash,
+            }
+            for user_id, row, password_hash in zip(user_ids, rows, password_hashes)
+        ],
+    )
+
+
+def run_user_import_job(bind: Engine | Connection, job_id: int, rows: list[UserImportRow]) -> None:
+    """Hash and insert validated rows, recording progress on the job.
+
+    Every password is submitted to the process pool up front, so later chunks
+    hash while earlier ones are inserted. Each chunk is one multi-row insert
+    and one commit; a failure stops the job but keeps the committed chunks.
+    """
+
+    settings = get_settings()
+    with Session(bind=bind, autoflush=False, expire_on_commit=False) as db:
+        job = db.get(UserImportJob, job_id)
+        if job is None:
+            return
+        job.status = UserImportJobStatus.RUNNING
+        job.started_at = _now()
+        db.commit()
+
+        try:
+            pool, workers = get_password_hash_process_pool()
+            password_hashes = pool.map(
+                hash_password,
+                (row.password for row in rows),
+                repeat(settings),
+                chunksize=max(1, min(64, len(rows) // (workers * 4))),
+            )
+            for start in range(0, len(rows), USER_IMPORT_CHUNK_SIZE):
+                chunk = rows[start : start + USER_IMPORT_CHUNK_SIZE]
+                _insert_users(db, chunk, list(islice(password_hashes, len(chunk))))
+                job.processed_rows += len(chunk)
+                job.created_count += len(chunk)
+                db.commit()
+        except IntegrityError:
+            db.rollback()
+            job.status = UserImportJobStatus.FAILED
+            job.error_message = "工号已被占用，导入已中止。"
+        except Exception as exc:
+            db.rollback()
+            logger.warning("user import job failed", exc_info=True)
+            job.status = UserImportJobStatus.FAILED
+            job.error_message = f"导入失败：{type(exc).__name__}"[:1000]
+        else:
+            job.status = UserImportJobStatus.SUCCEEDED
+        job.finished_at = _now()
+        db.commit()
@@ -0,0 +1,200 @@
+"""
+Compare the ApiResponse response path with success_json() on large payloads.
+
+Payloads mirror the biggest list responses: a 200-row /outbound/records page
+(every OUTBOUND_RECORD_COLUMNS field) and a full /inventory/summary list.
+Both routes run through a FastAPI app called directly over ASGI, so the
+timings include routing, the threadpool hop and response handling, but no
+HTTP client. The two bodies are checked to be byte-identical first.
+
+Usage:
+    python scripts/bench_json_response.py [--rounds 50] [--skus 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from app.api.v1.routers.m05_outbound import OUTBOUND_RECORD_COLUMNS
+from app.core.responses import orjson
+from app.schemas.common import ApiResponse, build_success_response, success_json
+
+
+def _outbound_records_page(rows: int) -> dict[str, object]:
+    items: list[dict[str, object]] = []
+    for index in range(rows):
+        record: dict[str, object] = {column: None for column in OUTBOUND_RECORD_COLUMNS}
+        record.update(
+            {
+                "record_key": f"SKU_FLOW-{100000 + index}",
+                "record_type": "SKU_QUANTITY" if index % 2 else "ASSET",
+                "action": "OUTBOUND",
+                "occurred_at": f"2026-03-01T08:{index % 60:02d}:00",
+                "meta_json": {"source": "bench", "note": "领用出库", "batch": index // 50},
+                "application_id": 5000 + index,
+                "application_title": f"申请单 {index}",
+                "application_type": "APPLY",
+                "application_status": "OUTBOUNDED",
+                "delivery_type": "PICKUP",
+                "pickup_code": f"{index:06d}",
+                "applicant_user_id": 10 + index % 40,
+                "applicant_name_snapshot": "张三",
+                "applicant_department_snapshot": "信息技术部",
+                "sku_id": index % 300,
+                "category_name": "笔记本电脑",
+                "brand": "Lenovo",
+                "model": "ThinkPad T14",
+                "spec": "i7/32G/1T",
+                "stock_mode": "QUANTITY",
+                "reference_price": "8999.00",
+                "safety_stock_threshold": 5,
+                "quantity": 1,
+                "on_hand_delta": -1,
+                "reserved_delta": 0,
+                "on_hand_qty_after": 120 - index % 100,
+                "reserved_qty_after": 3,
+                "operator_user_id": 2,
+                "operator_name": "仓库管理员",
+            }
+        )
+        items.append(record)
+    return {
+        "items": items,
+        "meta": {"page": 1, "page_size": rows, "total": 12000, "next_cursor": "eyJ0IjoiYmVuY2gifQ"},
+    }
+
+
+def _inventory_summary(skus: int) -> list[dict[str, object]]:
+    return [
+        {
+            "sku_id": sku_id,
+            "category_id": 1 + sku_id % 12,
+            "name": f"物料 {sku_id}",
+            "brand": "Dell",
+            "model": f"U27{sku_id % 100:02d}QE",
+            "spec": "27 inch 4K",
+            "reference_price": str(Decimal("3299.00") + sku_id),
+            "cover_url": None,
+            "stock_mode": "SERIALIZED",
+            "safety_stock_threshold": 2,
+            "total_count": 40,
+            "in_stock_count": 12,
+            "locked_count": 3,
+            "in_use_count": 20,
+            "repairing_count": 1,
+            "scrapped_count": 4,
+            "on_hand_qty": 15,
+            "reserved_qty": 3,
+            "available_qty": 12,
+            "below_safety_stock": False,
+        }
+        for sku_id in range(1, skus + 1)
+    ]
+
+
+def _routes(payload: object) -> tuple[Callable[[], ApiResponse], Callable[[], Response]]:
+    def _envelope() -> ApiResponse:
+        return build_success_response(payload)
+
+    def _fast() -> Response:
+        return success_json(payload)
+
+    return _envelope, _fast
+
+
+def _build_app(payloads: dict[str, object]) -> FastAPI:
+    app = FastAPI()
+    for name, payload in payloads.items():
+        envelope, fast = _routes(payload)
+        app.add_api_route(f"/{name}/envelope", envelope, response_model=ApiResponse)
+        app.add_api_route(f"/{name}/fast", fast, response_model=ApiResponse)
+    return app
+
+
+async def _get(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    body: list[bytes] = []
+
+    async def receive() -> dict[str, object]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, object]) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def _median_ms(call: Callable[[], Awaitable[object]], rounds: int) -> float:
+    samples: list[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def _run(app: FastAPI, names: list[str], rounds: int) -> int:
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(
+        f"{'payload':<26}{'bytes':>10}{'ApiResponse ms':>16}"
+        f"{'success_json ms':>17}{'speedup':>9}"
+    )
+    for name in names:
+        envelope_path, fast_path = f"/{name}/envelope", f"/{name}/fast"
+        envelope = await _get(app, envelope_path)
+        fast = await _get(app, fast_path)
+        if envelope != fast:
+            print(f"{name}: response bodies differ", file=sys.stderr)
+            return 1
+        envelope_ms = await _median_ms(lambda: _get(app, envelope_path), rounds)
+        fast_ms = await _median_ms(lambda: _get(app, fast_path), rounds)
+        print(
+            f"{name:<26}{len(fast):>10}{envelope_ms:>16.2f}{fast_ms:>17.2f}"
+            f"{envelope_ms / fast_ms:>8.1f}x"
+        )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--skus", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    payloads: dict[str, object] = {
+        "outbound-records-200": _outbound_records_page(200),
+        f"inventory-summary-{args.skus}": _inventory_summary(args.skus),
+    }
+    return asyncio.run(_run(_build_app(payloads), list(payloads), args.rounds))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
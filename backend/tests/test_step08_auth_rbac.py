@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import json
+import logging
 import os
+import queue
 import sys
-from datetime import UTC, datetime
+import threading
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
@@ -12,11 +17,14 @@ from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.core.auth import hash_password
+from app.core import password_hashing
+from app.core.auth import decode_access_token, hash_password, verify_password
 from app.core.config import get_settings
+from app.core.logging import BoundedQueueHandler, JsonFormatter, RoutineRequestSampler
 from app.db.base import Base
 from app.db.session import get_db_session
 from app.main import app
+from app.models.enums import TokenBlacklistReason
 from app.models.organization import Department, SysUser
 from app.models.rbac import (
     RbacPermission,
@@ -24,6 +32,8 @@ from app.models.rbac import (
     RbacRolePermission,
     RbacUserRole,
 )
+from app.models.security import TokenBlacklist
+from app.services.token_blacklist_service import prune_expired_blacklist
 
 
 def _seed_data(session: Session) -> None:
@@ -184,3 +194,128 @@ def test_refresh_cookie_flow_works_without_json_body() -> None:
     assert body["success"] is True
     assert isinstance(body["data"]["access_token"], str)
     assert body["data"]["expires_in"] > 0
+
+
+def test_login_rehashes_password_when_iterations_change() -> None:
+    with _build_client() as client:
+        os.environ["PASSWORD_HASH_ITERATIONS"] = "2500"
+        get_settings.cache_clear()
+        try:
+            _login_and_get_access_token(client, "U0001", "User12345")
+            _login_and_get_access_token(client, "U0001", "User12345")
+        finally:
+            os.environ["PASSWORD_HASH_ITERATIONS"] = "2000"
+            get_settings.cache_clear()
+
+        session = next(app.dependency_overrides[get_db_session]())
+        user = session.get(SysUser, 2)
+
+    assert user is not None
+    assert user.password_hash.startswith("pbkdf2_sha256$2500$")
+    assert verify_password("User12345", user.password_hash)
+
+
+def test_saturated_password_hashing_returns_503(monkeypatch: pytest.MonkeyPatch) -> None:
+    busy = password_hashing.PasswordHashExecutor(max_workers=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def _hold_worker() -> None:
+        started.set()
+        release.wait()
+
+    holder = threading.Thread(target=busy.run, args=(_hold_worker,))
+    holder.start()
+    started.wait()
+    try:
+        with _build_client() as client:
+            monkeypatch.setattr(password_hashing, "_EXECUTOR", busy)
+            rejected = client.post(
+                "/api/v1/auth/login",
+                json={"employee_no": "U0001", "password": "User12345"},
+            )
+    finally:
+        release.set()
+        holder.join()
+
+    assert rejected.status_code == 503
+    assert rejected.json()["error"]["code"] == "SERVICE_UNAVAILABLE"
+    # Application shutdown tears the executor down and drops it.
+    assert password_hashing._EXECUTOR is None
+
+
+def test_revocation_set_is_warm_loaded_and_expired_rows_are_pruned() -> None:
+    with _build_client() as client:
+        access_token = _login_and_get_access_token(client, "U0001", "User12345")
+        session = next(app.dependency_overrides[get_db_session]())
+        now = datetime.now(UTC).replace(tzinfo=None)
+        # Revoked by another worker before this process loaded its set.
+        session.add(
+            TokenBlacklist(
+                jti=decode_access_token(access_token)["jti"],
+                user_id=2,
+                revoked_at=now,
+                expires_at=now + timedelta(hours=1),
+                reason=TokenBlacklistReason.ADMIN_FORCED,
+            )
+        )
+        session.add_all(
+            [
+                TokenBlacklist(
+                    jti=f"expired-{index}",
+                    user_id=2,
+                    revoked_at=now - timedelta(days=2),
+                    expires_at=now - timedelta(days=1, minutes=index),
+                    reason=TokenBlacklistReason.LOGOUT,
+                )
+                for index in range(5)
+            ]
+        )
+        session.commit()
+
+        response = client.put(
+            "/api/v1/users/me/password",
+            json={"old_password": "User12345", "new_password": "User54321"},
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+        removed = prune_expired_blacklist(session, batch_size=2)
+        remaining = session.query(TokenBlacklist.jti).count()
+
+    assert response.status_code == 401
+    assert response.json()["error"]["code"] == "TOKEN_BLACKLISTED"
+    assert removed == 5
+    assert remaining == 1
+
+
+def test_log_records_are_sampled_and_dropped_before_formatting() -> None:
+    def _record(path: str, status_code: int) -> logging.LogRecord:
+        record = logging.LogRecord(
+            "app", logging.INFO, __file__, 1, "request_completed", None, None
+        )
+        record.event = "request.completed"
+        record.path = path
+        record.status_code = status_code
+        return record
+
+    sampler = RoutineRequestSampler(every=3)
+    kept = [sampler.filter(_record("/healthz", 200)) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert sampler.filter(_record("/healthz", 503)) is True
+    assert sampler.filter(_record("/api/v1/auth/me", 200)) is True
+
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, block=False)
+    first = logging.LogRecord("app", logging.INFO, __file__, 1, "value=%s", ("a",), None)
+    handler.handle(first)
+    handler.handle(logging.LogRecord("app", logging.INFO, __file__, 1, "second", None, None))
+    assert handler.dropped == 1
+    queued = log_queue.get_nowait()
+    # Formatting is left to the listener thread.
+    assert queued is first
+    assert queued.args == ("a",)
+
+    payload = json.loads(JsonFormatter().format(queued))
+    assert payload["message"] == "value=a"
+    expected = datetime.fromtimestamp(queued.created, UTC).isoformat(timespec="seconds")
+    assert payload["timestamp"] == expected.replace("+00:00", "Z")
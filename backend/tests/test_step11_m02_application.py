@@ -6,24 +6,35 @@ from datetime import UTC, datetime
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.core.auth import hash_password
+from app.core.catalog_cache import CatalogCache, invalidate_catalog_cache
 from app.core.config import get_settings
 from app.db.base import Base
 from app.db.session import get_db_session
 from app.main import app
+from app.models.application import Application, ApplicationAsset, PickupCodePool
 from app.models.catalog import Category, Sku
-from app.models.enums import AssetStatus
-from app.models.inventory import Asset
+from app.models.enums import ApplicationStatus, ApplicationType, AssetStatus, DeliveryType
+from app.models.inventory import Asset, StockFlow
 from app.models.notification import UserAddress
 from app.models.organization import Department, SysUser
 from app.models.rbac import RbacRole, RbacUserRole
+from app.services.asset_reservation_service import reserve_assets
+from app.services.id_allocation_service import allocate_ids
+from app.services.pickup_code_service import (
+    PICKUP_CODE_POOL_REFILL_SIZE,
+    allocate_pickup_code,
+)
+from app.services.sku_asset_counter_service import reconcile_sku_asset_counters
 
 
 def _seed_data(session: Session) -> None:
@@ -309,6 +320,35 @@ def test_application_create_locks_inventory_success() -> None:
     assert sku_items[2]["available_stock"] == 0
 
 
+def test_id_allocator_hands_out_blocks_without_max_scans() -> None:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    statements: list[str] = []
+
+    def _record_statement(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement.lower())
+
+    with Session(engine) as session:
+        session.add(Department(id=7, name="Seeded"))
+        session.commit()
+
+        assert allocate_ids(session, Department, 3) == [8, 9, 10]
+        session.rollback()
+        assert allocate_ids(session, Department, 3) == [8, 9, 10]
+        session.commit()
+
+        event.listen(engine, "before_cursor_execute", _record_statement)
+        assert allocate_ids(session, Department, 2) == [11, 12]
+        event.remove(engine, "before_cursor_execute", _record_statement)
+
+    assert len(statements) == 1
+    assert "max(" not in statements[0]
+
+
 def test_application_create_fails_when_stock_insufficient() -> None:
     with _build_client() as client:
         access_token = _login_and_get_access_token(client)
@@ -397,3 +437,181 @@ def test_ai_precheck_response_shape() -> None:
     assert payload["success"] is True
     assert payload["data"]["recommendation"] in {"PASS", "REJECT"}
     assert isinstance(payload["data"]["reason"], str)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    def get(self, key: str) -> int | None:
+        return self.values.get(key)
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+def test_catalog_cache_serves_static_rows_and_overlays_live_stock() -> None:
+    with _build_client() as client:
+        access_token = _login_and_get_access_token(client)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        session = next(app.dependency_overrides[get_db_session]())
+        engine = session.get_bind()
+        statements: list[str] = []
+
+        def _record_statement(_conn, _cursor, statement, *_args) -> None:
+            statements.append(" ".join(statement.lower().split()))
+
+        first = client.get("/api/v1/skus?keyword=T14", headers=headers)
+        assert first.status_code == 200
+        assert first.json()["data"]["items"][0]["available_stock"] == 2
+        assert client.get("/api/v1/categories/tree", headers=headers).status_code == 200
+
+        session.execute(
+            update(Sku).where(Sku.id == 1).values(name="Renamed Laptop")
+        )
+        session.get(Asset, 1).status = AssetStatus.IN_USE
+        session.commit()
+
+        event.listen(engine, "before_cursor_execute", _record_statement)
+        cached = client.get("/api/v1/skus?keyword=t14", headers=headers)
+        cached_tree = client.get("/api/v1/categories/tree", headers=headers)
+        event.remove(engine, "before_cursor_execute", _record_statement)
+
+        cached_item = cached.json()["data"]["items"][0]
+        assert cached_item["name"] != "Renamed Laptop"
+        # Availability is always read live.
+        assert cached_item["available_stock"] == 1
+        assert cached_tree.json()["data"][0]["name"] == "Electronics"
+        assert not any(" from sku " in f"{statement} " for statement in statements)
+        assert not any(" from category " in f"{statement} " for statement in statements)
+
+        invalidate_catalog_cache(session)
+        refreshed = client.get("/api/v1/skus?keyword=renamed", headers=headers)
+        assert refreshed.json()["data"]["items"][0]["name"] == "Renamed Laptop"
+        session.close()
+
+    shared_redis = _FakeRedis()
+    worker_a = CatalogCache(ttl_seconds=60, redis_client=shared_redis)
+    worker_b = CatalogCache(ttl_seconds=60, redis_client=shared_redis)
+    loads: list[str] = []
+    assert worker_b.get_or_load("tree", lambda: loads.append("b") or "v1") == "v1"
+    assert worker_b.get_or_load("tree", lambda: loads.append("b") or "v2") == "v1"
+    worker_a.invalidate()
+    assert worker_b.get_or_load("tree", lambda: loads.append("b") or "v2") == "v2"
+    assert loads == ["b", "b"]
+
+
+def test_reserve_assets_claims_bounded_rows_and_keeps_counters_in_sync() -> None:
+    with _build_client() as client:
+        access_token = _login_and_get_access_token(client)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = client.post(
+            "/api/v1/applications",
+            headers=headers,
+            json={
+                "type": "APPLY",
+                "delivery_type": "PICKUP",
+                "items": [{"sku_id": 1, "quantity": 1}],
+            },
+        )
+        assert response.status_code == 200
+        application_id = response.json()["data"]["id"]
+        assert [row["asset_id"] for row in response.json()["data"]["locked_assets"]] == [1]
+
+    session = next(app.dependency_overrides[get_db_session]())
+    now = datetime.now(UTC).replace(tzinfo=None)
+
+    shortfall = reserve_assets(
+        session,
+        application_id=application_id,
+        quantities=[(1, 2), (2, 1)],
+        operator_user_id=1,
+        occurred_at=now,
+        flow_meta={"event": "lock_inventory"},
+    )
+    assert shortfall.shortfall_by_sku == {1: 1}
+    session.rollback()
+
+    reservation = reserve_assets(
+        session,
+        application_id=application_id,
+        quantities=[(1, 1), (2, 1)],
+        operator_user_id=1,
+        occurred_at=now,
+        flow_meta={"event": "lock_inventory"},
+    )
+    assert reservation.shortfall_by_sku == {}
+    assert reservation.asset_ids_by_sku == {1: [2], 2: [4]}
+    session.commit()
+
+    assert session.get(Asset, 2).locked_application_id == application_id
+    flows = session.scalars(
+        select(StockFlow)
+        .where(StockFlow.related_application_id == application_id)
+        .order_by(StockFlow.id.asc())
+    ).all()
+    assert [(flow.asset_id, flow.meta_json["sku_id"]) for flow in flows] == [
+        (1, 1),
+        (2, 1),
+        (4, 2),
+    ]
+    linked_asset_ids = session.scalars(
+        select(ApplicationAsset.asset_id)
+        .where(ApplicationAsset.application_id == application_id)
+        .order_by(ApplicationAsset.asset_id.asc())
+    ).all()
+    assert linked_asset_ids == [1, 2, 4]
+    assert reconcile_sku_asset_counters(session, repair=False) == []
+    session.close()
+
+
+def test_pickup_codes_come_from_a_pool_and_return_when_closed() -> None:
+    with _build_client():
+        session = next(app.dependency_overrides[get_db_session]())
+
+    code = allocate_pickup_code(session)
+    pooled = session.scalar(select(func.count()).select_from(PickupCodePool))
+    assert 0 < pooled < PICKUP_CODE_POOL_REFILL_SIZE
+    assert session.get(PickupCodePool, code) is None
+
+    def _application(application_id: int, status: ApplicationStatus) -> Application:
+        return Application(
+            id=application_id,
+            applicant_user_id=1,
+            type=ApplicationType.APPLY,
+            status=status,
+            delivery_type=DeliveryType.PICKUP,
+            pickup_code=code,
+        )
+
+    first = _application(101, ApplicationStatus.SUBMITTED)
+    session.add(first)
+    session.commit()
+
+    statements: list[str] = []
+
+    def _record_statement(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _record_statement)
+    next_code = allocate_pickup_code(session)
+    event.remove(engine, "before_cursor_execute", _record_statement)
+    assert next_code != code
+    assert len(statements) == 3
+    session.rollback()
+
+    first.status = ApplicationStatus.CANCELLED
+    session.commit()
+    assert session.get(PickupCodePool, code) is not None
+
+    session.add(_application(102, ApplicationStatus.SUBMITTED))
+    session.commit()
+    assert session.get(PickupCodePool, code) is None
+
+    session.add(_application(103, ApplicationStatus.SUBMITTED))
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
+    session.close()
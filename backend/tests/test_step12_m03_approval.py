@@ -500,3 +500,149 @@ def test_admin_approve_reject_assign_and_detail_payload() -> None:
         assert len(unlock_102) == 1
         assert len(lock_102) == 1
         assert len(unlock_104) == 1
+
+
+def test_inbox_scopes_to_approver_categories_and_pages_by_cursor() -> None:
+    client, session_factory = _build_client()
+    with session_factory() as session:
+        session.get(Category, 1).leader_approver_user_id = 2
+        session.add(Category(id=2, name="Peripherals", parent_id=None, leader_approver_user_id=4))
+        session.add(
+            Sku(
+                id=3,
+                category_id=2,
+                brand="Logi",
+                model="MX Keys",
+                spec="keyboard",
+                reference_price=Decimal("699.00"),
+                cover_url=None,
+                safety_stock_threshold=1,
+            )
+        )
+        session.flush()
+        session.get(ApplicationItem, 1004).sku_id = 3
+        session.commit()
+
+    with client:
+        leader_headers = {
+            "Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}"
+        }
+        admin_headers = {
+            "Authorization": f"Bearer {_login_and_get_access_token(client, 'U0003')}"
+        }
+
+        leader_inbox = client.get(
+            "/api/v1/approvals/inbox?node=LEADER", headers=leader_headers
+        )
+        leader_global = client.get(
+            "/api/v1/approvals/inbox?node=LEADER&scope=all", headers=leader_headers
+        )
+        admin_assigned = client.get(
+            "/api/v1/approvals/inbox?node=LEADER&scope=assigned", headers=admin_headers
+        )
+        first_page = client.get(
+            "/api/v1/approvals/inbox?node=LEADER&page_size=1", headers=admin_headers
+        )
+        next_cursor = first_page.json()["data"]["meta"]["next_cursor"]
+        second_page = client.get(
+            "/api/v1/approvals/inbox",
+            params={
+                "node": "LEADER",
+                "page_size": 1,
+                "cursor": next_cursor,
+                "include_total": "false",
+            },
+            headers=admin_headers,
+        )
+        bad_cursor = client.get(
+            "/api/v1/approvals/inbox?node=LEADER&cursor=not-a-cursor",
+            headers=admin_headers,
+        )
+
+    assert leader_inbox.status_code == 200
+    leader_data = leader_inbox.json()["data"]
+    assert [item["application_id"] for item in leader_data["items"]] == [101]
+    assert leader_data["meta"]["scope"] == "assigned"
+    assert leader_data["meta"]["total"] == 1
+
+    assert leader_global.status_code == 403
+    assert admin_assigned.json()["data"]["items"] == []
+
+    first_data = first_page.json()["data"]
+    assert [item["application_id"] for item in first_data["items"]] == [101]
+    assert first_data["meta"]["total"] == 2
+    assert first_data["meta"]["total_is_estimate"] is False
+    assert next_cursor
+
+    second_data = second_page.json()["data"]
+    assert [item["application_id"] for item in second_data["items"]] == [103]
+    assert second_data["meta"]["total"] is None
+    assert second_data["meta"]["next_cursor"] is None
+
+    assert bad_cursor.status_code == 400
+    assert bad_cursor.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_batch_reject_reports_per_id_and_unlocks_assets_together() -> None:
+    client, session_factory = _build_client()
+    with client:
+        leader_headers = {
+            "Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}"
+        }
+        response = client.post(
+            "/api/v1/approvals/batch",
+            headers=leader_headers,
+            json={
+                "node": "LEADER",
+                "action": "REJECT",
+                "comment": "budget freeze",
+                "application_ids": [101, 103, 102, 999, 101],
+            },
+        )
+        admin_node_by_leader = client.post(
+            "/api/v1/approvals/batch",
+            headers=leader_headers,
+            json={"node": "ADMIN", "action": "APPROVE", "application_ids": [102]},
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["succeeded"] == 2
+    assert data["failed"] == 2
+    results = {item["application_id"]: item for item in data["results"]}
+    assert [item["application_id"] for item in data["results"]] == [101, 103, 102, 999]
+    assert results[101]["status"] == "LEADER_REJECTED"
+    assert results[103]["status"] == "LEADER_REJECTED"
+    assert results[102]["error"]["code"] == "APPLICATION_STATUS_INVALID"
+    assert results[999]["error"]["code"] == "APPLICATION_NOT_FOUND"
+
+    assert admin_node_by_leader.status_code == 403
+
+    with session_factory() as session:
+        assert session.get(Application, 102).status == ApplicationStatus.LEADER_APPROVED
+        for asset_id in (1, 2, 4):
+            asset = session.get(Asset, asset_id)
+            assert asset.status == AssetStatus.IN_STOCK
+            assert asset.locked_application_id is None
+        assert session.get(Asset, 3).locked_application_id == 102
+
+        unlock_rows = session.scalars(
+            select(StockFlow).where(StockFlow.action == StockFlowAction.UNLOCK)
+        ).all()
+        assert sorted((row.asset_id, row.related_application_id) for row in unlock_rows) == [
+            (1, 101),
+            (2, 101),
+            (4, 103),
+        ]
+        assert session.scalars(
+            select(ApplicationAsset.id).where(ApplicationAsset.application_id.in_([101, 103]))
+        ).all() == []
+
+        history_rows = session.scalars(
+            select(ApprovalHistory).where(ApprovalHistory.comment == "budget freeze")
+        ).all()
+        assert sorted(row.application_id for row in history_rows) == [101, 103]
+        assert all(
+            row.node == ApprovalNode.LEADER and row.action == ApprovalAction.REJECT
+            for row in history_rows
+        )
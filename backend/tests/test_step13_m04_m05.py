@@ -1,20 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import re
 import sys
-from datetime import UTC, datetime
+import zlib
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
 
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app.api.v1.routers.m05_outbound import _iter_outbound_csv_chunks
 from app.core.auth import hash_password
+from app.core.compression import CompressionMiddleware
 from app.core.config import get_settings
+from app.core.metrics import HTTP_REQUEST_DURATION
 from app.db.base import Base
 from app.db.session import get_db_session
 from app.main import app
@@ -45,7 +53,9 @@ from app.models.rbac import (
     RbacRolePermission,
     RbacUserRole,
 )
-from app.models.sku_stock import SkuStockFlow
+from app.models.sku_stock import SkuStock, SkuStockFlow
+from app.services.metrics_service import refresh_business_metrics
+from app.services.pickup_lookup_service import get_pickup_lookup_cache
 
 
 def _seed_data(session: Session) -> None:
@@ -706,3 +716,592 @@ def test_m05_outbound_records_and_export() -> None:
         csv_text = export_response.content.decode("utf-8-sig")
         assert "record_key,record_type,action,occurred_at" in csv_text
         assert "SKU_FLOW-9001" in csv_text
+
+
+def test_m05_outbound_export_streams_merged_records_in_chunks() -> None:
+    client, session_factory = _build_client()
+    base_time = datetime(2099, 3, 1, 8, 0, 0)
+    with session_factory() as session:
+        session.add_all(
+            [
+                SkuStockFlow(
+                    id=10000 + index,
+                    sku_id=3,
+                    action=SkuStockFlowAction.OUTBOUND,
+                    on_hand_delta=-1,
+                    reserved_delta=0,
+                    on_hand_qty_after=100,
+                    reserved_qty_after=0,
+                    operator_user_id=2,
+                    related_application_id=None,
+                    # Pairs of flows share a timestamp to exercise tie ordering.
+                    occurred_at=base_time + timedelta(minutes=index // 2),
+                    meta_json=None,
+                )
+                for index in range(650)
+            ]
+        )
+        session.commit()
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        ship_response = client.post(
+            "/api/v1/outbound/ship",
+            headers=headers,
+            json={
+                "application_id": 202,
+                "carrier": "SF",
+                "tracking_no": "SF1234567890",
+            },
+        )
+        assert ship_response.status_code == 200
+
+        listed_keys: list[str] = []
+        for page in range(1, 5):
+            page_response = client.get(
+                f"/api/v1/outbound/records?page={page}&page_size=200",
+                headers=headers,
+            )
+            assert page_response.status_code == 200
+            listed_keys.extend(
+                item["record_key"] for item in page_response.json()["data"]["items"]
+            )
+        assert len(listed_keys) == 652
+        assert listed_keys[:3] == ["SKU_FLOW-10649", "SKU_FLOW-10648", "SKU_FLOW-10647"]
+        assert any(key.startswith("ASSET_FLOW-") for key in listed_keys)
+        assert "SKU_FLOW-9001" in listed_keys
+
+        export_response = client.get("/api/v1/outbound/records/export", headers=headers)
+        assert export_response.status_code == 200
+        csv_lines = export_response.content.decode("utf-8-sig").splitlines()
+        assert csv_lines[0].startswith("record_key,record_type,action,occurred_at")
+        assert [line.split(",", 1)[0] for line in csv_lines[1:]] == listed_keys
+
+    chunks = list(
+        _iter_outbound_csv_chunks(iter({"record_key": f"K-{index}"} for index in range(1001)))
+    )
+    # Header, two full batches and the remainder.
+    assert len(chunks) == 4
+    assert chunks[0].startswith("\ufeffrecord_key,")
+    assert chunks[3].startswith("K-1000,")
+
+
+def test_m05_outbound_records_cursor_pages_match_offset_pages() -> None:
+    client, session_factory = _build_client()
+    base_time = datetime(2099, 4, 1, 8, 0, 0)
+    with session_factory() as session:
+        session.add_all(
+            [
+                SkuStockFlow(
+                    id=20000 + index,
+                    sku_id=3,
+                    action=SkuStockFlowAction.OUTBOUND,
+                    on_hand_delta=-1,
+                    reserved_delta=0,
+                    on_hand_qty_after=100,
+                    reserved_qty_after=0,
+                    operator_user_id=2,
+                    related_application_id=None,
+                    occurred_at=base_time + timedelta(minutes=index // 3),
+                    meta_json=None,
+                )
+                for index in range(45)
+            ]
+        )
+        session.commit()
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        ship_response = client.post(
+            "/api/v1/outbound/ship",
+            headers=headers,
+            json={
+                "application_id": 202,
+                "carrier": "SF",
+                "tracking_no": "SF1234567890",
+            },
+        )
+        assert ship_response.status_code == 200
+
+        offset_keys: list[str] = []
+        offset_total = None
+        for page in range(1, 6):
+            page_response = client.get(
+                f"/api/v1/outbound/records?page={page}&page_size=10",
+                headers=headers,
+            )
+            assert page_response.status_code == 200
+            data = page_response.json()["data"]
+            offset_total = data["meta"]["total"]
+            offset_keys.extend(item["record_key"] for item in data["items"])
+        assert offset_total == len(offset_keys) == 47
+
+        cursor_keys: list[str] = []
+        cursor = None
+        for _ in range(10):
+            url = "/api/v1/outbound/records?page_size=10&include_total=false"
+            if cursor is not None:
+                url += f"&cursor={cursor}"
+            page_response = client.get(url, headers=headers)
+            assert page_response.status_code == 200
+            data = page_response.json()["data"]
+            assert data["meta"]["total"] is None
+            cursor_keys.extend(item["record_key"] for item in data["items"])
+            cursor = data["meta"]["next_cursor"]
+            if cursor is None:
+                break
+        assert cursor_keys == offset_keys
+
+        export_response = client.get("/api/v1/outbound/records/export", headers=headers)
+        assert export_response.status_code == 200
+        csv_lines = export_response.content.decode("utf-8-sig").splitlines()
+        assert [line.split(",", 1)[0] for line in csv_lines[1:]] == offset_keys
+
+        filtered_response = client.get(
+            "/api/v1/outbound/records?record_type=ASSET&page_size=10",
+            headers=headers,
+        )
+        assert filtered_response.status_code == 200
+        filtered_data = filtered_response.json()["data"]
+        assert [item["record_key"] for item in filtered_data["items"]] == [
+            key for key in offset_keys if key.startswith("ASSET_FLOW-")
+        ]
+        assert filtered_data["meta"]["total"] == len(filtered_data["items"]) >= 1
+        assert filtered_data["meta"]["next_cursor"] is None
+
+        invalid_response = client.get(
+            "/api/v1/outbound/records?cursor=not-a-cursor",
+            headers=headers,
+        )
+        assert invalid_response.status_code == 400
+        assert invalid_response.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_m05_outbound_records_page_limits_each_union_branch() -> None:
+    client, session_factory = _build_client()
+    engine = session_factory.kw["bind"]
+    with session_factory() as session:
+        session.add(
+            SkuStockFlow(
+                id=20000,
+                sku_id=3,
+                action=SkuStockFlowAction.OUTBOUND,
+                on_hand_delta=-1,
+                reserved_delta=0,
+                on_hand_qty_after=100,
+                reserved_qty_after=0,
+                operator_user_id=2,
+                related_application_id=None,
+                occurred_at=datetime(2099, 4, 1, 8, 0, 0),
+                meta_json=None,
+            )
+        )
+        session.commit()
+    union_statements: list[str] = []
+
+    def _record_statement(_conn, _cursor, statement, *_args) -> None:
+        if "UNION ALL" in statement:
+            union_statements.append(statement)
+
+    with client:
+        headers = {"Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}"}
+        first_page = client.get(
+            "/api/v1/outbound/records?page_size=1&include_total=false", headers=headers
+        )
+        cursor = first_page.json()["data"]["meta"]["next_cursor"]
+        assert cursor is not None
+
+        event.listen(engine, "before_cursor_execute", _record_statement)
+        for query in (f"cursor={cursor}", "page=2"):
+            response = client.get(
+                f"/api/v1/outbound/records?page_size=1&include_total=false&{query}",
+                headers=headers,
+            )
+            assert response.status_code == 200
+        event.remove(engine, "before_cursor_execute", _record_statement)
+
+    assert len(union_statements) == 2
+    for statement in union_statements:
+        branches = statement.split("UNION ALL")
+        assert len(branches) == 2
+        # Each branch is ordered by its own flow index and limited before the merge.
+        for branch in branches:
+            assert re.search(r"ORDER BY \w+\.occurred_at DESC, \w+\.id DESC\s+LIMIT", branch)
+
+
+def test_pickup_counter_lookups_use_cache_and_follow_transitions() -> None:
+    client, session_factory = _build_client()
+    engine = session_factory.kw["bind"]
+    statements: list[str] = []
+
+    def _record_statement(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement.lower())
+
+    def _pickup_lookups() -> list[str]:
+        return [
+            statement
+            for statement in statements
+            if "application.pickup_code =" in statement
+            or "application.pickup_qr_string =" in statement
+        ]
+
+    # SQLite drops FOR UPDATE, so check the statement as PostgreSQL would see it.
+    application_loads: list[bool] = []
+
+    def _record_application_load(state) -> None:
+        if state.is_select and state.bind_mapper is not None:
+            if state.bind_mapper.class_ is Application:
+                compiled = str(state.statement.compile(dialect=postgresql.dialect()))
+                application_loads.append("FOR UPDATE" in compiled)
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        with session_factory() as session:
+            get_pickup_lookup_cache(session).clear()
+        event.listen(engine, "before_cursor_execute", _record_statement)
+        first_verify = client.post(
+            "/api/v1/pickup/verify",
+            headers=headers,
+            json={"verify_type": "CODE", "value": "222201"},
+        )
+        assert first_verify.status_code == 200
+        assert len(_pickup_lookups()) == 1
+        assert "status in" in _pickup_lookups()[0]
+
+        statements.clear()
+        cached_verify = client.post(
+            "/api/v1/pickup/verify",
+            headers=headers,
+            json={"verify_type": "CODE", "value": "222201"},
+        )
+        event.listen(Session, "do_orm_execute", _record_application_load)
+        confirm_pickup = client.post(
+            "/api/v1/outbound/confirm-pickup",
+            headers=headers,
+            json={"verify_type": "CODE", "value": "222201"},
+        )
+        event.remove(Session, "do_orm_execute", _record_application_load)
+        assert cached_verify.status_code == 200
+        assert confirm_pickup.status_code == 200
+        assert _pickup_lookups() == []
+        # The cached hit is loaded by primary key under a row lock.
+        assert application_loads == [True]
+
+        after_outbound = client.post(
+            "/api/v1/pickup/verify",
+            headers=headers,
+            json={"verify_type": "CODE", "value": "222201"},
+        )
+        event.remove(engine, "before_cursor_execute", _record_statement)
+
+    assert after_outbound.status_code == 422
+    assert after_outbound.json()["error"]["code"] == "APPLICATION_STATUS_INVALID"
+    assert after_outbound.json()["error"]["details"]["current_status"] == "OUTBOUNDED"
+
+
+def test_m05_batch_ship_manifest_reports_per_row_and_retries_chunk() -> None:
+    client, session_factory = _build_client()
+    with session_factory() as session:
+        session.add(
+            Application(
+                id=207,
+                applicant_user_id=1,
+                type=ApplicationType.APPLY,
+                status=ApplicationStatus.ADMIN_APPROVED,
+                delivery_type=DeliveryType.EXPRESS,
+                pickup_code="222207",
+                pickup_qr_string=None,
+            )
+        )
+        session.flush()
+        session.add(
+            ApplicationItem(id=3007, application_id=207, sku_id=1, quantity=1, note=None)
+        )
+        session.commit()
+
+    manifest = (
+        "application_id,carrier,tracking_no\n"
+        "206,SF,SF0000000206\n"
+        "207,SF,SF0000000207\n"
+        "202,JD,JD0000000202\n"
+        "201,SF,SF0000000201\n"
+        "999,SF,SF0000000999\n"
+        "abc,SF,\n"
+        "202,JD,JD0000000202\n"
+    )
+    with client:
+        headers = {"Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}"}
+        response = client.post(
+            "/api/v1/outbound/ship/batch/import",
+            headers=headers,
+            files={"file": ("manifest.csv", manifest.encode("utf-8"), "text/csv")},
+        )
+        json_response = client.post(
+            "/api/v1/outbound/ship/batch",
+            headers=headers,
+            json={"items": [{"application_id": 202, "carrier": "JD", "tracking_no": "JD1"}]},
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["total"] == 7
+    assert data["succeeded"] == 2
+    assert data["failed"] == 5
+    results = {item["row"]: item for item in data["results"]}
+    assert results[2]["error"]["code"] == "INSUFFICIENT_ASSETS"
+    assert results[3]["status"] == "SHIPPED"
+    assert results[3]["delivered_asset_count"] == 1
+    assert results[4]["status"] == "SHIPPED"
+    assert results[4]["tracking_no"] == "JD0000000202"
+    assert results[5]["error"]["code"] == "APPLICATION_STATUS_INVALID"
+    assert results[6]["error"]["code"] == "APPLICATION_NOT_FOUND"
+    assert results[7]["error"]["code"] == "VALIDATION_ERROR"
+    assert results[7]["error"]["details"]["fields"] == ["application_id", "tracking_no"]
+    assert results[8]["error"]["code"] == "VALIDATION_ERROR"
+
+    assert json_response.status_code == 200
+    json_results = json_response.json()["data"]["results"]
+    assert json_results[0]["error"]["code"] == "APPLICATION_STATUS_INVALID"
+
+    with session_factory() as session:
+        assert session.get(Application, 206).status == ApplicationStatus.ADMIN_APPROVED
+        assert session.get(Application, 207).status == ApplicationStatus.SHIPPED
+        assert session.get(Application, 202).status == ApplicationStatus.SHIPPED
+
+        asset12 = session.get(Asset, 12)
+        asset14 = session.get(Asset, 14)
+        assert asset12.status == AssetStatus.IN_USE
+        assert asset14.status == AssetStatus.IN_USE
+        assert asset14.holder_user_id == 1
+        assert asset14.locked_application_id is None
+
+        logistics = {
+            row.application_id: row
+            for row in session.scalars(select(Logistics)).all()
+        }
+        assert logistics[202].tracking_no == "JD0000000202"
+        assert logistics[202].receiver_name == "Alice"
+        assert logistics[207].tracking_no == "SF0000000207"
+        assert 206 not in logistics
+
+        ship_flows = session.scalars(
+            select(StockFlow).where(StockFlow.action == StockFlowAction.SHIP)
+        ).all()
+        assert sorted((row.asset_id, row.related_application_id) for row in ship_flows) == [
+            (12, 202),
+            (14, 207),
+        ]
+        assert all(row.meta_json["event"] == "ship_express" for row in ship_flows)
+
+
+def test_m05_batch_ship_reports_stock_shortfall_on_its_own_row() -> None:
+    client, session_factory = _build_client()
+    with session_factory() as session:
+        session.add(SkuStock(sku_id=3, on_hand_qty=2, reserved_qty=2))
+        session.add_all(
+            [
+                Application(
+                    id=application_id,
+                    applicant_user_id=1,
+                    type=ApplicationType.APPLY,
+                    status=ApplicationStatus.READY_OUTBOUND,
+                    delivery_type=DeliveryType.EXPRESS,
+                    pickup_code=f"222{application_id}",
+                    pickup_qr_string=None,
+                )
+                for application_id in (208, 209)
+            ]
+        )
+        session.flush()
+        session.add_all(
+            [
+                ApplicationItem(id=3008, application_id=208, sku_id=3, quantity=1, note=None),
+                ApplicationItem(id=3009, application_id=209, sku_id=3, quantity=5, note=None),
+            ]
+        )
+        session.commit()
+
+    with client:
+        headers = {"Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}"}
+        response = client.post(
+            "/api/v1/outbound/ship/batch",
+            headers=headers,
+            json={
+                "items": [
+                    {"application_id": 208, "carrier": "SF", "tracking_no": "SF208"},
+                    {"application_id": 209, "carrier": "SF", "tracking_no": "SF209"},
+                    {"application_id": 202, "carrier": "JD", "tracking_no": "JD202"},
+                    {"application_id": 201, "carrier": "SF", "tracking_no": "SF201"},
+                    {"application_id": 999, "carrier": "SF", "tracking_no": "SF999"},
+                ]
+            },
+        )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["succeeded"], data["failed"]) == (2, 3)
+    results = {item["row"]: item for item in data["results"]}
+    assert results[1]["status"] == "SHIPPED"
+    assert results[2]["error"]["code"] == "STOCK_INSUFFICIENT"
+    assert results[2]["error"]["details"]["sku_id"] == 3
+    assert results[3]["status"] == "SHIPPED"
+    assert results[4]["error"]["code"] == "APPLICATION_STATUS_INVALID"
+    assert results[5]["error"]["code"] == "APPLICATION_NOT_FOUND"
+
+    with session_factory() as session:
+        assert session.get(Application, 208).status == ApplicationStatus.SHIPPED
+        assert session.get(Application, 209).status == ApplicationStatus.READY_OUTBOUND
+        assert session.get(Application, 202).status == ApplicationStatus.SHIPPED
+        stock = session.get(SkuStock, 3)
+        assert (stock.on_hand_qty, stock.reserved_qty) == (1, 1)
+
+
+def test_request_context_middleware_sets_request_id_and_server_timing() -> None:
+    client, _ = _build_client()
+    with client:
+        health_response = client.get("/healthz")
+        assert re.fullmatch(r"req_[0-9a-f]{16}", health_response.headers["X-Request-ID"])
+        assert re.fullmatch(
+            r'total;dur=[\d.]+, db;dur=0(\.0)?;desc="0 queries"',
+            health_response.headers["Server-Timing"],
+        )
+
+        headers = {
+            "Authorization": f"Bearer {_login_and_get_access_token(client, 'U0002')}",
+            "X-Request-ID": "req_records_check",
+        }
+        for path in ("/api/v1/outbound/records", "/api/v1/outbound/records/export"):
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200
+            assert response.headers["X-Request-ID"] == "req_records_check"
+            # Queries issued before the headers (or the first streamed chunk) are counted.
+            assert re.fullmatch(
+                r'total;dur=[\d.]+, db;dur=[\d.]+;desc="[1-9]\d* queries"',
+                response.headers["Server-Timing"],
+            )
+
+
+def test_metrics_endpoint_reports_routes_pool_and_business_gauges() -> None:
+    client, session_factory = _build_client()
+    with session_factory() as session:
+        refresh_business_metrics(session)
+
+    ticket_route = ("GET", "/api/v1/applications/{id}/pickup-ticket", "2xx")
+    ticket_count = HTTP_REQUEST_DURATION.count(*ticket_route)
+    with client:
+        user_token = _login_and_get_access_token(client, "U0001")
+        ticket_response = client.get(
+            "/api/v1/applications/201/pickup-ticket",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        assert ticket_response.status_code == 200
+        assert client.get("/no-such-path").status_code == 404
+
+        metrics_response = client.get("/metrics")
+        assert metrics_response.status_code == 200
+        assert metrics_response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        samples = dict(
+            line.rsplit(" ", 1)
+            for line in metrics_response.text.splitlines()
+            if line and not line.startswith("#")
+        )
+
+    # Labelled by route template, so ids do not multiply series.
+    assert HTTP_REQUEST_DURATION.count(*ticket_route) == ticket_count + 1
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",'
+        'route="/api/v1/applications/{id}/pickup-ticket",status_class="2xx",le="+Inf"}'
+    ) in samples
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="<unmatched>",status_class="4xx"}'
+    ) in samples
+    # The scrape itself is in flight while rendering.
+    assert samples["http_requests_in_flight"] == "1"
+    assert int(samples["threadpool_max_threads"]) > 0
+    assert "db_pool_checked_out" in samples
+
+    # Seed: 201/205 wait for pickup, 202/206 for shipping; nothing in approval.
+    assert samples['fulfillment_queue_depth{delivery_type="PICKUP"}'] == "2"
+    assert samples['fulfillment_queue_depth{delivery_type="EXPRESS"}'] == "2"
+    assert samples['approval_backlog{node="LEADER"}'] == "0"
+    assert samples['approval_backlog{node="ADMIN"}'] == "0"
+    assert samples["skus_below_safety_stock"] == "2"
+    assert int(samples["business_metrics_refreshed_timestamp_seconds"]) > 0
+
+
+def _run_asgi(app, headers: list[tuple[bytes, bytes]]) -> list[dict[str, object]]:
+    messages: list[dict[str, object]] = []
+
+    async def receive() -> dict[str, object]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, object]) -> None:
+        messages.append(message)
+
+    # Spec 2.4 servers report disconnects on send, so streaming responses do
+    # not poll receive() in the background.
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "method": "GET",
+        "path": "/",
+        "headers": headers,
+    }
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def test_compression_streams_csv_chunks_and_skips_small_or_binary_bodies() -> None:
+    rows = [f"K-{index},{'x' * 200}\n" for index in range(30)]
+    csv_app = CompressionMiddleware(
+        StreamingResponse(iter(rows), media_type="text/csv; charset=utf-8"),
+        minimum_size=1024,
+    )
+    messages = _run_asgi(csv_app, [(b"accept-encoding", b"gzip, br;q=0")])
+    start_headers = dict(messages[0]["headers"])
+    assert start_headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in start_headers
+    assert start_headers[b"vary"] == b"Accept-Encoding"
+    bodies = [message["body"] for message in messages[1:]]
+    # One compressed message per CSV chunk plus the closing one.
+    assert len(bodies) == len(rows) + 1
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Each chunk is flushed, so it decodes without waiting for the next.
+    assert decoder.decompress(bodies[0]) == rows[0].encode()
+    assert decoder.decompress(b"".join(bodies[1:])) == "".join(rows[1:]).encode()
+    assert decoder.eof
+
+    small_app = CompressionMiddleware(PlainTextResponse("ok"), minimum_size=1024)
+    small = _run_asgi(small_app, [(b"accept-encoding", b"gzip")])
+    assert b"content-encoding" not in dict(small[0]["headers"])
+    assert dict(small[0]["headers"])[b"vary"] == b"Accept-Encoding"
+    assert small[1]["body"] == b"ok"
+
+    image_app = CompressionMiddleware(
+        StreamingResponse(iter([b"\x89PNG" * 1000]), media_type="image/png"),
+        minimum_size=10,
+    )
+    image = _run_asgi(image_app, [(b"accept-encoding", b"gzip")])
+    assert b"content-encoding" not in dict(image[0]["headers"])
+
+    identity_app = CompressionMiddleware(
+        StreamingResponse(iter(rows), media_type="text/csv; charset=utf-8")
+    )
+    identity = _run_asgi(identity_app, [(b"accept-encoding", b"identity")])
+    assert b"content-encoding" not in dict(identity[0]["headers"])
+
+    client, _ = _build_client()
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}", "Accept-Encoding": "gzip"}
+        export_response = client.get("/api/v1/outbound/records/export", headers=headers)
+        assert export_response.status_code == 200
+        assert export_response.headers["content-encoding"] == "gzip"
+        assert "Server-Timing" in export_response.headers
+        assert export_response.content.decode("utf-8-sig").startswith("record_key,")
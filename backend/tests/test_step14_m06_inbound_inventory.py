@@ -6,24 +6,38 @@ from datetime import UTC, datetime
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, func, select, update
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app.core import responses
 from app.core.auth import hash_password
 from app.core.config import get_settings
+from app.core.exceptions import AppException
 from app.db.base import Base
 from app.db.session import get_db_session
 from app.main import app
 from app.models.catalog import Category, Sku
-from app.models.enums import AssetStatus, OcrJobStatus, StockFlowAction
+from app.models.enums import (
+    AssetStatus,
+    DeliveryType,
+    OcrJobStatus,
+    SkuStockFlowAction,
+    StockFlowAction,
+)
 from app.models.inbound import OcrInboundJob
-from app.models.inventory import Asset, StockFlow
+from app.models.inventory import Asset, SkuAssetCounter, StockFlow
 from app.models.organization import Department, SysUser
 from app.models.rbac import RbacPermission, RbacRole, RbacRolePermission, RbacUserRole
+from app.models.sku_stock import SkuStock, SkuStockFlow
+from app.schemas.common import ApiResponse, build_success_response, success_json
+from app.services.sku_asset_counter_service import reconcile_sku_asset_counters
+from app.services.sku_stock_service import StockDelta, apply_stock_deltas
 
 
 def _seed_data(session: Session) -> None:
@@ -632,3 +646,296 @@ def test_m06_quantity_stock_ops_and_export() -> None:
         assert exported.content.startswith(b"\xef\xbb\xbf")
         assert b"occurred_at,sku_id,action" in exported.content
         assert b"INBOUND" in exported.content
+
+
+def test_apply_stock_deltas_locks_once_and_validates_before_writing() -> None:
+    _, session_factory = _build_client()
+
+    with session_factory() as session:
+        session.add(SkuStock(sku_id=2, on_hand_qty=5, reserved_qty=1))
+        session.commit()
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            stocks = apply_stock_deltas(
+                session,
+                deltas=[
+                    StockDelta(
+                        sku_id=2,
+                        action=SkuStockFlowAction.LOCK,
+                        on_hand_delta=0,
+                        reserved_delta=3,
+                    ),
+                    StockDelta(
+                        sku_id=1,
+                        action=SkuStockFlowAction.INBOUND,
+                        on_hand_delta=4,
+                        reserved_delta=0,
+                    ),
+                    StockDelta(
+                        sku_id=2,
+                        action=SkuStockFlowAction.OUTBOUND,
+                        on_hand_delta=-2,
+                        reserved_delta=-2,
+                    ),
+                ],
+                operator_user_id=2,
+                related_application_id=None,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        locking_reads = [
+            statement for statement in statements if "FROM sku_stock " in statement
+        ]
+        assert len(locking_reads) == 1
+        assert "ORDER BY sku_stock.sku_id ASC" in locking_reads[0]
+        assert (stocks[1].on_hand_qty, stocks[1].reserved_qty) == (4, 0)
+        assert (stocks[2].on_hand_qty, stocks[2].reserved_qty) == (3, 2)
+        session.commit()
+
+        flows = session.scalars(select(SkuStockFlow).order_by(SkuStockFlow.id.asc())).all()
+        assert [
+            (flow.sku_id, flow.action, flow.on_hand_qty_after, flow.reserved_qty_after)
+            for flow in flows
+        ] == [
+            (2, SkuStockFlowAction.LOCK, 5, 4),
+            (1, SkuStockFlowAction.INBOUND, 4, 0),
+            (2, SkuStockFlowAction.OUTBOUND, 3, 2),
+        ]
+
+        try:
+            apply_stock_deltas(
+                session,
+                deltas=[
+                    StockDelta(
+                        sku_id=1,
+                        action=SkuStockFlowAction.OUTBOUND,
+                        on_hand_delta=-1,
+                        reserved_delta=0,
+                    ),
+                    StockDelta(
+                        sku_id=2,
+                        action=SkuStockFlowAction.LOCK,
+                        on_hand_delta=0,
+                        reserved_delta=2,
+                    ),
+                ],
+                operator_user_id=2,
+                related_application_id=None,
+            )
+        except AppException as exc:
+            assert exc.code == "STOCK_INSUFFICIENT"
+            assert exc.details["sku_id"] == 2
+        else:
+            raise AssertionError("expected STOCK_INSUFFICIENT")
+
+        assert session.get(SkuStock, 1).on_hand_qty == 4
+        assert session.get(SkuStock, 2).reserved_qty == 2
+
+
+def test_m06_admin_asset_import_csv_inserts_in_batches() -> None:
+    client, session_factory = _build_client()
+    now = datetime.now(UTC).replace(tzinfo=None)
+    with session_factory() as session:
+        # Hand-entered tags occupying the next generated tag and its first suffix.
+        session.add_all(
+            [
+                Asset(
+                    id=190,
+                    asset_tag="AT-000202",
+                    sku_id=2,
+                    sn="SN-M06-MANUAL-190",
+                    status=AssetStatus.IN_STOCK,
+                    holder_user_id=None,
+                    locked_application_id=None,
+                    inbound_at=now,
+                ),
+                Asset(
+                    id=191,
+                    asset_tag="AT-000202-1",
+                    sku_id=2,
+                    sn="SN-M06-MANUAL-191",
+                    status=AssetStatus.IN_STOCK,
+                    holder_user_id=None,
+                    locked_application_id=None,
+                    inbound_at=now,
+                ),
+            ]
+        )
+        session.commit()
+
+    rows = ["sn,inbound_at", "SN-IMPORT-00000,2026-01-02T03:04:05Z"]
+    rows.extend(f"SN-IMPORT-{index:05d}," for index in range(1, 1200))
+    rows.insert(5, ",")
+    csv_body = ("\n".join(rows) + "\n").encode("utf-8")
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        import_response = client.post(
+            "/api/v1/admin/assets/import",
+            headers=headers,
+            data={"sku_id": "1"},
+            files={"file": ("pallet.csv", csv_body, "text/csv")},
+        )
+        assert import_response.status_code == 200
+        import_data = import_response.json()["data"]
+        assert import_data["created_count"] == 1200
+        created = import_data["created_assets"]
+        assert created[0]["asset_id"] == 202
+        assert created[0]["asset_tag"] == "AT-000202-2"
+        assert created[1]["asset_tag"] == "AT-000203"
+        assert len({item["asset_tag"] for item in created}) == 1200
+
+        duplicate_response = client.post(
+            "/api/v1/admin/assets/import",
+            headers=headers,
+            data={"sku_id": "1"},
+            files={
+                "file": (
+                    "again.csv",
+                    "\n".join(
+                        ["sn"]
+                        + [f"SN-NEW-{index:05d}" for index in range(600)]
+                        + ["SN-IMPORT-00001"]
+                    ).encode("utf-8"),
+                    "text/csv",
+                )
+            },
+        )
+        assert duplicate_response.status_code == 409
+        assert duplicate_response.json()["error"]["code"] == "DUPLICATE_SN"
+
+        missing_column = client.post(
+            "/api/v1/admin/assets/import",
+            headers=headers,
+            data={"sku_id": "1"},
+            files={"file": ("bad.csv", b"serial\nSN-X\n", "text/csv")},
+        )
+        assert missing_column.status_code == 400
+        assert missing_column.json()["error"]["code"] == "VALIDATION_ERROR"
+
+    with session_factory() as session:
+        imported = session.scalars(
+            select(Asset).where(Asset.sn.like("SN-IMPORT-%")).order_by(Asset.id.asc())
+        ).all()
+        assert len(imported) == 1200
+        assert imported[0].inbound_at == datetime(2026, 1, 2, 3, 4, 5)
+        assert all(item.status == AssetStatus.IN_STOCK for item in imported)
+        assert session.scalar(
+            select(func.count(StockFlow.id)).where(
+                StockFlow.asset_id.in_([item.id for item in imported]),
+                StockFlow.action == StockFlowAction.INBOUND,
+            )
+        ) == 1200
+        # The failed second import left nothing behind.
+        assert session.scalar(
+            select(func.count(Asset.id)).where(Asset.sn.like("SN-NEW-%"))
+        ) == 0
+
+
+def test_sku_asset_counters_follow_transitions_and_reconcile() -> None:
+    client, session_factory = _build_client()
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        create_assets = client.post(
+            "/api/v1/admin/assets",
+            headers=headers,
+            json={"sku_id": 2, "assets": [{"sn": "SN-COUNTER-1"}, {"sn": "SN-COUNTER-2"}]},
+        )
+        assert create_assets.status_code == 200
+        new_asset_id = create_assets.json()["data"]["created_assets"][0]["asset_id"]
+
+        move_asset = client.put(
+            f"/api/v1/admin/assets/{new_asset_id}",
+            headers=headers,
+            json={"sku_id": 1, "status": "REPAIRING"},
+        )
+        assert move_asset.status_code == 200
+        delete_asset = client.delete("/api/v1/admin/assets/101", headers=headers)
+        assert delete_asset.status_code == 200
+
+        summary = client.get("/api/v1/inventory/summary", headers=headers)
+        assert summary.status_code == 200
+        by_sku = {item["sku_id"]: item for item in summary.json()["data"]}
+        assert by_sku[1]["total_count"] == 6
+        assert by_sku[1]["in_stock_count"] == 0
+        assert by_sku[1]["repairing_count"] == 2
+        assert by_sku[2]["in_stock_count"] == 2
+        assert by_sku[2]["available_qty"] == 2
+
+    with session_factory() as session:
+        assert reconcile_sku_asset_counters(session, repair=False) == []
+        counter = session.get(SkuAssetCounter, 2)
+        assert counter is not None
+        assert (counter.in_stock_count, counter.available_count) == (2, 2)
+
+        # Core updates bypass the flush hook; reconcile reports and repairs that.
+        session.execute(
+            update(Asset).where(Asset.id == 201).values(status=AssetStatus.SCRAPPED)
+        )
+        drifts = reconcile_sku_asset_counters(session)
+        assert {(item.sku_id, item.column, item.stored, item.actual) for item in drifts} == {
+            (2, "in_stock_count", 2, 1),
+            (2, "available_count", 2, 1),
+            (2, "scrapped_count", 0, 1),
+        }
+        session.commit()
+        assert reconcile_sku_asset_counters(session, repair=False) == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_success_json_writes_the_same_bytes_as_api_response(
+    monkeypatch: pytest.MonkeyPatch, use_orjson: bool
+) -> None:
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    payload = {
+        "items": [
+            {
+                "sku_id": 1,
+                "name": "显示器",
+                "reference_price": Decimal("3299.50"),
+                "occurred_at": datetime(2026, 3, 1, 8, 0, 0, 123),
+                "delivery_type": DeliveryType.PICKUP,
+                "ratio": 0.5,
+                "cover_url": None,
+                "by_status": {1: 2},
+            }
+        ],
+        "meta": {"page": 1, "total": 1},
+    }
+    bench_app = FastAPI()
+
+    @bench_app.get("/envelope", response_model=ApiResponse)
+    def _envelope() -> ApiResponse:
+        return build_success_response(payload)
+
+    @bench_app.get("/fast", response_model=ApiResponse)
+    def _fast():
+        return success_json(payload)
+
+    client = TestClient(bench_app)
+    envelope = client.get("/envelope")
+    fast = client.get("/fast")
+    assert fast.headers["content-type"] == envelope.headers["content-type"]
+    assert fast.content == envelope.content
+    # Both routes document the same envelope.
+    operations = bench_app.openapi()["paths"]
+    assert (
+        operations["/fast"]["get"]["responses"] == operations["/envelope"]["get"]["responses"]
+    )
@@ -6,15 +6,21 @@ from datetime import UTC, datetime
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from app.api.v1.routers.m07_reports import (
+    _execute_copilot_plan,
+    _execute_copilot_plan_reference,
+)
 from app.core.auth import hash_password
 from app.core.config import get_settings
+from app.core.request_timing import assert_query_budget, track_request_timings
 from app.db.base import Base
 from app.db.session import get_db_session
 from app.main import app
@@ -29,6 +35,11 @@ from app.models.enums import (
 from app.models.inventory import Asset
 from app.models.organization import Department, SysUser
 from app.models.rbac import RbacRole, RbacUserRole
+from app.schemas.m07 import CopilotQueryPlan
+from app.services.report_rollup_service import (
+    rebuild_report_rollups,
+    record_application_created,
+)
 
 
 def _seed_data(session: Session) -> None:
@@ -219,9 +230,11 @@ def _seed_data(session: Session) -> None:
     )
 
     session.commit()
+    rebuild_report_rollups(session)
+    session.commit()
 
 
-def _build_client() -> TestClient:
+def _build_client() -> tuple[TestClient, sessionmaker[Session]]:
     os.environ["PASSWORD_HASH_ITERATIONS"] = "2000"
     os.environ["JWT_SECRET"] = "step16-test-secret"
     os.environ["REFRESH_COOKIE_SECURE"] = "0"
@@ -249,7 +262,7 @@ def _build_client() -> TestClient:
             yield session
 
     app.dependency_overrides[get_db_session] = _override_db
-    return TestClient(app)
+    return TestClient(app), test_session_factory
 
 
 def _login_and_get_access_token(client: TestClient, employee_no: str) -> str:
@@ -264,7 +277,7 @@ def _login_and_get_access_token(client: TestClient, employee_no: str) -> str:
 
 
 def test_m07_reports_and_copilot_happy_path() -> None:
-    client = _build_client()
+    client, _ = _build_client()
 
     with client:
         admin_token = _login_and_get_access_token(client, "U0002")
@@ -351,7 +364,7 @@ def test_m07_reports_and_copilot_happy_path() -> None:
 
 
 def test_m07_permission_denied_for_non_admin() -> None:
-    client = _build_client()
+    client, _ = _build_client()
 
     with client:
         user_token = _login_and_get_access_token(client, "U0001")
@@ -388,7 +401,7 @@ def test_m07_permission_denied_for_non_admin() -> None:
 
 
 def test_m07_validation_branches() -> None:
-    client = _build_client()
+    client, _ = _build_client()
 
     with client:
         admin_token = _login_and_get_access_token(client, "U0002")
@@ -428,3 +441,177 @@ def test_m07_validation_branches() -> None:
         assert (
             copilot_constraints_validation.json()["error"]["code"] == "VALIDATION_ERROR"
         )
+
+
+def test_m07_trends_read_rollups_and_follow_new_applications() -> None:
+    client, session_factory = _build_client()
+
+    with session_factory() as session:
+        record_application_created(
+            session,
+            created_at=datetime(2026, 2, 9, 8, 0, 0),
+            department_id=2,
+            items=[(session.get(Sku, 2), 3), (session.get(Sku, 2), 1)],
+        )
+        session.commit()
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        window = "start_date=2026-02-01&end_date=2026-02-09"
+
+        weekly = client.get(
+            f"/api/v1/reports/applications-trend?granularity=WEEK&{window}",
+            headers=headers,
+        )
+        assert weekly.status_code == 200
+        assert weekly.json()["data"] == [
+            {"bucket": "2026-01-26", "count": 1},
+            {"bucket": "2026-02-02", "count": 2},
+            {"bucket": "2026-02-09", "count": 1},
+        ]
+
+        by_department = client.get(
+            f"/api/v1/reports/applications-trend-by-department?granularity=MONTH&{window}",
+            headers=headers,
+        )
+        assert by_department.status_code == 200
+        assert by_department.json()["data"] == {
+            "buckets": ["2026-02-01"],
+            "departments": [{"id": 1, "name": "IT"}, {"id": 2, "name": "Finance"}],
+            "data": [{"bucket": "2026-02-01", "IT": 2, "Finance": 2}],
+        }
+
+        by_category = client.get(
+            f"/api/v1/reports/applications-trend-by-category?granularity=MONTH&{window}",
+            headers=headers,
+        )
+        assert by_category.status_code == 200
+        assert by_category.json()["data"]["data"] == [
+            {"bucket": "2026-02-01", "Laptop": 5}
+        ]
+
+        by_sku = client.get(
+            f"/api/v1/reports/applications-trend-by-sku?granularity=DAY&{window}",
+            headers=headers,
+        )
+        assert by_sku.status_code == 200
+        assert by_sku.json()["data"]["data"] == [
+            {"bucket": "2026-02-01", "Lenovo T14": 1, "Dell U2723QE": 0},
+            {"bucket": "2026-02-02", "Lenovo T14": 2, "Dell U2723QE": 0},
+            {"bucket": "2026-02-08", "Lenovo T14": 0, "Dell U2723QE": 1},
+            {"bucket": "2026-02-09", "Lenovo T14": 0, "Dell U2723QE": 4},
+        ]
+
+
+def test_m07_copilot_sql_plan_matches_reference_execution() -> None:
+    _, session_factory = _build_client()
+
+    plans = [
+        {"metric": "TOTAL_COST", "dimensions": ["DEPARTMENT"]},
+        {"metric": "TOTAL_COST", "dimensions": ["USER", "SKU"], "limit": 2},
+        {"metric": "MAX_COST", "dimensions": ["CATEGORY", "MONTH"]},
+        {"metric": "COUNT_APPLICATIONS", "dimensions": ["STATUS"]},
+        {"metric": "COUNT_APPLICATIONS", "dimensions": []},
+        {
+            "metric": "COUNT_APPLICATIONS",
+            "dimensions": ["SKU"],
+            "filters": [{"field": "CREATED_DATE", "op": "GTE", "value": "2026-02-02"}],
+            "order_by": [{"field": "metric_value", "direction": "ASC"}],
+        },
+        {
+            "metric": "TOTAL_COST",
+            "dimensions": ["USER"],
+            "filters": [
+                {"field": "DEPARTMENT_ID", "op": "IN", "value": [1, 2]},
+                {"field": "STATUS", "op": "EQ", "value": "DONE"},
+                {"field": "SKU_ID", "op": "EQ", "value": "1"},
+            ],
+        },
+        {
+            "metric": "TOTAL_COST",
+            "dimensions": ["DEPARTMENT"],
+            "filters": [
+                {"field": "STATUS", "op": "CONTAINS", "value": "approved"},
+                {"field": "USER_ID", "op": "BETWEEN", "value": [1, 1]},
+            ],
+        },
+        {"metric": "COUNT_ASSETS", "dimensions": ["STATUS"]},
+        {
+            "metric": "COUNT_ASSETS",
+            "dimensions": ["DEPARTMENT", "SKU"],
+            "filters": [
+                {"field": "CREATED_DATE", "op": "BETWEEN", "value": ["2026-02-02", "2026-02-05"]},
+                {"field": "STATUS", "op": "IN", "value": ["IN_USE", "REPAIRING", "BOGUS"]},
+            ],
+        },
+        {
+            "metric": "COUNT_ASSETS",
+            "dimensions": ["USER"],
+            "filters": [{"field": "USER_ID", "op": "EQ", "value": 99}],
+        },
+    ]
+
+    with session_factory() as session:
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(statement)
+
+        engine = session.get_bind()
+        for raw_plan in plans:
+            plan = CopilotQueryPlan.model_validate(raw_plan)
+            expected = _execute_copilot_plan_reference(session, plan)
+
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", _record)
+            try:
+                actual = _execute_copilot_plan(session, plan)
+            finally:
+                event.remove(engine, "before_cursor_execute", _record)
+
+            assert actual == expected, raw_plan
+            assert len(statements) == 1
+            assert "GROUP BY" in statements[0] or not plan.dimensions
+            assert "LIMIT" in statements[0]
+
+
+def test_m07_report_query_budgets_and_repeated_statement_detection() -> None:
+    client, _ = _build_client()
+
+    with client:
+        admin_token = _login_and_get_access_token(client, "U0002")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        # The first authenticated request also warms the per-process auth caches.
+        client.get("/api/v1/reports/asset-status-distribution", headers=headers)
+
+        with assert_query_budget(2) as timings:
+            for path in (
+                "/api/v1/reports/applications-trend?granularity=DAY&start_date=2026-02-01",
+                "/api/v1/reports/cost-by-department?start_date=2026-02-01",
+                "/api/v1/reports/asset-status-distribution",
+            ):
+                assert client.get(path, headers=headers).status_code == 200
+        assert len(timings) == 3
+        assert all(timing.repeated_statements(2) == [] for timing in timings)
+
+        with track_request_timings() as timings:
+            response = client.get(
+                "/api/v1/reports/top-departments-with-top-skus?start_date=2026-02-01",
+                headers=headers,
+            )
+        assert response.status_code == 200
+        assert len(response.json()["data"]) == 2
+        (timing,) = timings
+        assert timing.name == "GET /api/v1/reports/top-departments-with-top-skus"
+        # One top-SKU query per department.
+        [(statement, count)] = timing.repeated_statements(2)
+        assert count == 2
+        assert "sys_user.department_id = ?" in statement
+
+        with pytest.raises(AssertionError, match="budget is 1; most repeated \\(2x\\)"):
+            with assert_query_budget(1):
+                client.get(
+                    "/api/v1/reports/top-departments-with-top-skus?start_date=2026-02-01",
+                    headers=headers,
+                )
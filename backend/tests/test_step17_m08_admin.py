@@ -7,13 +7,14 @@ from decimal import Decimal
 from pathlib import Path
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.core.auth import hash_password
+from app.core.auth import hash_password, verify_password
+from app.core.auth_cache import AuthCache
 from app.core.config import get_settings
 from app.db.base import Base
 from app.db.session import get_db_session
@@ -473,6 +474,87 @@ def test_m08_rbac_happy_path_and_deterministic_replacement() -> None:
         ]
 
 
+def test_m08_cached_grants_are_invalidated_on_role_changes() -> None:
+    client, session_factory = _build_client()
+    engine = session_factory.kw["bind"]
+    rbac_statements: list[str] = []
+
+    def _record_rbac_statement(_conn, _cursor, statement, *_args) -> None:
+        if "rbac_" in statement or "token_blacklist" in statement:
+            rbac_statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record_rbac_statement)
+
+    with client:
+        super_admin_token = _login_and_get_access_token(client, "S0001")
+        user_token = _login_and_get_access_token(client, "U0001")
+        super_admin_headers = {"Authorization": f"Bearer {super_admin_token}"}
+        user_headers = {"Authorization": f"Bearer {user_token}"}
+
+        forbidden_response = client.get(
+            "/api/v1/admin/crud/users", headers=user_headers
+        )
+        assert forbidden_response.status_code == 403
+        assert forbidden_response.json()["error"]["code"] == "ROLE_INSUFFICIENT"
+
+        rbac_statements.clear()
+        repeated_response = client.get(
+            "/api/v1/admin/crud/users", headers=user_headers
+        )
+        assert repeated_response.status_code == 403
+        assert rbac_statements == []
+
+        promote_response = client.put(
+            "/api/v1/admin/users/3/roles",
+            headers=super_admin_headers,
+            json={"roles": ["SUPER_ADMIN"]},
+        )
+        assert promote_response.status_code == 200
+
+        promoted_response = client.get(
+            "/api/v1/admin/crud/users", headers=user_headers
+        )
+        assert promoted_response.status_code == 200
+
+        unbind_response = client.post(
+            "/api/v1/admin/rbac/role-bindings",
+            headers=super_admin_headers,
+            json={"role_key": "SUPER_ADMIN", "permissions": []},
+        )
+        assert unbind_response.status_code == 200
+
+        unbound_response = client.get(
+            "/api/v1/admin/crud/users", headers=user_headers
+        )
+        assert unbound_response.status_code == 403
+        assert unbound_response.json()["error"]["code"] == "PERMISSION_DENIED"
+
+    event.remove(engine, "before_cursor_execute", _record_rbac_statement)
+
+
+def test_auth_cache_drops_grants_loaded_before_an_invalidation() -> None:
+    cache = AuthCache(ttl_seconds=60, max_entries=2)
+
+    # Loads for users 1 and 2 start, then user 1's roles change and are invalidated.
+    version = cache.version
+    cache.invalidate_user(1)
+    cache.put_grants(1, roles={"USER"}, permissions=set(), version=version)
+    cache.put_grants(2, roles={"USER"}, permissions=set(), version=version)
+    assert cache.get_grants(1) is None
+    assert cache.get_grants(2) is not None
+
+    cache.put_grants(1, roles={"ADMIN"}, permissions=set(), version=cache.version)
+    assert cache.get_grants(1).roles == {"ADMIN"}
+
+    # Past max_entries stamps, the per-user stamps collapse into a global one.
+    version = cache.version
+    cache.invalidate_user(2)
+    cache.invalidate_user(3)
+    cache.put_grants(4, roles={"USER"}, permissions=set(), version=version)
+    assert cache.get_grants(1) is None
+    assert cache.get_grants(4) is None
+
+
 def test_m08_crud_resources_and_role_guards() -> None:
     client, _ = _build_client()
 
@@ -693,3 +775,82 @@ def test_m08_validation_and_error_branches() -> None:
         )
         assert invalid_resource_response.status_code == 400
         assert invalid_resource_response.json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_m08_bulk_user_import_validates_then_hashes_in_background() -> None:
+    os.environ["USER_IMPORT_HASH_WORKERS"] = "2"
+    client, session_factory = _build_client()
+    invalid_sheet = (
+        "employee_no,name,department\n"
+        "U0001,Existing,IT\n"
+        "N0001,Dup,IT\n"
+        "N0001,Dup Again,IT\n"
+        "N0002,,IT\n"
+        "N0003,Ghost,Nowhere\n"
+    )
+    valid_sheet = "employee_no,name,department,department_id,password,job_title\n" + "".join(
+        f"N{index:04d},New {index},Finance,,Pass{index:04d}x,Analyst\n" for index in range(1, 6)
+    ) + "N0006,By Id,,1,,\n"
+    try:
+        with client:
+            headers = {
+                "Authorization": f"Bearer {_login_and_get_access_token(client, 'S0001')}"
+            }
+            rejected = client.post(
+                "/api/v1/admin/users/import",
+                headers=headers,
+                files={"file": ("users.csv", invalid_sheet.encode("utf-8"), "text/csv")},
+            )
+            accepted = client.post(
+                "/api/v1/admin/users/import",
+                headers=headers,
+                files={"file": ("users.csv", valid_sheet.encode("utf-8"), "text/csv")},
+            )
+            job_id = accepted.json()["data"]["job_id"]
+            job_status = client.get(f"/api/v1/admin/users/import-jobs/{job_id}", headers=headers)
+            admin_denied = client.get(
+                f"/api/v1/admin/users/import-jobs/{job_id}",
+                headers={
+                    "Authorization": f"Bearer {_login_and_get_access_token(client, 'A0001')}"
+                },
+            )
+    finally:
+        os.environ.pop("USER_IMPORT_HASH_WORKERS", None)
+        get_settings.cache_clear()
+
+    assert rejected.status_code == 400
+    rejected_details = rejected.json()["error"]["details"]
+    assert rejected_details["error_count"] == 4
+    assert [(item["row"], item["field"]) for item in rejected_details["errors"]] == [
+        (2, "employee_no"),
+        (4, "employee_no"),
+        (5, "name"),
+        (6, "department"),
+    ]
+
+    assert accepted.status_code == 200
+    assert accepted.json()["data"]["status"] == "PENDING"
+    assert accepted.json()["data"]["total_rows"] == 6
+
+    assert job_status.status_code == 200
+    job = job_status.json()["data"]
+    assert job["status"] == "SUCCEEDED"
+    assert job["processed_rows"] == 6
+    assert job["created_count"] == 6
+    assert job["finished_at"] is not None
+    assert admin_denied.status_code == 403
+
+    with session_factory() as session:
+        users = {
+            row.employee_no: row
+            for row in session.scalars(
+                select(SysUser).where(SysUser.employee_no.like("N%"))
+            ).all()
+        }
+    assert len(users) == 6
+    assert users["N0003"].department_id == 2
+    assert users["N0003"].job_title == "Analyst"
+    assert verify_password("Pass0003x", users["N0003"].password_hash)
+    assert users["N0006"].department_id == 1
+    assert verify_password("User12345", users["N0006"].password_hash)
+    assert users["N0001"].password_hash != users["N0002"].password_hash